@@ -0,0 +1,75 @@
+import random
+from datetime import datetime, timedelta
+
+ROWS_PER_STATEMENT = 1000
+
+FIRST_NAMES = ['Ann', 'Bob', 'Cara', 'Dev', 'Eli', 'Fay', 'Gus', 'Hana', 'Ivo', 'Jo', 'Kai', 'Lena', 'Milo', 'Nia', 'Omar', 'Pia']
+LAST_NAMES = ['Smith', 'Jones', 'Patel', 'Khan', 'Brown', 'Garcia', 'Nowak', 'Rossi', 'Kim', 'Okafor']
+STREETS = ['High St', 'Market Rd', 'Station Ave', 'Mill Lane', 'Church St', 'Park Rd', 'Bridge St']
+ORDER_DATES_END = datetime(2026, 1, 1)  # fixed so the same seed always produces the same data
+ORDER_DATES_DAYS = 90
+DISHES = ['Latte', 'Flat White', 'Tea', 'Soup', 'Wrap', 'Salad', 'Bagel', 'Brownie', 'Panini', 'Smoothie', 'Quiche', 'Muffin']
+
+
+def default_sizes(orders):
+    # Keeps the ratios roughly like a real cafe: many customers, a modest menu and a handful of couriers
+    return {
+        'products': max(20, min(orders // 500, 500)),
+        'customers': max(50, orders // 10),
+        'couriers': max(5, min(orders // 5000, 50)),
+        'orders': orders,
+    }
+
+
+def _insert_rows(cursor, table, columns, rows):
+    row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+    for start in range(0, len(rows), ROWS_PER_STATEMENT):
+        chunk = rows[start:start + ROWS_PER_STATEMENT]
+        values = tuple(value for row in chunk for value in row)
+        cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_placeholder] * len(chunk))}", values)
+
+
+def _phone(rng):
+    return '07' + ''.join(rng.choice('0123456789') for _ in range(9))
+
+
+def generate(conn, orders, seed=42, max_items_per_order=5, sizes=None):
+    # Fills an empty database with deterministic data for the given seed and returns the row counts
+    rng = random.Random(seed)
+    sizes = sizes or default_sizes(orders)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT COUNT(*) FROM order_status")
+    if cursor.fetchone()[0] == 0:
+        _insert_rows(cursor, 'order_status', ['id', 'order_status'], [(1, 'PREPARING'), (2, 'READY'), (3, 'DELIVERED')])
+
+    products = [(i, f"{rng.choice(DISHES)} {i}", round(rng.uniform(1, 12), 2), rng.randint(1000, 100000)) for i in range(1, sizes['products'] + 1)]
+    couriers = [(i, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", _phone(rng)) for i in range(1, sizes['couriers'] + 1)]
+    customers = [(i, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"{rng.randint(1, 400)} {rng.choice(STREETS)}", _phone(rng)) for i in range(1, sizes['customers'] + 1)]
+
+    cursor.execute("START TRANSACTION")
+    _insert_rows(cursor, 'products', ['id', 'name', 'price', 'inventory'], products)
+    _insert_rows(cursor, 'couriers', ['id', 'name', 'phone'], couriers)
+    _insert_rows(cursor, 'customers', ['id', 'name', 'address', 'phone'], customers)
+    conn.commit()
+
+    # Orders are generated and written in slices so memory stays bounded at the 1M scale
+    items_written = 0
+    for start in range(1, orders + 1, ROWS_PER_STATEMENT * 10):
+        end = min(start + ROWS_PER_STATEMENT * 10, orders + 1)
+        order_rows, item_rows = [], []
+        for order_id in range(start, end):
+            created_at = ORDER_DATES_END - timedelta(seconds=rng.randint(0, ORDER_DATES_DAYS * 86400))
+            order_rows.append((order_id, rng.randint(1, sizes['customers']), rng.randint(1, sizes['couriers']), rng.choice((1, 2, 3, 3, 3)),
+                               created_at.strftime('%Y-%m-%d %H:%M:%S')))
+            # Each product appears once per order with a quantity, charged at its catalogue price
+            for product_id in rng.sample(range(1, sizes['products'] + 1), rng.randint(1, min(max_items_per_order, sizes['products']))):
+                item_rows.append((order_id, product_id, rng.choice((1, 1, 1, 2, 3)), products[product_id - 1][2]))
+        cursor.execute("START TRANSACTION")
+        _insert_rows(cursor, 'orders', ['id', 'customer_id', 'courier', 'status', 'created_at'], order_rows)
+        _insert_rows(cursor, 'order_items', ['order_id', 'product_id', 'quantity', 'unit_price'], item_rows)
+        conn.commit()
+        items_written += len(item_rows)
+
+    cursor.close()
+    return dict(sizes, order_items=items_written)
@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from src.instrumentation import percentile
+from src.intake_server import INTAKE_HOST, INTAKE_PORT
+
+# Load generator for src.intake_server, e.g. the noon spike:
+#   python -m src.intake_server &
+#   python -m benchmarks.intake_load --clients 20 --orders 2000
+
+
+async def client(args, rng, orders, latencies, errors):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    try:
+        for request_id in orders:
+            request = {
+                'id': request_id,
+                'op': 'create_order',
+                'customer_id': rng.randint(1, args.customers),
+                'courier_id': rng.randint(1, args.couriers),
+                'product_ids': [rng.randint(1, args.products) for _ in range(rng.randint(1, 5))],
+            }
+            start = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if not response.get('ok'):
+                errors.append(response.get('error'))
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    latencies, errors = [], []
+    request_ids = list(range(1, args.orders + 1))
+    # Each client submits its share one request at a time, like a till waiting for the confirmation
+    shares = [request_ids[n::args.clients] for n in range(args.clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args, random.Random(rng.random()), share, latencies, errors) for share in shares))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    print(f"{len(latencies)} orders from {args.clients} clients in {elapsed:.2f}s ({len(latencies) / elapsed if elapsed else 0:.0f} orders/sec)")
+    print(f"latency ms: p50 {percentile(ordered, 0.50) * 1000:.1f}  p95 {percentile(ordered, 0.95) * 1000:.1f}  p99 {percentile(ordered, 0.99) * 1000:.1f}  max {ordered[-1] * 1000 if ordered else 0:.1f}")
+    if errors:
+        print(f"\033[91m{len(errors)} failed, e.g. {errors[0]}\033[0m")
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Submit concurrent orders to the intake server and report throughput and latency.")
+    parser.add_argument('--host', default=INTAKE_HOST)
+    parser.add_argument('--port', type=int, default=INTAKE_PORT)
+    parser.add_argument('--unix', help="connect to this Unix socket path instead of TCP")
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--customers', type=int, default=50, help="customer ids are drawn from 1..N")
+    parser.add_argument('--couriers', type=int, default=5)
+    parser.add_argument('--products', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    return asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from src.app import get_connection_pool
+from src.db_pool import reset_pool
+from src.instrumentation import percentile
+from src.inventory import InsufficientStockError
+from src.orders import write_order
+from src.storage import SQLiteBackend, create_backend, run_in_transaction, set_backend
+
+# Many tills ordering the same few products at once, e.g.:
+#   python -m benchmarks.reservation_contention --writers 8 --orders 500 --hot-products 3 --stock 1000
+# Reports reservation throughput, latency, deadlock retries and rejected orders, then checks that stock
+# was neither oversold nor lost: every unit missing from inventory belongs to a placed order.
+
+
+def seed(pool, hot_products, stock):
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("START TRANSACTION")
+        product_ids = []
+        for n in range(hot_products):
+            cursor.execute("INSERT INTO products (name, price, inventory) VALUES (%s, %s, %s)", (f"Hot product {n + 1}", 2.5, stock))
+            product_ids.append(cursor.lastrowid)
+        cursor.execute("INSERT INTO couriers (name, phone) VALUES (%s, %s)", ('Bench Courier', '07000000000'))
+        courier_id = cursor.lastrowid
+        cursor.execute("INSERT INTO customers (name, address, phone) VALUES (%s, %s, %s)", ('Bench Customer', '1 Bench St', '07000000000'))
+        customer_id = cursor.lastrowid
+        conn.commit()
+        cursor.close()
+    return product_ids, customer_id, courier_id
+
+
+def till(pool, rng, orders, product_ids, customer_id, courier_id, results):
+    for _ in range(orders):
+        items = [rng.choice(product_ids) for _ in range(rng.randint(1, 4))]
+        start = time.perf_counter()
+        try:
+            with pool.connection() as conn:
+                run_in_transaction(conn, lambda cursor: write_order(cursor, customer_id, courier_id, items),
+                                   on_retry=lambda err: results['retries'].append(1))
+            results['sold'].update(items)
+            results['placed'].append(time.perf_counter() - start)
+        except InsufficientStockError:
+            results['rejected'].append(time.perf_counter() - start)
+
+
+def run(args):
+    pool = get_connection_pool()
+    product_ids, customer_id, courier_id = seed(pool, args.hot_products, args.stock)
+    results = {'placed': [], 'rejected': [], 'retries': [], 'sold': Counter()}
+    rng = random.Random(args.seed)
+    threads = [threading.Thread(target=till, args=(pool, random.Random(rng.random()), args.orders, product_ids, customer_id, courier_id, results))
+               for _ in range(args.writers)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT id, inventory FROM products WHERE id IN ({', '.join(['%s'] * len(product_ids))})", tuple(product_ids))
+        inventory = dict(cursor.fetchall())
+        cursor.close()
+
+    attempts = len(results['placed']) + len(results['rejected'])
+    latencies = sorted(results['placed'] + results['rejected'])
+    print(f"{attempts} orders from {args.writers} writers on {args.hot_products} hot products in {elapsed:.2f}s ({attempts / elapsed if elapsed else 0:.0f} orders/sec)")
+    print(f"placed {len(results['placed'])}, rejected for stock {len(results['rejected'])}, deadlock retries {len(results['retries'])}")
+    print(f"latency ms: p50 {percentile(latencies, 0.50) * 1000:.1f}  p95 {percentile(latencies, 0.95) * 1000:.1f}  p99 {percentile(latencies, 0.99) * 1000:.1f}")
+
+    consistent = all(inventory[product_id] == args.stock - results['sold'][product_id] and inventory[product_id] >= 0 for product_id in product_ids)
+    if consistent:
+        print("\033[92mInventory consistent: no product oversold or lost\033[0m")
+        return 0
+    print(f"\033[91mInventory mismatch: {inventory} after selling {dict(results['sold'])} from {args.stock} each\033[0m")
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure stock reservation throughput with many writers ordering the same products.")
+    parser.add_argument('--writers', type=int, default=8, help="concurrent tills, each on its own pooled connection")
+    parser.add_argument('--orders', type=int, default=250, help="orders attempted by each writer")
+    parser.add_argument('--hot-products', type=int, default=3)
+    parser.add_argument('--stock', type=int, default=2000, help="starting inventory of each hot product")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    parser.add_argument('--yes-write-mysql', action='store_true', help="required with --backend mysql; benchmark products and orders are added to MYSQL_DATABASE")
+    args = parser.parse_args(argv)
+    if args.backend == 'mysql' and not args.yes_write_mysql:
+        parser.error("--backend mysql writes benchmark rows to MYSQL_DATABASE; pass --yes-write-mysql to confirm")
+    # Every writer holds a connection for the whole transaction
+    os.environ.setdefault("CAFEAPP_POOL_SIZE", str(args.writers + 1))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        set_backend(SQLiteBackend(os.path.join(workdir, 'contention.db')) if args.backend == 'sqlite' else create_backend('mysql'))
+        reset_pool()
+        try:
+            return run(args)
+        finally:
+            reset_pool()
+            set_backend(None)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.analytics import ROLLUP_TABLES, WATERMARK
+from src.app import CafeApp
+from src.catalog import CatalogCache
+from src.db_pool import reset_pool
+from src.storage import SQLiteBackend, create_backend, set_backend
+from benchmarks.datagen import generate
+
+DEFAULT_SCALES = [1000, 100000, 1000000]
+# Emptied before a MySQL run, together with the analytics rollups; archived orders would otherwise keep
+# their ids and collide with the generated ones
+RESET_TABLES = (
+    'order_items', 'orders', 'order_summary', 'order_items_archive', 'orders_archive', 'order_summary_archive',
+    'products', 'couriers', 'customers', 'change_log',
+)
+
+
+def timed(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # CafeApp reports progress on stdout; keep it out of the benchmark output
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def summarise(name, scale, timings, ops=1, **extra):
+    median = statistics.median(timings)
+    return dict({
+        'name': name,
+        'scale': scale,
+        'runs': len(timings),
+        'seconds': [round(t, 6) for t in timings],
+        'median_s': round(median, 6),
+        'min_s': round(min(timings), 6),
+        'ops_per_s': round(ops / median, 2) if median else None,
+    }, **extra)
+
+
+def run_scale(app, scale, repeat):
+    results = []
+
+    def full_load():
+        app.catalog = CatalogCache()
+        app.load_data()
+    timings, _ = timed(full_load, repeat)
+    results.append(summarise('load_data_full', scale, timings, rows=sum(len(app.catalog.list(table)) for table in app.catalog.tables)))
+
+    timings, _ = timed(app.load_data, repeat)
+    results.append(summarise('load_data_incremental', scale, timings))
+
+    timings, _ = timed(lambda: app.fetch_order_page(0), repeat)
+    results.append(summarise('order_list_first_page', scale, timings))
+
+    cursor = app.db_conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM orders")
+    last_page_start = max(cursor.fetchone()[0] - 20, 0)
+    cursor.close()
+    timings, _ = timed(lambda: app.fetch_order_page(last_page_start, status='READY', courier_id=1), repeat)
+    results.append(summarise('order_list_filtered_deep_page', scale, timings))
+
+    order = {'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 2, 3, 3]}
+    single_orders = 50
+    timings, _ = timed(lambda: [app.create_orders_bulk([order]) for _ in range(single_orders)], repeat)
+    results.append(summarise('create_order', scale, [t / single_orders for t in timings]))
+
+    bulk_orders = 1000
+    timings, _ = timed(lambda: app.create_orders_bulk([order] * bulk_orders), repeat)
+    results.append(summarise('create_orders_bulk_1000', scale, timings, ops=bulk_orders))
+
+    timings, rows = timed(lambda: app.export_to_csv('orders', 'orders.csv'), repeat)
+    results.append(summarise('export_orders_csv', scale, timings, ops=rows, rows=rows))
+
+    timings, rows = timed(lambda: app.export_to_csv('customers', 'customers.csv'), repeat)
+    results.append(summarise('export_customers_csv', scale, timings, ops=rows, rows=rows))
+
+    # Imports write into the same database, so they run once per scale to keep later scales comparable
+    os.makedirs('import', exist_ok=True)
+    shutil.copy(os.path.join('export', 'customers.csv'), os.path.join('import', 'customers.csv'))
+    shutil.copy(os.path.join('export', 'orders.csv'), os.path.join('import', 'orders.csv'))
+    timings, _ = timed(lambda: app.import_from_csv('customers', 'customers.csv'), 1)
+    results.append(summarise('import_customers_csv', scale, timings, ops=rows, rows=rows))
+    timings, _ = timed(lambda: app.import_from_csv('orders', 'orders.csv'), 1)
+    results.append(summarise('import_orders_csv', scale, timings))
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous_file, results):
+    with open(previous_file) as file:
+        previous = {(r['name'], r['scale']): r for r in json.load(file)['results']}
+    print(f"\n{'benchmark':<32}{'scale':>10}{'before':>12}{'after':>12}{'change':>10}")
+    for result in results:
+        before = previous.get((result['name'], result['scale']))
+        if not before:
+            continue
+        change = (result['median_s'] - before['median_s']) / before['median_s'] * 100 if before['median_s'] else 0
+        colour = "\033[91m" if change > 10 else "\033[92m" if change < -10 else ""
+        print(f"{result['name']:<32}{result['scale']:>10}{before['median_s']:>12.4f}{result['median_s']:>12.4f}{colour}{change:>+9.1f}%\033[0m")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CafeApp hot paths against generated data.")
+    parser.add_argument('--scales', type=lambda value: [int(v) for v in value.split(',')], default=DEFAULT_SCALES, help="comma-separated order counts (default: 1000,100000,1000000)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    parser.add_argument('--yes-wipe-mysql', action='store_true', help="required with --backend mysql; every table in MYSQL_DATABASE is emptied")
+    parser.add_argument('--output', default=None, help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', default=None, help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    if args.backend == 'mysql' and not args.yes_wipe_mysql:
+        parser.error("--backend mysql empties MYSQL_DATABASE; pass --yes-wipe-mysql to confirm")
+
+    output = args.output or os.path.join('benchmarks', 'results', time.strftime('%Y%m%d-%H%M%S') + '.json')
+    output = os.path.abspath(output)
+    cwd = os.getcwd()
+    results = []
+
+    for scale in args.scales:
+        workdir = tempfile.mkdtemp(prefix='cafeapp-bench-')
+        os.chdir(workdir)
+        try:
+            if args.backend == 'sqlite':
+                backend = SQLiteBackend(os.path.join(workdir, 'bench.db'))
+            else:
+                backend = create_backend('mysql')
+            set_backend(backend)
+            reset_pool()
+            app = CafeApp()
+
+            if args.backend == 'mysql':
+                cursor = app.db_conn.cursor()
+                cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+                for table in (*RESET_TABLES, *ROLLUP_TABLES):
+                    cursor.execute(f"TRUNCATE TABLE {table}")
+                # The watermark row is seeded by the migration and only rewound, so the rollups start from the first order
+                cursor.execute("UPDATE rollup_watermark SET last_order_id = 0 WHERE rollup = %s", (WATERMARK,))
+                cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+                cursor.close()
+
+            print(f"Generating {scale} orders...", flush=True)
+            start = time.perf_counter()
+            counts = generate(app.db_conn, scale, seed=args.seed)
+            print(f"  generated {counts} in {time.perf_counter() - start:.1f}s", flush=True)
+            # Generated orders bypass the app's write paths, so their summaries are built in one pass
+            timings, _ = timed(app.rebuild_order_summary, 1)
+            rebuild = summarise('rebuild_order_summary', scale, timings, ops=scale)
+            print(f"  {rebuild['name']:<32} median {rebuild['median_s'] * 1000:>10.2f} ms", flush=True)
+            results.append(rebuild)
+            app.order_status_list = app.load_order_statuses()
+
+            for result in run_scale(app, scale, args.repeat):
+                print(f"  {result['name']:<32} median {result['median_s'] * 1000:>10.2f} ms", flush=True)
+                results.append(result)
+        finally:
+            reset_pool()
+            set_backend(None)
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_revision': git_revision(),
+            'backend': args.backend,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+    print(f"\033[92mResults written to {output}\033[0m")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
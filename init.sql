@@ -4,6 +4,7 @@ CREATE TABLE `couriers` (
   `id` int NOT NULL AUTO_INCREMENT,
   `name` varchar(255) NOT NULL,
   `phone` varchar(20) NOT NULL,
+  `deleted_at` timestamp NULL DEFAULT NULL,
   PRIMARY KEY (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
@@ -14,15 +15,19 @@ CREATE TABLE `customers` (
   `name` varchar(255) NOT NULL,
   `address` varchar(255) NOT NULL,
   `phone` varchar(20) NOT NULL,
+  `deleted_at` timestamp NULL DEFAULT NULL,
   PRIMARY KEY (`id`)
 ) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 -- Creating table `order_items`
+-- One row per product in an order; unit_price is the product's price when the order was placed
 DROP TABLE IF EXISTS `order_items`;
 CREATE TABLE `order_items` (
   `order_id` int NOT NULL,
   `product_id` int NOT NULL,
-  KEY `order_id` (`order_id`),
+  `quantity` int NOT NULL DEFAULT '1',
+  `unit_price` decimal(5,2) NOT NULL,
+  PRIMARY KEY (`order_id`, `product_id`),
   KEY `product_id` (`product_id`),
   CONSTRAINT `order_items_ibfk_1` FOREIGN KEY (`order_id`) REFERENCES `orders` (`id`),
   CONSTRAINT `order_items_ibfk_2` FOREIGN KEY (`product_id`) REFERENCES `products` (`id`)
@@ -43,10 +48,14 @@ CREATE TABLE `orders` (
   `customer_id` int NOT NULL,
   `courier` int NOT NULL,
   `status` int NOT NULL,
+  `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (`id`),
   KEY `customer_id` (`customer_id`),
   KEY `courier` (`courier`),
   KEY `status` (`status`),
+  KEY `created_at` (`created_at`),
+  KEY `updated_at` (`updated_at`),
   CONSTRAINT `orders_ibfk_1` FOREIGN KEY (`customer_id`) REFERENCES `customers` (`id`),
   CONSTRAINT `orders_ibfk_2` FOREIGN KEY (`courier`) REFERENCES `couriers` (`id`),
   CONSTRAINT `orders_ibfk_3` FOREIGN KEY (`status`) REFERENCES `order_status` (`id`)
@@ -59,5 +68,139 @@ CREATE TABLE `products` (
   `name` varchar(255) NOT NULL,
   `price` decimal(5,2) NOT NULL,
   `inventory` int DEFAULT '0',
+  `deleted_at` timestamp NULL DEFAULT NULL,
   PRIMARY KEY (`id`)
-) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
\ No newline at end of file
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Creating table `order_summary`
+-- One denormalised row per order, kept up to date by the app's write paths (see src/order_summary.py)
+DROP TABLE IF EXISTS `order_summary`;
+CREATE TABLE `order_summary` (
+  `order_id` int NOT NULL,
+  `customer_id` int NOT NULL,
+  `customer_name` varchar(255) DEFAULT NULL,
+  `customer_address` varchar(255) DEFAULT NULL,
+  `customer_phone` varchar(20) DEFAULT NULL,
+  `courier_id` int NOT NULL,
+  `courier_name` varchar(255) DEFAULT NULL,
+  `courier_phone` varchar(20) DEFAULT NULL,
+  `status_id` int NOT NULL,
+  `status` varchar(50) DEFAULT NULL,
+  `items` text NOT NULL,
+  `item_quantities` text NOT NULL,
+  `item_prices` text NOT NULL,
+  `item_count` int NOT NULL DEFAULT '0',
+  `total` decimal(10,2) NOT NULL DEFAULT '0.00',
+  `created_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`order_id`),
+  KEY `status_order` (`status`, `order_id`),
+  KEY `courier_order` (`courier_id`, `order_id`),
+  KEY `customer_id` (`customer_id`),
+  KEY `status_id` (`status_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Creating archive tables
+-- Delivered orders older than CAFEAPP_ARCHIVE_AFTER_DAYS are moved here (see src/archive.py) so the live tables
+-- only hold the working set. Rows keep their ids; there are no foreign keys, so catalogue rows can still be deleted.
+DROP TABLE IF EXISTS `orders_archive`;
+CREATE TABLE `orders_archive` (
+  `id` int NOT NULL,
+  `customer_id` int NOT NULL,
+  `courier` int NOT NULL,
+  `status` int NOT NULL,
+  `created_at` timestamp NOT NULL,
+  `updated_at` timestamp NOT NULL,
+  `archived_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `created_at` (`created_at`),
+  KEY `archived_at` (`archived_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+DROP TABLE IF EXISTS `order_items_archive`;
+CREATE TABLE `order_items_archive` (
+  `order_id` int NOT NULL,
+  `product_id` int NOT NULL,
+  `quantity` int NOT NULL DEFAULT '1',
+  `unit_price` decimal(5,2) NOT NULL,
+  PRIMARY KEY (`order_id`, `product_id`),
+  KEY `product_id` (`product_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Summaries move with their orders and keep the names as they were when the order was archived
+DROP TABLE IF EXISTS `order_summary_archive`;
+CREATE TABLE `order_summary_archive` LIKE `order_summary`;
+
+-- Reports that need the full history read these views instead of the live tables
+CREATE OR REPLACE VIEW `orders_all` AS
+  SELECT `id`, `customer_id`, `courier`, `status`, `created_at`, `updated_at` FROM `orders`
+  UNION ALL
+  SELECT `id`, `customer_id`, `courier`, `status`, `created_at`, `updated_at` FROM `orders_archive`;
+CREATE OR REPLACE VIEW `order_items_all` AS
+  SELECT * FROM `order_items` UNION ALL SELECT * FROM `order_items_archive`;
+CREATE OR REPLACE VIEW `order_summary_all` AS
+  SELECT * FROM `order_summary` UNION ALL SELECT * FROM `order_summary_archive`;
+
+-- Creating rollup tables
+-- Rollups read by the dashboards (see src/analytics.py). sales_daily and courier_orders are running totals
+-- of orders placed, extended from rollup_watermark on each refresh; status_counts is recounted because statuses change.
+DROP TABLE IF EXISTS `rollup_watermark`;
+CREATE TABLE `rollup_watermark` (
+  `rollup` varchar(64) NOT NULL,
+  `last_order_id` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`rollup`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+INSERT INTO `rollup_watermark` (`rollup`, `last_order_id`) VALUES ('orders', 0);
+
+DROP TABLE IF EXISTS `sales_daily`;
+CREATE TABLE `sales_daily` (
+  `day` date NOT NULL,
+  `product_id` int NOT NULL,
+  `quantity` int NOT NULL DEFAULT '0',
+  `revenue` decimal(12,2) NOT NULL DEFAULT '0.00',
+  `orders` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`day`, `product_id`),
+  KEY `product_id` (`product_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+DROP TABLE IF EXISTS `courier_orders`;
+CREATE TABLE `courier_orders` (
+  `courier_id` int NOT NULL,
+  `orders` int NOT NULL DEFAULT '0',
+  `items` int NOT NULL DEFAULT '0',
+  `revenue` decimal(12,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (`courier_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+DROP TABLE IF EXISTS `status_counts`;
+CREATE TABLE `status_counts` (
+  `status_id` int NOT NULL,
+  `status` varchar(50) DEFAULT NULL,
+  `orders` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`status_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Creating table `change_log`
+-- Every insert/update/delete on the catalog tables is recorded here so clients can refresh incrementally
+DROP TABLE IF EXISTS `change_log`;
+CREATE TABLE `change_log` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `table_name` varchar(64) NOT NULL,
+  `row_id` int NOT NULL,
+  `changed_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `changed_at` (`changed_at`)
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Creating change tracking triggers
+CREATE TRIGGER `products_after_insert` AFTER INSERT ON `products` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('products', NEW.id);
+CREATE TRIGGER `products_after_update` AFTER UPDATE ON `products` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('products', NEW.id);
+CREATE TRIGGER `products_after_delete` AFTER DELETE ON `products` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('products', OLD.id);
+CREATE TRIGGER `couriers_after_insert` AFTER INSERT ON `couriers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('couriers', NEW.id);
+CREATE TRIGGER `couriers_after_update` AFTER UPDATE ON `couriers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('couriers', NEW.id);
+CREATE TRIGGER `couriers_after_delete` AFTER DELETE ON `couriers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('couriers', OLD.id);
+CREATE TRIGGER `customers_after_insert` AFTER INSERT ON `customers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('customers', NEW.id);
+CREATE TRIGGER `customers_after_update` AFTER UPDATE ON `customers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('customers', NEW.id);
+CREATE TRIGGER `customers_after_delete` AFTER DELETE ON `customers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('customers', OLD.id);
+CREATE TRIGGER `orders_after_insert` AFTER INSERT ON `orders` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('orders', NEW.id);
+CREATE TRIGGER `orders_after_update` AFTER UPDATE ON `orders` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('orders', NEW.id);
+CREATE TRIGGER `orders_after_delete` AFTER DELETE ON `orders` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('orders', OLD.id);
@@ -0,0 +1,37 @@
+-- Adds the `change_log` table and triggers used by the app's incremental catalog refresh.
+-- Apply to databases created from an older init.sql:
+--   mysql -u your_mysql_username -p your_database_name < migrations/001_change_log.sql
+
+CREATE TABLE IF NOT EXISTS `change_log` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `table_name` varchar(64) NOT NULL,
+  `row_id` int NOT NULL,
+  `changed_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `changed_at` (`changed_at`)
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+DROP TRIGGER IF EXISTS `products_after_insert`;
+DROP TRIGGER IF EXISTS `products_after_update`;
+DROP TRIGGER IF EXISTS `products_after_delete`;
+DROP TRIGGER IF EXISTS `couriers_after_insert`;
+DROP TRIGGER IF EXISTS `couriers_after_update`;
+DROP TRIGGER IF EXISTS `couriers_after_delete`;
+DROP TRIGGER IF EXISTS `customers_after_insert`;
+DROP TRIGGER IF EXISTS `customers_after_update`;
+DROP TRIGGER IF EXISTS `customers_after_delete`;
+DROP TRIGGER IF EXISTS `orders_after_insert`;
+DROP TRIGGER IF EXISTS `orders_after_update`;
+DROP TRIGGER IF EXISTS `orders_after_delete`;
+CREATE TRIGGER `products_after_insert` AFTER INSERT ON `products` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('products', NEW.id);
+CREATE TRIGGER `products_after_update` AFTER UPDATE ON `products` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('products', NEW.id);
+CREATE TRIGGER `products_after_delete` AFTER DELETE ON `products` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('products', OLD.id);
+CREATE TRIGGER `couriers_after_insert` AFTER INSERT ON `couriers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('couriers', NEW.id);
+CREATE TRIGGER `couriers_after_update` AFTER UPDATE ON `couriers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('couriers', NEW.id);
+CREATE TRIGGER `couriers_after_delete` AFTER DELETE ON `couriers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('couriers', OLD.id);
+CREATE TRIGGER `customers_after_insert` AFTER INSERT ON `customers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('customers', NEW.id);
+CREATE TRIGGER `customers_after_update` AFTER UPDATE ON `customers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('customers', NEW.id);
+CREATE TRIGGER `customers_after_delete` AFTER DELETE ON `customers` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('customers', OLD.id);
+CREATE TRIGGER `orders_after_insert` AFTER INSERT ON `orders` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('orders', NEW.id);
+CREATE TRIGGER `orders_after_update` AFTER UPDATE ON `orders` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('orders', NEW.id);
+CREATE TRIGGER `orders_after_delete` AFTER DELETE ON `orders` FOR EACH ROW INSERT INTO `change_log` (`table_name`, `row_id`) VALUES ('orders', OLD.id);
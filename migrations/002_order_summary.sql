@@ -0,0 +1,26 @@
+-- Adds the `order_summary` table read by the order board and the orders export.
+-- Apply to databases created from an older init.sql, then fill it once:
+--   mysql -u your_mysql_username -p your_database_name < migrations/002_order_summary.sql
+--   ./cafeapp summary rebuild
+
+CREATE TABLE IF NOT EXISTS `order_summary` (
+  `order_id` int NOT NULL,
+  `customer_id` int NOT NULL,
+  `customer_name` varchar(255) DEFAULT NULL,
+  `customer_address` varchar(255) DEFAULT NULL,
+  `customer_phone` varchar(20) DEFAULT NULL,
+  `courier_id` int NOT NULL,
+  `courier_name` varchar(255) DEFAULT NULL,
+  `courier_phone` varchar(20) DEFAULT NULL,
+  `status_id` int NOT NULL,
+  `status` varchar(50) DEFAULT NULL,
+  `items` text NOT NULL,
+  `item_prices` text NOT NULL,
+  `item_count` int NOT NULL DEFAULT '0',
+  `total` decimal(10,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (`order_id`),
+  KEY `status_order` (`status`, `order_id`),
+  KEY `courier_order` (`courier_id`, `order_id`),
+  KEY `customer_id` (`customer_id`),
+  KEY `status_id` (`status_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
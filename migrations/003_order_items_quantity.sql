@@ -0,0 +1,37 @@
+-- Stores order items as one row per product with a quantity and the unit price, instead of one row per unit,
+-- and adds indexed created/updated timestamps to orders.
+-- Apply to databases created from an older init.sql, then refresh the order summaries:
+--   mysql -u your_mysql_username -p your_database_name < migrations/003_order_items_quantity.sql
+--   ./cafeapp summary rebuild
+-- Historical prices were not recorded, so existing items get the product's current price as unit_price,
+-- and existing orders get the migration time as created_at.
+
+CREATE TABLE `order_items_new` (
+  `order_id` int NOT NULL,
+  `product_id` int NOT NULL,
+  `quantity` int NOT NULL DEFAULT '1',
+  `unit_price` decimal(5,2) NOT NULL,
+  PRIMARY KEY (`order_id`, `product_id`),
+  KEY `product_id` (`product_id`),
+  FOREIGN KEY (`order_id`) REFERENCES `orders` (`id`),
+  FOREIGN KEY (`product_id`) REFERENCES `products` (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+INSERT INTO `order_items_new` (`order_id`, `product_id`, `quantity`, `unit_price`)
+SELECT oi.`order_id`, oi.`product_id`, COUNT(*), p.`price`
+FROM `order_items` oi
+JOIN `products` p ON p.`id` = oi.`product_id`
+GROUP BY oi.`order_id`, oi.`product_id`, p.`price`;
+
+RENAME TABLE `order_items` TO `order_items_old`, `order_items_new` TO `order_items`;
+DROP TABLE `order_items_old`;
+
+ALTER TABLE `orders`
+  ADD COLUMN `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  ADD COLUMN `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  ADD KEY `created_at` (`created_at`),
+  ADD KEY `updated_at` (`updated_at`);
+
+ALTER TABLE `order_summary`
+  ADD COLUMN `item_quantities` text NOT NULL AFTER `items`,
+  ADD COLUMN `created_at` timestamp NULL DEFAULT NULL;
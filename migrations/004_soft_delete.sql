@@ -0,0 +1,7 @@
+-- Adds deleted_at to the catalogue tables for soft deletes (CAFEAPP_SOFT_DELETE=1): a soft-deleted product,
+-- courier or customer is hidden from the menus but its orders are kept.
+--   mysql -u your_mysql_username -p your_database_name < migrations/004_soft_delete.sql
+
+ALTER TABLE `products` ADD COLUMN `deleted_at` timestamp NULL DEFAULT NULL;
+ALTER TABLE `couriers` ADD COLUMN `deleted_at` timestamp NULL DEFAULT NULL;
+ALTER TABLE `customers` ADD COLUMN `deleted_at` timestamp NULL DEFAULT NULL;
@@ -0,0 +1,39 @@
+-- Adds the archive tables and views for order archival (src/archive.py):
+--   mysql -u your_mysql_username -p your_database_name < migrations/005_order_archive.sql
+-- Then move old delivered orders out of the live tables with './cafeapp archive run'.
+
+CREATE TABLE IF NOT EXISTS `orders_archive` (
+  `id` int NOT NULL,
+  `customer_id` int NOT NULL,
+  `courier` int NOT NULL,
+  `status` int NOT NULL,
+  `created_at` timestamp NOT NULL,
+  `updated_at` timestamp NOT NULL,
+  `archived_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `created_at` (`created_at`),
+  KEY `archived_at` (`archived_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `order_items_archive` (
+  `order_id` int NOT NULL,
+  `product_id` int NOT NULL,
+  `quantity` int NOT NULL DEFAULT '1',
+  `unit_price` decimal(5,2) NOT NULL,
+  PRIMARY KEY (`order_id`, `product_id`),
+  KEY `product_id` (`product_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Summaries move with their orders and keep the names as they were when the order was archived
+CREATE TABLE IF NOT EXISTS `order_summary_archive` LIKE `order_summary`;
+
+-- Reports that need the full history read these views instead of the live tables
+CREATE OR REPLACE VIEW `orders_all` AS
+  SELECT `id`, `customer_id`, `courier`, `status`, `created_at`, `updated_at` FROM `orders`
+  UNION ALL
+  SELECT `id`, `customer_id`, `courier`, `status`, `created_at`, `updated_at` FROM `orders_archive`;
+CREATE OR REPLACE VIEW `order_items_all` AS
+  SELECT * FROM `order_items` UNION ALL SELECT * FROM `order_items_archive`;
+CREATE OR REPLACE VIEW `order_summary_all` AS
+  SELECT * FROM `order_summary` UNION ALL SELECT * FROM `order_summary_archive`;
+
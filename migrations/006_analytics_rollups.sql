@@ -0,0 +1,35 @@
+-- Adds the dashboard rollup tables (src/analytics.py):
+--   mysql -u your_mysql_username -p your_database_name < migrations/006_analytics_rollups.sql
+-- Then fill them from the existing orders with './cafeapp analytics rebuild'.
+
+CREATE TABLE IF NOT EXISTS `rollup_watermark` (
+  `rollup` varchar(64) NOT NULL,
+  `last_order_id` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`rollup`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+INSERT IGNORE INTO `rollup_watermark` (`rollup`, `last_order_id`) VALUES ('orders', 0);
+
+CREATE TABLE IF NOT EXISTS `sales_daily` (
+  `day` date NOT NULL,
+  `product_id` int NOT NULL,
+  `quantity` int NOT NULL DEFAULT '0',
+  `revenue` decimal(12,2) NOT NULL DEFAULT '0.00',
+  `orders` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`day`, `product_id`),
+  KEY `product_id` (`product_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `courier_orders` (
+  `courier_id` int NOT NULL,
+  `orders` int NOT NULL DEFAULT '0',
+  `items` int NOT NULL DEFAULT '0',
+  `revenue` decimal(12,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (`courier_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `status_counts` (
+  `status_id` int NOT NULL,
+  `status` varchar(50) DEFAULT NULL,
+  `orders` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`status_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -0,0 +1,39 @@
+-- SQLite version of migrations/003_order_items_quantity.sql, applied automatically by the sqlite backend when it
+-- opens a database file older than schema version 3. The schema script runs afterwards and recreates the
+-- indexes and triggers of the rebuilt tables. Run './cafeapp summary rebuild' once afterwards.
+
+PRAGMA foreign_keys = OFF;
+BEGIN;
+
+CREATE TABLE order_items_new (
+  order_id INTEGER NOT NULL REFERENCES orders (id),
+  product_id INTEGER NOT NULL REFERENCES products (id),
+  quantity INTEGER NOT NULL DEFAULT 1,
+  unit_price NUMERIC NOT NULL,
+  PRIMARY KEY (order_id, product_id)
+);
+INSERT INTO order_items_new (order_id, product_id, quantity, unit_price)
+SELECT oi.order_id, oi.product_id, COUNT(*), p.price
+FROM order_items oi
+JOIN products p ON p.id = oi.product_id
+GROUP BY oi.order_id, oi.product_id;
+DROP TABLE order_items;
+ALTER TABLE order_items_new RENAME TO order_items;
+
+-- ALTER TABLE cannot add a column with a CURRENT_TIMESTAMP default, so orders is copied into a new table
+CREATE TABLE orders_new (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  customer_id INTEGER NOT NULL REFERENCES customers (id),
+  courier INTEGER NOT NULL REFERENCES couriers (id),
+  status INTEGER NOT NULL REFERENCES order_status (id),
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO orders_new (id, customer_id, courier, status) SELECT id, customer_id, courier, status FROM orders;
+DROP TABLE orders;
+ALTER TABLE orders_new RENAME TO orders;
+
+DROP TABLE IF EXISTS order_summary;
+
+COMMIT;
+PRAGMA foreign_keys = ON;
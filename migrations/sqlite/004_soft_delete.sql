@@ -0,0 +1,5 @@
+-- SQLite version of migrations/004_soft_delete.sql, applied automatically to database files older than schema version 4
+
+ALTER TABLE products ADD COLUMN deleted_at TIMESTAMP;
+ALTER TABLE couriers ADD COLUMN deleted_at TIMESTAMP;
+ALTER TABLE customers ADD COLUMN deleted_at TIMESTAMP;
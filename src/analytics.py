@@ -0,0 +1,208 @@
+import os
+import time
+
+from src.storage import run_in_transaction
+
+# Dashboard rollups. sales_daily (units, revenue and orders per product per day) and courier_orders are
+# running totals that refresh() extends with the orders placed since rollup_watermark, a range of ids at a
+# time, so a refresh costs the same however much history there is. Totals are taken as the orders were
+# placed: later edits and deletes are not subtracted, rebuild() recomputes everything. status_counts holds the
+# rolled-up orders by their current status: refresh() adds new orders with the status they have by then and
+# move_status_counts() moves the rolled-up ones when their status changes.
+# The frame functions read the small rollup tables and import pandas only when first called, so the app and
+# the command line never pay for it.
+
+ROLLUP_BATCH_SIZE = int(os.getenv("CAFEAPP_ROLLUP_BATCH_SIZE", "5000"))
+# Order ids are allocated when a till inserts, not when it commits, so a missing id below newer orders may
+# still be on its way. The watermark stops short of such a gap until the order after it is this old; gaps
+# left by rollbacks and deleted orders are then passed over.
+ROLLUP_GAP_TIMEOUT = int(os.getenv("CAFEAPP_ROLLUP_GAP_TIMEOUT", "600"))
+ROLLUP_TABLES = ('sales_daily', 'courier_orders', 'status_counts')
+WATERMARK = 'orders'
+
+
+def _add_orders(cursor, backend, low, high):
+    # Adds orders with low < id <= high to the running totals; the range is repeated on the items so both
+    # sides of the *_all views are read through their primary keys
+    cursor.execute(f"""
+    INSERT INTO sales_daily (day, product_id, quantity, revenue, orders)
+    SELECT DATE(o.created_at), oi.product_id, SUM(oi.quantity), SUM(oi.quantity * oi.unit_price), COUNT(*)
+    FROM orders_all o
+    JOIN order_items_all oi ON oi.order_id = o.id
+    WHERE o.id > %s AND o.id <= %s AND oi.order_id > %s AND oi.order_id <= %s
+    GROUP BY DATE(o.created_at), oi.product_id
+    {backend.upsert_add_clause(['quantity', 'revenue', 'orders'])}
+    """, (low, high, low, high))
+    cursor.execute(f"""
+    INSERT INTO courier_orders (courier_id, orders, items, revenue)
+    SELECT o.courier, COUNT(*), SUM(i.items), SUM(i.revenue)
+    FROM orders_all o
+    JOIN (
+        SELECT order_id, SUM(quantity) AS items, SUM(quantity * unit_price) AS revenue
+        FROM order_items_all
+        WHERE order_id > %s AND order_id <= %s
+        GROUP BY order_id
+    ) i ON i.order_id = o.id
+    WHERE o.id > %s AND o.id <= %s
+    GROUP BY o.courier
+    {backend.upsert_add_clause(['orders', 'items', 'revenue'])}
+    """, (low, high, low, high))
+    cursor.execute(f"""
+    INSERT INTO status_counts (status_id, status, orders)
+    SELECT o.status, MAX(s.order_status), COUNT(*)
+    FROM orders_all o
+    JOIN order_status s ON s.id = o.status
+    WHERE o.id > %s AND o.id <= %s
+    GROUP BY o.status
+    {backend.upsert_add_clause(['orders'])}
+    """, (low, high))
+    cursor.execute("SELECT COUNT(*) FROM orders_all WHERE id > %s AND id <= %s", (low, high))
+    return cursor.fetchone()[0]
+
+
+def move_status_counts(cursor, backend, condition, params, status_id):
+    # Call in the transaction that moves the live orders matching condition to status_id, before the UPDATE.
+    # Only orders at or below the watermark are moved; refresh() counts newer ones with whatever status they
+    # have when it reaches them. The watermark row is locked first, so a refresh claiming these orders
+    # either finishes before this reads it or waits and then reads the new statuses.
+    cursor.execute("UPDATE rollup_watermark SET last_order_id = last_order_id WHERE rollup = %s", (WATERMARK,))
+    cursor.execute(f"""
+    SELECT status, COUNT(*) FROM orders
+    WHERE ({condition}) AND status <> %s AND id <= (SELECT last_order_id FROM rollup_watermark WHERE rollup = %s)
+    GROUP BY status
+    """, (*params, status_id, WATERMARK))
+    moved = [(old_status, -count) for old_status, count in cursor.fetchall()]
+    if not moved:
+        return
+    moved.append((status_id, -sum(count for _, count in moved)))
+    placeholders = ', '.join(['(%s, (SELECT order_status FROM order_status WHERE id = %s), %s)'] * len(moved))
+    cursor.execute(f"INSERT INTO status_counts (status_id, status, orders) VALUES {placeholders} {backend.upsert_add_clause(['orders'])}",
+                   tuple(value for moved_status, count in moved for value in (moved_status, moved_status, count)))
+
+
+def _committed_until(cursor, backend, low, batch_size):
+    # Highest id below which no recent order could still be committing, at most batch_size ids on from the
+    # first order after low; low if there is none. Starting from the first order rather than low + 1 lets a
+    # range of deleted orders wider than a batch be passed over
+    cursor.execute("""
+    SELECT MIN(id) FROM (
+        SELECT MIN(id) AS id FROM orders WHERE id > %s
+        UNION ALL
+        SELECT MIN(id) FROM orders_archive WHERE id > %s
+    ) first_ids
+    """, (low, low))
+    first = cursor.fetchone()[0]
+    if first is None:
+        return low
+    cursor.execute(f"""
+    SELECT id, CASE WHEN created_at > {backend.seconds_ago()} THEN 1 ELSE 0 END
+    FROM orders_all WHERE id >= %s AND id < %s ORDER BY id
+    """, (ROLLUP_GAP_TIMEOUT, first, first + batch_size))
+    last = low
+    for order_id, recent in cursor.fetchall():
+        if order_id != last + 1 and recent:
+            break
+        last = order_id
+    return last
+
+
+def refresh(conn, backend, batch_size=ROLLUP_BATCH_SIZE, on_batch=None):
+    # Brings the rollups up to date; returns the orders added, batches, seconds and orders_per_s
+    start = time.perf_counter()
+    added = batches = 0
+
+    def add_batch(cursor):
+        cursor.execute("SELECT last_order_id FROM rollup_watermark WHERE rollup = %s", (WATERMARK,))
+        low = cursor.fetchone()[0]
+        high = _committed_until(cursor, backend, low, batch_size)
+        if high <= low:
+            return None
+        # Moving the watermark first locks its row, so a concurrent refresh waits and then finds nothing to claim
+        cursor.execute("UPDATE rollup_watermark SET last_order_id = %s WHERE rollup = %s AND last_order_id = %s", (high, WATERMARK, low))
+        if cursor.rowcount != 1:
+            return None
+        return _add_orders(cursor, backend, low, high)
+
+    while True:
+        count = run_in_transaction(conn, add_batch)
+        if count is None:
+            break
+        added += count
+        batches += 1
+        if on_batch:
+            on_batch(added)
+
+    seconds = time.perf_counter() - start
+    return {'orders': added, 'batches': batches, 'seconds': seconds, 'orders_per_s': added / seconds if seconds else 0.0}
+
+
+def rebuild(conn, backend, batch_size=ROLLUP_BATCH_SIZE, on_batch=None):
+    # Empties the rollups and recomputes them from every live and archived order
+    def reset(cursor):
+        for table in ROLLUP_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+        cursor.execute("UPDATE rollup_watermark SET last_order_id = 0 WHERE rollup = %s", (WATERMARK,))
+    run_in_transaction(conn, reset)
+    return refresh(conn, backend, batch_size, on_batch)
+
+
+def _frame(conn, query, params=()):
+    import pandas as pd
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+    finally:
+        cursor.close()
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def daily_sales(conn, days=None):
+    # One row per product per day: day, product_id, product, quantity, revenue, orders
+    import pandas as pd
+
+    query = """
+    SELECT s.day, s.product_id, p.name AS product, s.quantity, s.revenue, s.orders
+    FROM sales_daily s
+    LEFT JOIN products p ON s.product_id = p.id
+    ORDER BY s.day, s.product_id
+    """
+    sales = _frame(conn, query)
+    sales['day'] = pd.to_datetime(sales['day'])
+    sales['revenue'] = sales['revenue'].astype(float)
+    if days is not None and not sales.empty:
+        sales = sales[sales['day'] > sales['day'].max() - pd.Timedelta(days=days)]
+    return sales
+
+
+def product_sales(conn):
+    # Units and revenue per product over all time, best sellers first
+    sales = daily_sales(conn)
+    totals = sales.groupby('product', as_index=False)[['quantity', 'revenue']].sum()
+    return totals.sort_values('quantity', ascending=False, ignore_index=True)
+
+
+def revenue_by_day(conn, days=None):
+    # Total revenue per day as a Series indexed by day
+    return daily_sales(conn, days).groupby('day')['revenue'].sum()
+
+
+def courier_totals(conn):
+    query = """
+    SELECT c.courier_id, co.name AS courier, c.orders, c.items, c.revenue
+    FROM courier_orders c
+    LEFT JOIN couriers co ON c.courier_id = co.id
+    ORDER BY c.orders DESC
+    """
+    couriers = _frame(conn, query)
+    couriers['revenue'] = couriers['revenue'].astype(float)
+    couriers['revenue_per_order'] = couriers['revenue'] / couriers['orders']
+    return couriers
+
+
+def status_counts(conn):
+    # Orders per status name, as a Series
+    counts = _frame(conn, "SELECT status, orders FROM status_counts ORDER BY status_id")
+    return counts.set_index('status')['orders']
@@ -1,29 +1,60 @@
-import mysql.connector
+import time
+_IMPORT_STARTED = time.perf_counter()  # reference point for --startup-profile
 import os
 import re
 import csv
+import argparse
+import itertools
+import json
+import threading
 from dotenv import load_dotenv
+from src.db_pool import PoolTimeoutError, get_pool
+from src.storage import DB_ERRORS, get_backend, run_in_transaction
+from src.instrumentation import ENABLED as SQL_STATS_ENABLED, SQL_STATS, instrument, format_report
+from src.catalog import SEARCH_FIELDS, CatalogCache
+from src.orders import write_order, write_orders, replace_order_items, set_status, sweep_status
+from src.analytics import rebuild as rebuild_rollups, refresh as refresh_rollups
+from src.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, MissingParentError, archive_counts, archive_orders as move_to_archive, restore_orders as restore_from_archive
+from src.cascade import delete_rows, wipe
+from src.compression import CODECS, EXPORT_COMPRESSION, detect_codec, open_export, open_import
+from src.columnar_export import COLUMNAR_BATCH_SIZE, COLUMNAR_FORMATS, export_columnar
+from src.inventory import InsufficientStockError, release as release_stock
+from src.csv_import import IMPORT_BATCH_SIZE, IMPORT_WRITERS, iter_batches, pipelined_upsert, load_data_infile
+from src.id_resolver import IdResolver
+from src.order_summary import ITEM_SEPARATOR, format_items, refresh_orders, refresh_for, refresh_for_query, set_summary_status, sweep_summary_status, remove_orders, rebuild as rebuild_summary
+from src.startup import StartupProfile
+from src.table_render import clear_screen, print_table
+from concurrent.futures import ThreadPoolExecutor, as_completed
+_IMPORT_FINISHED = time.perf_counter()
 
 load_dotenv()
 
+ORDER_PAGE_SIZE = int(os.getenv("CAFEAPP_ORDER_PAGE_SIZE", "20"))
+SELECT_LIST_LIMIT = int(os.getenv("CAFEAPP_SELECT_LIST_LIMIT", "50"))  # longer lists are searched rather than printed when choosing
+EXPORT_TABLES = ('products', 'couriers', 'customers', 'orders', 'order_items')
+SUMMARY_SOURCES = ('products', 'couriers', 'customers')  # tables whose rows are copied into order_summary
+
+# Title, columns, headers, alignment and minimum column widths of the product, courier and customer lists
+CATALOG_SCREENS = {
+    'products': ("Product List:", ('name', 'price', 'inventory'), ["Product Name", "Price", "Inventory"], '<>>', None),
+    'couriers': ("Courier List:", ('name', 'phone'), ["Courier Name", "Phone"], None, [len("Courier Name") + 10, 0]),
+    'customers': ("Customer List:", ('name', 'address', 'phone'), ["Name", "Address", "Phone"], None, [len("Name") + 2, len("Address") + 2, len("Phone") + 2]),
+}
+
 def get_db_connection():
     try:
-        # Establish a connection to the MySQL database using credentials from environment variables
-        conn = mysql.connector.connect(
-            host="localhost",
-            port=3306,
-            user=os.getenv("MYSQL_USER"),
-            password=os.getenv("MYSQL_PASSWORD"),
-            database=os.getenv("MYSQL_DATABASE")
-        )
-        conn.autocommit = True
-        return conn
-    except mysql.connector.Error as err:
+        # Open a connection with the configured storage backend (MySQL by default, or embedded SQLite)
+        return instrument(get_backend().connect())
+    except DB_ERRORS as err:
         # Print error messages and exit if connection fails
         print(f"\033[91mError: {err}\033[0m")
         print("\033[91mPlease ensure that Docker is enabled and the MySQL server is running.\033[0m")
         exit(1)  # Exit the application with a non-zero status
 
+def get_connection_pool():
+    # Shared pool so every terminal component reuses established connections instead of paying the TCP+auth handshake each time
+    return get_pool(get_db_connection)
+
 def get_valid_input(input_type, prompt, error_message, pattern=None, default_value=None, allow_empty=False, cancel_option=False):
     while True:
         value = input(prompt)
@@ -61,9 +92,84 @@ def get_valid_input(input_type, prompt, error_message, pattern=None, default_val
 class CafeApp:
     
     def __init__(self):
-        self.db_conn = get_db_connection()
-        self.order_list = []
-        self.order_status_list = self.load_order_statuses()
+        self.backend = get_backend()
+        self.pool = get_connection_pool()
+        # The connection and order statuses are only fetched when first used (or by the warm-up thread),
+        # so creating the app never waits on the database
+        self._db_conn = None
+        self._db_conn_lock = threading.Lock()
+        self._order_status_list = None
+        self._warm_up = None
+        self._warm_up_error = None
+        self.profile = None
+        self.catalog = CatalogCache()
+        self.product_list = []
+        self.courier_list = []
+        self.customer_list = []
+
+    @property
+    def db_conn(self):
+        if self._db_conn is None:
+            with self._db_conn_lock:
+                if self._db_conn is None:
+                    self._db_conn = self.pool.acquire()
+        return self._db_conn
+
+    @db_conn.setter
+    def db_conn(self, conn):
+        self._db_conn = conn
+
+    @property
+    def order_status_list(self):
+        if self._order_status_list is None:
+            self._order_status_list = self.load_order_statuses()
+        return self._order_status_list
+
+    @order_status_list.setter
+    def order_status_list(self, statuses):
+        self._order_status_list = statuses
+
+    def close(self):
+        # Returns the app's connection to the pool, if it was ever taken
+        if self._db_conn is not None:
+            self.pool.release(self._db_conn)
+            self._db_conn = None
+
+    def start_warm_up(self):
+        # Connects, loads the order statuses and fills the catalog cache on a background thread while the
+        # main menu is already on screen
+        def warm_up():
+            try:
+                start = time.perf_counter()
+                self.db_conn
+                self._profile_duration('connect', start)
+                start = time.perf_counter()
+                self.order_status_list
+                self._profile_duration('statuses', start)
+                start = time.perf_counter()
+                self.load_data()
+                self._profile_duration('catalog', start)
+                if self.profile:
+                    self.profile.since_start('ready')
+            except BaseException as err:
+                # get_db_connection exits on failure; that exit is replayed on the main thread
+                self._warm_up_error = err
+
+        self._warm_up = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+        self._warm_up.start()
+
+    def wait_for_warm_up(self):
+        # Every menu action needs the connection and the cache, so it waits here for the warm-up first
+        if self._warm_up is None:
+            return
+        self._warm_up.join()
+        self._warm_up = None
+        if self._warm_up_error is not None:
+            raise self._warm_up_error
+
+    def _profile_duration(self, phase, start):
+        if self.profile:
+            self.profile.duration(phase, start)
 
     def load_order_statuses(self):
         cursor = self.db_conn.cursor(dictionary=True)
@@ -73,25 +179,15 @@ class CafeApp:
         return [status['order_status'] for status in statuses]
 
     def load_data(self):
-        # Load data from the database into instance variables
-        cursor = self.db_conn.cursor(dictionary=True)
-        
-        cursor.execute("SELECT * FROM products")
-        self.product_list = cursor.fetchall()
-        
-        cursor.execute("SELECT * FROM couriers")
-        self.courier_list = cursor.fetchall()
-        
-        cursor.execute("SELECT * FROM customers")
-        self.customer_list = cursor.fetchall()
-        
-        cursor.execute("SELECT * FROM orders")
-        self.order_list = cursor.fetchall()
-        
-        cursor.close()
+        # Bring the cached collections up to date; only rows changed since the last refresh are transferred
+        self.catalog.refresh(self.db_conn)
+        self.product_list = self.catalog.list('products')
+        self.courier_list = self.catalog.list('couriers')
+        self.customer_list = self.catalog.list('customers')
 
     def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # ANSI sequences rather than a 'clear' subprocess per screen
+        clear_screen()
 
 
 
@@ -191,6 +287,7 @@ class CafeApp:
             "  2. Export Couriers to CSV\n"
             "  3. Export Customers to CSV\n"
             "  4. Export Orders to CSV\n"
+            "  5. Export Everything (parallel)\n"
             f"\033[38;2;226;135;67m{'='*30}\033[0m\033[0m"
         )
         print(export_menu)
@@ -214,33 +311,8 @@ class CafeApp:
 
     def print_product_list(self):
         self.load_data()  # Load the latest data from the database
-        print("\033[93mProduct List:\033[0m")
-        if not self.product_list:
-            print("\033[90mEmpty\033[0m")
-        else:
-            max_name_length = max(len(product['name']) for product in self.product_list)
-            max_price_length = max(len(f"£{product['price']:.2f}") for product in self.product_list)
-            max_inventory_length = max(len(str(product['inventory'])) for product in self.product_list)
-            max_index_length = len(str(len(self.product_list)))
-    
-            headers = ["Product Name", "Price", "Inventory"]
-            col_lengths = [
-                max(max_name_length, len(headers[0])),
-                max(max_price_length, len(headers[1])),
-                max(max_inventory_length, len(headers[2]))
-            ]
-    
-            header = "  ".join([f"{headers[i]:<{col_lengths[i]}}" for i in range(len(headers))])
-            print(f"\033[44;37m{'No.':<{max_index_length}}  {header}\033[0m")  # Blue background and white text for header
-    
-            for i, product in enumerate(self.product_list, start=1):
-                row_color = "\033[47;30m" if i % 2 == 0 else "\033[100;30m"
-                index_str = str(i).ljust(max_index_length)
-                name = product['name'].ljust(col_lengths[0])
-                price = f"£{product['price']:.2f}".rjust(col_lengths[1])
-                inventory = str(product['inventory']).rjust(col_lengths[2])
-                print(f"{row_color}{index_str}  {name}  {price}  {inventory}\033[0m")  # Reset color after each row
-    
+        self.print_catalog('products', self.product_list)
+
     def create_product(self):
         name = get_valid_input(str, "Enter product name (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid name.", cancel_option=True)
         if name == "cancel":
@@ -267,21 +339,20 @@ class CafeApp:
             self.db_conn.commit()
             cursor.close()
             print("\033[92mProduct added successfully!\033[0m")
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             self.db_conn.rollback()
             print(f"\033[91mFailed to add product: {err}\033[0m")
 
     def update_product(self):
-        self.print_product_list()
-        index = get_valid_input(int, "Enter the index of the product to update (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid index.", cancel_option=True)
-        if index == "cancel":
+        self.show_choices('products')
+        answer = input("Enter the index or name of the product to update (\033[90mor type 'cancel' to cancel\033[0m): ")
+        if answer.strip().lower() == "cancel":
             self.clear_screen()
             print("\033[93mProduct update cancelled.\033[0m")
             return
-        index -= 1
 
-        if 0 <= index < len(self.product_list):
-            product = self.product_list[index]
+        product = self.resolve_choice('products', answer)
+        if product is not None:
             product_id = product['id']
             updates = {}
 
@@ -304,19 +375,21 @@ class CafeApp:
                     # Create update query dynamically
                     update_query = ", ".join([f"{k} = %s" for k in updates.keys()])
                     cursor.execute(f"UPDATE products SET {update_query} WHERE id = %s", (*updates.values(), product_id))
+                    if 'name' in updates or 'price' in updates:
+                        refresh_for(cursor, self.backend, 'products', [product_id])
                     self.db_conn.commit()
                     cursor.close()
                     self.clear_screen()
                     print("\033[92mProduct updated successfully!\033[0m")
                     self.load_data()
-                except mysql.connector.Error as err:
+                except DB_ERRORS as err:
                     self.db_conn.rollback()
                     print(f"\033[91mFailed to update product: {err}\033[0m")
             else:
                 self.clear_screen()
                 print("\033[93mNo changes made.\033[0m")
         else:
-            print("\033[91mInvalid product index.\033[0m")
+            print("\033[91mNo matching product.\033[0m")
 
     def delete_product(self):
         self.print_product_list()
@@ -333,21 +406,11 @@ class CafeApp:
                 confirmation = get_valid_input(str, "Are you sure you want to delete all products? (y/n): ", "Invalid input. Please enter 'y' or 'n'.", pattern=r'^(y|n)$')
                 if confirmation.lower() == 'y':
                     try:
-                        cursor = self.db_conn.cursor()
-                        cursor.execute("START TRANSACTION")
-
-                        # Delete all order items and orders associated with products
-                        cursor.execute("DELETE FROM order_items WHERE product_id IN (SELECT id FROM products)")
-                        cursor.execute("DELETE FROM orders WHERE id NOT IN (SELECT DISTINCT order_id FROM order_items)")
-
-                        # Delete all products
-                        cursor.execute("DELETE FROM products")
-                        self.db_conn.commit()
-                        cursor.close()
+                        report = wipe(self.db_conn, self.backend, 'products')
                         self.clear_screen()
-                        print("\033[92mAll products and associated orders deleted successfully!\033[0m")
-                    except mysql.connector.Error as err:
-                        self.db_conn.rollback()
+                        print("\033[92mAll products deleted successfully!\033[0m" if report['soft'] else "\033[92mAll products and associated orders deleted successfully!\033[0m")
+                        self._report_delete(report)
+                    except DB_ERRORS as err:
                         print(f"\033[91mFailed to delete all products: {err}\033[0m")
                 else:
                     self.clear_screen()
@@ -371,26 +434,15 @@ class CafeApp:
                         confirmation = get_valid_input(str, f"Are you sure you want to delete the product '{product['name']}'? (y/n): ", "Invalid input. Please enter 'y' or 'n'.", pattern=r'^(y|n)$')
                         if confirmation.lower() == 'y':
                             try:
-                                cursor = self.db_conn.cursor(dictionary=True)
-                                cursor.execute("START TRANSACTION")
-
-                                # Check for orders containing this product
-                                cursor.execute("SELECT order_id FROM order_items WHERE product_id = %s", (product_id,))
-                                orders = cursor.fetchall()
-
-                                # Delete associated order items and orders if necessary
-                                if orders:
-                                    for order in orders:
-                                        cursor.execute("DELETE FROM order_items WHERE order_id = %s", (order['order_id'],))
-                                        cursor.execute("DELETE FROM orders WHERE id = %s", (order['order_id'],))
-
-                                cursor.execute("DELETE FROM products WHERE id = %s", (product_id,))
-                                self.db_conn.commit()
-                                cursor.close()
+                                # Orders containing the product are removed a chunk at a time, so a popular product does not lock the tills out
+                                report = delete_rows(self.db_conn, 'products', [product_id])
                                 self.clear_screen()
-                                print(f"\033[92mProduct '{product['name']}' and associated orders deleted successfully!\033[0m")
-                            except mysql.connector.Error as err:
-                                self.db_conn.rollback()
+                                if report['soft']:
+                                    print(f"\033[92mProduct '{product['name']}' deleted successfully; its orders are kept.\033[0m")
+                                else:
+                                    print(f"\033[92mProduct '{product['name']}' and associated orders deleted successfully!\033[0m")
+                                self._report_delete(report)
+                            except DB_ERRORS as err:
                                 print(f"\033[91mFailed to delete product: {err}\033[0m")
                         else:
                             self.clear_screen()
@@ -403,29 +455,7 @@ class CafeApp:
 
     def print_courier_list(self):
         self.load_data()  # Ensure data is loaded before printing
-        print("\033[93mCourier List:\033[0m")
-        if not self.courier_list:
-            print("\033[90mEmpty\033[0m")
-        else:
-            max_name_length = max(len(courier['name']) for courier in self.courier_list)
-            max_phone_length = max(len(courier['phone']) for courier in self.courier_list)
-            max_index_length = len(str(len(self.courier_list)))
-
-            headers = ["Courier Name", "Phone"]
-            col_lengths = [
-                max(max_name_length, len(headers[0]) + 10),  # Adding extra padding
-                max(max_phone_length, len(headers[1]))
-            ]
-
-            header = "  ".join([f"{headers[i]:<{col_lengths[i]}}" for i in range(len(headers))])
-            print(f"\033[44;37m{'No.':<{max_index_length}}  {header}\033[0m")  # Blue background and white text for header
-
-            for i, courier in enumerate(self.courier_list, start=1):
-                row_color = "\033[47;30m" if i % 2 == 0 else "\033[100;30m"
-                index_str = str(i).ljust(max_index_length)
-                name = courier['name'].ljust(col_lengths[0])
-                phone = courier['phone'].ljust(col_lengths[1])
-                print(f"{row_color}{index_str}  {name}  {phone}\033[0m")  # Reset color after each row
+        self.print_catalog('couriers', self.courier_list)
 
     def create_courier(self):
         name = get_valid_input(str, "Enter courier name (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid name.", cancel_option=True)
@@ -448,21 +478,20 @@ class CafeApp:
             cursor.close()
             print("\033[92mCourier added successfully!\033[0m")
             self.load_data()
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             self.db_conn.rollback()
             print(f"\033[91mFailed to add courier: {err}\033[0m")
 
     def update_courier(self):
-        self.print_courier_list()
-        index = get_valid_input(int, "Enter the index of the courier to update (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid index.", cancel_option=True)
-        if index == "cancel":
+        self.show_choices('couriers')
+        answer = input("Enter the index or name or phone of the courier to update (\033[90mor type 'cancel' to cancel\033[0m): ")
+        if answer.strip().lower() == "cancel":
             self.clear_screen()
             print("\033[93mCourier update cancelled.\033[0m")
             return
-        index -= 1
 
-        if 0 <= index < len(self.courier_list):
-            courier = self.courier_list[index]
+        courier = self.resolve_choice('couriers', answer)
+        if courier is not None:
             courier_id = courier['id']
             updates = {}
 
@@ -484,19 +513,20 @@ class CafeApp:
                     # Create update query dynamically
                     update_query = ", ".join([f"{k} = %s" for k in updates.keys()])
                     cursor.execute(f"UPDATE couriers SET {update_query} WHERE id = %s", (*updates.values(), courier_id))
+                    refresh_for(cursor, self.backend, 'couriers', [courier_id])
                     self.db_conn.commit()
                     cursor.close()
                     self.clear_screen()
                     print("\033[92mCourier updated successfully!\033[0m")
                     self.load_data()
-                except mysql.connector.Error as err:
+                except DB_ERRORS as err:
                     self.db_conn.rollback()
                     print(f"\033[91mFailed to update courier: {err}\033[0m")
             else:
                 self.clear_screen()
                 print("\033[93mNo changes made.\033[0m")
         else:
-            print("\033[91mInvalid courier index.\033[0m")
+            print("\033[91mNo matching courier.\033[0m")
     
     def delete_courier(self):
         self.print_courier_list()
@@ -513,21 +543,11 @@ class CafeApp:
                 confirmation = get_valid_input(str, "Are you sure you want to delete all couriers? (y/n): ", "Invalid input. Please enter 'y' or 'n'.", pattern=r'^(y|n)$')
                 if confirmation.lower() == 'y':
                     try:
-                        cursor = self.db_conn.cursor()
-                        cursor.execute("START TRANSACTION")
-
-                        # Delete all order items and orders associated with couriers
-                        cursor.execute("DELETE FROM order_items WHERE order_id IN (SELECT id FROM orders WHERE courier IN (SELECT id FROM couriers))")
-                        cursor.execute("DELETE FROM orders WHERE courier IN (SELECT id FROM couriers)")
-
-                        # Delete all couriers
-                        cursor.execute("DELETE FROM couriers")
-                        self.db_conn.commit()
-                        cursor.close()
+                        report = wipe(self.db_conn, self.backend, 'couriers')
                         self.clear_screen()
-                        print("\033[92mAll couriers and associated orders deleted successfully!\033[0m")
-                    except mysql.connector.Error as err:
-                        self.db_conn.rollback()
+                        print("\033[92mAll couriers deleted successfully!\033[0m" if report['soft'] else "\033[92mAll couriers and associated orders deleted successfully!\033[0m")
+                        self._report_delete(report)
+                    except DB_ERRORS as err:
                         print(f"\033[91mFailed to delete all couriers: {err}\033[0m")
                 else:
                     self.clear_screen()
@@ -551,22 +571,14 @@ class CafeApp:
                         confirmation = get_valid_input(str, f"Are you sure you want to delete the courier '{courier['name']}'? (y/n): ", "Invalid input. Please enter 'y' or 'n'.", pattern=r'^(y|n)$')
                         if confirmation.lower() == 'y':
                             try:
-                                cursor = self.db_conn.cursor()
-                                cursor.execute("START TRANSACTION")
-
-                                # Delete associated orders
-                                cursor.execute("DELETE FROM order_items WHERE order_id IN (SELECT id FROM orders WHERE courier = %s)", (courier_id,))
-                                cursor.execute("DELETE FROM orders WHERE courier = %s", (courier_id,))
-
-                                # Delete courier
-                                cursor.execute("DELETE FROM couriers WHERE id = %s", (courier_id,))
-
-                                self.db_conn.commit()
-                                cursor.close()
+                                report = delete_rows(self.db_conn, 'couriers', [courier_id])
                                 self.clear_screen()
-                                print(f"\033[92mCourier '{courier['name']}' and associated orders deleted successfully!\033[0m")
-                            except mysql.connector.Error as err:
-                                self.db_conn.rollback()
+                                if report['soft']:
+                                    print(f"\033[92mCourier '{courier['name']}' deleted successfully; their orders are kept.\033[0m")
+                                else:
+                                    print(f"\033[92mCourier '{courier['name']}' and associated orders deleted successfully!\033[0m")
+                                self._report_delete(report)
+                            except DB_ERRORS as err:
                                 print(f"\033[91mFailed to delete courier: {err}\033[0m")
                         else:
                             self.clear_screen()
@@ -579,32 +591,38 @@ class CafeApp:
 
     def print_customer_list(self):
         self.load_data()  # Ensure data is loaded before printing
-        print("\033[93mCustomer List:\033[0m")
-        if not self.customer_list:
-            print("\033[90mEmpty\033[0m")
+        self.print_catalog('customers', self.customer_list)
+
+    def print_catalog(self, table, rows, title=None):
+        screen_title, columns, headers, align, min_widths = CATALOG_SCREENS[table]
+        cells = [tuple(f"£{row[column]:.2f}" if column == 'price' else str(row[column]) for column in columns) for row in rows]
+        print_table(title or screen_title, headers, cells, align=align, min_widths=min_widths)
+
+    def show_choices(self, table):
+        # Short lists are printed in full; a long one is searched instead of scrolled through
+        self.load_data()
+        rows = self.catalog.list(table)
+        if len(rows) <= SELECT_LIST_LIMIT:
+            self.print_catalog(table, rows)
         else:
-            max_name_length = max(len(customer['name']) for customer in self.customer_list)
-            max_address_length = max(len(customer['address']) for customer in self.customer_list)
-            max_phone_length = max(len(customer['phone']) for customer in self.customer_list)
-            max_index_length = len(str(len(self.customer_list)))
-
-            headers = ["Name", "Address", "Phone"]
-            col_lengths = [
-                max(max_name_length, len(headers[0]) + 2),
-                max(max_address_length, len(headers[1]) + 2),
-                max(max_phone_length, len(headers[2]) + 2)
-            ]
-
-            header = "  ".join([f"{headers[i]:<{col_lengths[i]}}" for i in range(len(headers))])
-            print(f"\033[44;37m{'No.':<{max_index_length}}  {header}\033[0m")  # Blue background and white text for header
-
-            for i, customer in enumerate(self.customer_list, start=1):
-                row_color = "\033[47;30m" if i % 2 == 0 else "\033[100;30m"
-                index_str = str(i).ljust(max_index_length)
-                name = customer['name'].ljust(col_lengths[0])
-                address = customer['address'].ljust(col_lengths[1])
-                phone = customer['phone'].ljust(col_lengths[2])
-                print(f"{row_color}{index_str}  {name}  {address}  {phone}\033[0m")  # Reset color after each row
+            fields = ' or '.join(SEARCH_FIELDS[table])
+            print(f"\033[93m{len(rows)} {table}. Type part of the {fields} to search, or a list number.\033[0m")
+
+    def resolve_choice(self, table, answer):
+        # A list number picks by position; anything else goes to the catalog's search index.
+        # Several matches are listed on their own and one of them is picked by number.
+        rows = self.catalog.list(table)
+        answer = answer.strip()
+        if answer.isdigit() and 1 <= int(answer) <= len(rows):
+            return rows[int(answer) - 1]
+        matches = self.catalog.search(table, answer) if answer else []
+        if len(matches) <= 1:
+            return matches[0] if matches else None
+        self.print_catalog(table, matches, title=f"Matches for '{answer}':")
+        index = get_valid_input(int, "Select a match by its index (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid index.", cancel_option=True)
+        if index == "cancel" or not 1 <= index <= len(matches):
+            return None
+        return matches[index - 1]
 
     def create_customer(self):
         name = get_valid_input(str, "Enter customer name (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid name.", cancel_option=True)
@@ -634,21 +652,20 @@ class CafeApp:
             self.clear_screen()
             print("\033[92mCustomer added successfully!\033[0m")
             self.load_data()
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             self.db_conn.rollback()
             print(f"\033[91mFailed to add customer: {err}\033[0m")
 
     def update_customer(self):
-        self.print_customer_list()
-        index = get_valid_input(int, "Enter the index of the customer to update (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid index.", cancel_option=True)
-        if index == "cancel":
+        self.show_choices('customers')
+        answer = input("Enter the index or name or phone of the customer to update (\033[90mor type 'cancel' to cancel\033[0m): ")
+        if answer.strip().lower() == "cancel":
             self.clear_screen()
             print("\033[93mCustomer update cancelled.\033[0m")
             return
-        index -= 1
 
-        if 0 <= index < len(self.customer_list):
-            customer = self.customer_list[index]
+        customer = self.resolve_choice('customers', answer)
+        if customer is not None:
             customer_id = customer['id']
             updates = {}
 
@@ -670,19 +687,20 @@ class CafeApp:
                     # Create update query dynamically
                     update_query = ", ".join([f"{k} = %s" for k in updates.keys()])
                     cursor.execute(f"UPDATE customers SET {update_query} WHERE id = %s", (*updates.values(), customer_id))
+                    refresh_for(cursor, self.backend, 'customers', [customer_id])
                     self.db_conn.commit()
                     cursor.close()
                     self.clear_screen()
                     print("\033[92mCustomer updated successfully!\033[0m")
                     self.load_data()
-                except mysql.connector.Error as err:
+                except DB_ERRORS as err:
                     self.db_conn.rollback()
                     print(f"\033[91mFailed to update customer: {err}\033[0m")
             else:
                 self.clear_screen()
                 print("\033[93mNo changes made.\033[0m")
         else:
-            print("\033[91mInvalid customer index.\033[0m")
+            print("\033[91mNo matching customer.\033[0m")
 
     def delete_customer(self):
         self.print_customer_list()
@@ -699,21 +717,11 @@ class CafeApp:
                 confirmation = get_valid_input(str, "Are you sure you want to delete all customers? (y/n): ", "Invalid input. Please enter 'y' or 'n'.", pattern=r'^(y|n)$')
                 if confirmation.lower() == 'y':
                     try:
-                        cursor = self.db_conn.cursor()
-                        cursor.execute("START TRANSACTION")
-
-                        # Delete all order items and orders associated with customers
-                        cursor.execute("DELETE FROM order_items WHERE order_id IN (SELECT id FROM orders WHERE customer_id IN (SELECT id FROM customers))")
-                        cursor.execute("DELETE FROM orders WHERE customer_id IN (SELECT id FROM customers)")
-
-                        # Delete all customers
-                        cursor.execute("DELETE FROM customers")
-                        self.db_conn.commit()
-                        cursor.close()
+                        report = wipe(self.db_conn, self.backend, 'customers')
                         self.clear_screen()
-                        print("\033[92mAll customers and associated orders deleted successfully!\033[0m")
-                    except mysql.connector.Error as err:
-                        self.db_conn.rollback()
+                        print("\033[92mAll customers deleted successfully!\033[0m" if report['soft'] else "\033[92mAll customers and associated orders deleted successfully!\033[0m")
+                        self._report_delete(report)
+                    except DB_ERRORS as err:
                         print(f"\033[91mFailed to delete all customers: {err}\033[0m")
                 else:
                     self.clear_screen()
@@ -737,22 +745,14 @@ class CafeApp:
                         confirmation = get_valid_input(str, f"Are you sure you want to delete the customer '{customer['name']}'? (y/n): ", "Invalid input. Please enter 'y' or 'n'.", pattern=r'^(y|n)$')
                         if confirmation.lower() == 'y':
                             try:
-                                cursor = self.db_conn.cursor()
-                                cursor.execute("START TRANSACTION")
-
-                                # Delete associated orders
-                                cursor.execute("DELETE FROM order_items WHERE order_id IN (SELECT id FROM orders WHERE customer_id = %s)", (customer_id,))
-                                cursor.execute("DELETE FROM orders WHERE customer_id = %s", (customer_id,))
-
-                                # Delete customer
-                                cursor.execute("DELETE FROM customers WHERE id = %s", (customer_id,))
-
-                                self.db_conn.commit()
-                                cursor.close()
+                                report = delete_rows(self.db_conn, 'customers', [customer_id])
                                 self.clear_screen()
-                                print(f"\033[92mCustomer '{customer['name']}' and associated orders deleted successfully!\033[0m")
-                            except mysql.connector.Error as err:
-                                self.db_conn.rollback()
+                                if report['soft']:
+                                    print(f"\033[92mCustomer '{customer['name']}' deleted successfully; their orders are kept.\033[0m")
+                                else:
+                                    print(f"\033[92mCustomer '{customer['name']}' and associated orders deleted successfully!\033[0m")
+                                self._report_delete(report)
+                            except DB_ERRORS as err:
                                 print(f"\033[91mFailed to delete customer: {err}\033[0m")
                         else:
                             self.clear_screen()
@@ -763,144 +763,218 @@ class CafeApp:
 
 
 
-    def print_order_list(self):
+    def fetch_order_page(self, after_id=0, status=None, courier_id=None, limit=ORDER_PAGE_SIZE):
+        # Keyset pagination over the denormalised order_summary table: one index range scan per page,
+        # whose cost does not grow with the number of orders before it
+        conditions, params = ["order_id > %s"], [after_id]
+        if status is not None:
+            conditions.append("status = %s")
+            params.append(status)
+        if courier_id is not None:
+            conditions.append("courier_id = %s")
+            params.append(courier_id)
+
         cursor = self.db_conn.cursor(dictionary=True)
-        filter_option = get_valid_input(int, "Filter orders by:\n 0. No Filter\n 1. Status\n 2. Courier\nSelect an option: ", "Invalid input. Please enter a valid option.", pattern=r'^[0-2]$')
+        cursor.execute(f"""
+        SELECT
+            order_id AS id, customer_name, customer_address AS address, customer_phone AS phone,
+            courier_name AS courier, status, items, item_quantities, item_count, total, created_at
+        FROM order_summary
+        WHERE {' AND '.join(conditions)}
+        ORDER BY order_id
+        LIMIT %s
+        """, (*params, limit))
+        orders = cursor.fetchall()
+        cursor.close()
+        for order in orders:
+            order['product'] = format_items(order['items'], order['item_quantities'])
+        return orders
+
+    def print_order_list(self):
+        filter_option = get_valid_input(int, "Filter orders by:\n 0. No Filter\n 1. Status\n 2. Courier\n 3. Status and Courier\nSelect an option: ", "Invalid input. Please enter a valid option.", pattern=r'^[0-3]$')
     
         self.clear_screen()
     
-        filter_clause, filter_value = "", None
-        if filter_option == 1:
+        status_filter, courier_filter = None, None
+        if filter_option in (1, 3):
             for i, status in enumerate(self.order_status_list, start=1):
                 print(f"{i}. {status}")
             status_index = get_valid_input(int, "Enter the index of the status to filter by: ", "Invalid input. Please enter a valid status index.") - 1
             if 0 <= status_index < len(self.order_status_list):
-                filter_clause, filter_value = "WHERE os.order_status = %s", self.order_status_list[status_index]
+                status_filter = self.order_status_list[status_index]
             else:
                 print("\033[91mInvalid status index.\033[0m")
                 return
-        elif filter_option == 2:
+        if filter_option in (2, 3):
             self.print_courier_list()
             courier_index = get_valid_input(int, "Enter the index of the courier to filter by: ", "Invalid input. Please enter a valid courier index.") - 1
             if 0 <= courier_index < len(self.courier_list):
-                filter_clause, filter_value = "WHERE c.id = %s", self.courier_list[courier_index]['id']
+                courier_filter = self.courier_list[courier_index]['id']
             else:
                 print("\033[91mInvalid courier index.\033[0m")
                 return
+
+        # Each entry is the last order id before that page; page 1 starts after id 0
+        page_starts = [0]
+        self.order_index_map = {}
+        while True:
+            page_number = len(page_starts)
+            # One extra row tells us whether there is a next page
+            orders = self.fetch_order_page(page_starts[-1], status_filter, courier_filter, ORDER_PAGE_SIZE + 1)
+            has_next_page = len(orders) > ORDER_PAGE_SIZE
+            orders = orders[:ORDER_PAGE_SIZE]
+
+            first_number = (page_number - 1) * ORDER_PAGE_SIZE + 1
+            self.order_index_map = {first_number + i: order['id'] for i, order in enumerate(orders)}
     
-        query = f"""
-        SELECT 
-            o.id, cu.name AS customer_name, cu.address AS address, cu.phone AS phone, 
-            c.name AS courier, os.order_status AS status, 
-            GROUP_CONCAT(p.name ORDER BY p.id ASC SEPARATOR ', ') AS product
-        FROM orders o
-        LEFT JOIN customers cu ON o.customer_id = cu.id
-        LEFT JOIN couriers c ON o.courier = c.id
-        LEFT JOIN order_status os ON o.status = os.id
-        LEFT JOIN order_items oi ON o.id = oi.order_id
-        LEFT JOIN products p ON oi.product_id = p.id
-        {filter_clause}
-        GROUP BY o.id
-        """
-    
-        cursor.execute(query, (filter_value,) if filter_clause else None)
-        orders = cursor.fetchall()
-        cursor.close()
-    
-        self.order_index_map = {i + 1: order['id'] for i, order in enumerate(orders)}
-    
-        self.clear_screen()
-        print("\033[93mOrder List:\033[0m")
-        if not orders:
-            print("\033[90mEmpty\033[0m")
-        else:
-            headers = ["Customer Name", "Address", "Phone", "Courier", "Status", "Product"]
-            col_lengths = [max(len(str(order[key.lower().replace(" ", "_")])) for order in orders) for key in headers]
-    
-            header = "  ".join([f"{key:<{col_lengths[i]}}" for i, key in enumerate(headers)])
-            print(f"\033[44;37m{'No.':<4}  {header}\033[0m")  # Blue background and white text for header
-    
-            for i, order in enumerate(orders, start=1):
-                row_color = "\033[47;30m" if i % 2 == 0 else "\033[100;30m"
-                order_values = [str(order[key.lower().replace(" ", "_")]).ljust(col_lengths[j]) for j, key in enumerate(headers)]
-                print(f"{row_color}{i:<4}  {'  '.join(order_values)}\033[0m")  # Reset color after each row
+            self.clear_screen()
+            headers = ["Customer Name", "Address", "Phone", "Courier", "Status", "Product", "Total"]
+            rows = [[str(order[key.lower().replace(" ", "_")]) for key in headers] for order in orders]
+            # Pages are already ORDER_PAGE_SIZE rows, so the renderer's own pager is not needed
+            print_table(f"Order List (page {page_number}):", headers, rows, start=first_number, page=False)
+
+            if not has_next_page and page_number == 1:
+                break
+            navigation = []
+            if has_next_page:
+                navigation.append("[n] Next page")
+            if page_number > 1:
+                navigation.append("[p] Previous page")
+            choice = input(f"{'  '.join(navigation)}  [Enter] Continue: ").strip().lower()
+            if choice == 'n' and has_next_page:
+                page_starts.append(orders[-1]['id'])
+            elif choice == 'p' and page_number > 1:
+                page_starts.pop()
+            elif choice == '':
+                break
 
     def create_order(self):
-        self.print_customer_list()
-        customer_index = get_valid_input(int, "Select a customer by their index (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid customer index.", cancel_option=True) - 1
-        if customer_index == "cancel":
+        self.show_choices('customers')
+        answer = input("Select a customer by index, name or phone (\033[90mor type 'cancel' to cancel\033[0m): ")
+        if answer.strip().lower() == "cancel":
             self.clear_screen()
             print("\033[93mOrder creation cancelled.\033[0m")
             return
 
-        if 0 <= customer_index < len(self.customer_list):
-            selected_customer = self.customer_list[customer_index]['id']
-        else:
-            print("\033[91mInvalid customer index.\033[0m")
+        customer = self.resolve_choice('customers', answer)
+        if customer is None:
+            print("\033[91mNo matching customer.\033[0m")
             return
+        selected_customer = customer['id']
 
         self.clear_screen()
-        self.print_product_list()
-        item_indices = input("Select products by index (comma-separated) (\033[90mor type 'cancel' to cancel\033[0m): ").split(',')
-        if 'cancel' in [index.strip().lower() for index in item_indices]:
+        self.show_choices('products')
+        answers = input("Select products by index or name (comma-separated) (\033[90mor type 'cancel' to cancel\033[0m): ").split(',')
+        if 'cancel' in [answer.strip().lower() for answer in answers]:
             self.clear_screen()
             print("\033[93mOrder creation cancelled.\033[0m")
             return
 
         selected_items = []
-        for index in item_indices:
-            try:
-                index = int(index.strip()) - 1
-                if 0 <= index < len(self.product_list):
-                    selected_items.append(self.product_list[index]['id'])
-                else:
-                    print(f"\033[91mInvalid product index: {index + 1}\033[0m")
-            except ValueError:
-                print(f"\033[91mInvalid input: {index}\033[0m")
+        for answer in answers:
+            product = self.resolve_choice('products', answer)
+            if product is not None:
+                selected_items.append(product['id'])
+            else:
+                print(f"\033[91mNo matching product: {answer.strip()}\033[0m")
 
         if not selected_items:
             print("\033[91mNo valid products selected.\033[0m")
             return
 
         self.clear_screen()
-        self.print_courier_list()
-        courier_index = get_valid_input(int, "Enter courier index (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid courier index.", cancel_option=True) - 1
-        if courier_index == "cancel":
+        self.show_choices('couriers')
+        answer = input("Select a courier by index, name or phone (\033[90mor type 'cancel' to cancel\033[0m): ")
+        if answer.strip().lower() == "cancel":
             self.clear_screen()
             print("\033[93mOrder creation cancelled.\033[0m")
             return
 
-        if 0 <= courier_index < len(self.courier_list):
-            selected_courier = self.courier_list[courier_index]['id']
-        else:
-            print("\033[91mInvalid courier index.\033[0m")
+        courier = self.resolve_choice('couriers', answer)
+        if courier is None:
+            print("\033[91mNo matching courier.\033[0m")
             return
+        selected_courier = courier['id']
 
         status = 1  # Default status 'PREPARING'
 
-        try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("START TRANSACTION")
-
-            cursor.execute("INSERT INTO orders (customer_id, courier, status) VALUES (%s, %s, %s)",
-                           (selected_customer, selected_courier, status))
-            order_id = cursor.lastrowid
-            for product_id in selected_items:
-                cursor.execute("INSERT INTO order_items (order_id, product_id) VALUES (%s, %s)", (order_id, product_id))
-                # Update inventory
-                cursor.execute("UPDATE products SET inventory = inventory - 1 WHERE id = %s", (product_id,))
+        def place_order(cursor):
+            # Order, items and inventory are written with three statements regardless of the item count
+            order_id = write_order(cursor, selected_customer, selected_courier, selected_items, status)
+            refresh_orders(cursor, self.backend, [order_id])
 
-            self.db_conn.commit()
-            cursor.close()
+        try:
+            run_in_transaction(self.db_conn, place_order)
             self.load_data()
 
             # Clear screen before displaying success message
             self.clear_screen()
             print("\033[92mOrder added successfully!\033[0m")
-        except mysql.connector.Error as err:
-            self.db_conn.rollback()
+        except (*DB_ERRORS, InsufficientStockError) as err:
             print(f"\033[91mFailed to create order: {err}\033[0m")
 
+    def create_orders_bulk(self, orders, batch_size=1000):
+        # Non-interactive order creation. Each order is a dict with 'customer_id', 'courier_id',
+        # 'product_ids' and an optional 'status'; every batch is written in one transaction, and a
+        # batch whose stock cannot all be reserved is not written at all.
+        orders = list(orders)
+        order_ids = []
+
+        def write_batch(cursor, batch):
+            batch_ids = write_orders(cursor, batch)
+            refresh_orders(cursor, self.backend, batch_ids)
+            return batch_ids
+
+        try:
+            for start in range(0, len(orders), batch_size):
+                batch = orders[start:start + batch_size]
+                order_ids.extend(run_in_transaction(self.db_conn, lambda cursor: write_batch(cursor, batch)))
+        except (*DB_ERRORS, InsufficientStockError) as err:
+            print(f"\033[91mFailed to create orders: {err}\033[0m")
+        return order_ids
+
+    def get_status_id(self, status):
+        cursor = self.db_conn.cursor()
+        cursor.execute("SELECT id FROM order_status WHERE order_status = %s ORDER BY id", (status,))
+        rows = cursor.fetchall()
+        cursor.close()
+        if not rows:
+            raise ValueError(f"Unknown order status: {status}")
+        return rows[0][0]
+
+    def set_order_status(self, order_ids, status):
+        # Non-interactive status change for the given order ids; returns the number of orders updated
+        status_id = self.get_status_id(status)
+        order_ids = list(order_ids)
+        cursor = self.db_conn.cursor()
+        try:
+            cursor.execute("START TRANSACTION")
+            updated = set_status(cursor, self.backend, order_ids, status_id)
+            set_summary_status(cursor, order_ids, status_id)
+            self.db_conn.commit()
+        except DB_ERRORS:
+            self.db_conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return updated
+
+    def sweep_order_status(self, from_status, to_status):
+        # Moves every order in one status to another with a single set-based UPDATE
+        from_id, to_id = self.get_status_id(from_status), self.get_status_id(to_status)
+        cursor = self.db_conn.cursor()
+        try:
+            cursor.execute("START TRANSACTION")
+            updated = sweep_status(cursor, self.backend, from_id, to_id)
+            sweep_summary_status(cursor, from_id, to_id)
+            self.db_conn.commit()
+        except DB_ERRORS:
+            self.db_conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return updated
+
     def update_order_status(self):
         self.print_order_list()
         display_order_id = get_valid_input(int, "Enter the order ID to update (\033[90mor type 'cancel' to cancel\033[0m): ", "Invalid input. Please enter a valid ID.", cancel_option=True)
@@ -927,14 +1001,10 @@ class CafeApp:
         if 0 <= status_index < len(self.order_status_list):
             new_status = self.order_status_list[status_index]
             try:
-                cursor = self.db_conn.cursor()
-                cursor.execute("START TRANSACTION")
-                cursor.execute("UPDATE orders SET status = %s WHERE id = %s", (new_status, actual_order_id))
-                self.db_conn.commit()
-                cursor.close()
+                self.set_order_status([actual_order_id], new_status)
                 self.load_data()
                 print("\033[92mOrder status updated successfully!\033[0m")
-            except mysql.connector.Error as err:
+            except DB_ERRORS as err:
                 self.db_conn.rollback()
                 print(f"\033[91mFailed to update order status: {err}\033[0m")
         else:
@@ -959,85 +1029,77 @@ class CafeApp:
         order = cursor.fetchone()
         cursor.close()
 
-        if order:
-            try:
-                cursor = self.db_conn.cursor()
-                cursor.execute("START TRANSACTION")
+        if not order:
+            print("\033[91mInvalid order ID.\033[0m")
+            return
 
-                self.clear_screen()
-                self.print_customer_list()
-                customer_index = get_valid_input(int, f"Select a new customer by index (\033[90mor type 'cancel' to cancel\033[0m) (Leave blank to keep current): ", "Invalid input. Please enter a valid index.", allow_empty=True, cancel_option=True)
-                if customer_index == "cancel":
-                    self.clear_screen()
-                    print("\033[93mOrder update cancelled.\033[0m")
-                    return
+        # Every answer is collected before anything is written, so cancelling leaves the order untouched and
+        # no product rows are locked while the user is typing
+        self.clear_screen()
+        self.show_choices('customers')
+        answer = input("Select a new customer by index, name or phone (\033[90mor type 'cancel' to cancel\033[0m) (Leave blank to keep current): ")
+        if answer.strip().lower() == "cancel":
+            self.clear_screen()
+            print("\033[93mOrder update cancelled.\033[0m")
+            return
 
-                if customer_index:
-                    customer_index -= 1
-                    if 0 <= customer_index < len(self.customer_list):
-                        order['customer_id'] = self.customer_list[customer_index]['id']
+        if answer.strip():
+            customer = self.resolve_choice('customers', answer)
+            if customer is not None:
+                order['customer_id'] = customer['id']
 
-                self.clear_screen()
-                self.print_product_list()
-                selected_product_indices = input(f"Select new products by index (\033[90mor type 'cancel' to cancel\033[0m) (Leave blank to keep current): ")
-                if selected_product_indices.lower() == "cancel":
-                    self.clear_screen()
-                    print("\033[93mOrder update cancelled.\033[0m")
-                    return
+        self.clear_screen()
+        self.show_choices('products')
+        answers = input("Select new products by index or name (\033[90mor type 'cancel' to cancel\033[0m) (Leave blank to keep current): ")
+        if answers.strip().lower() == "cancel":
+            self.clear_screen()
+            print("\033[93mOrder update cancelled.\033[0m")
+            return
 
-                # Validate product indices
-                if selected_product_indices:
-                    valid_product_ids = {product['id'] for product in self.product_list}
-                    selected_indices = [idx.strip() for idx in selected_product_indices.split(',') if idx.strip().isdigit()]
-                    items = []
-                    invalid_indices = []
-
-                    for idx in selected_indices:
-                        idx = int(idx)
-                        if 1 <= idx <= len(self.product_list):
-                            product_id = self.product_list[idx - 1]['id']
-                            if product_id in valid_product_ids:
-                                items.append(product_id)
-                            else:
-                                invalid_indices.append(str(idx))
-                        else:
-                            invalid_indices.append(str(idx))
+        # Every entry must resolve to a product, otherwise the items are left as they were
+        items = None
+        if answers.strip():
+            items = []
+            invalid = []
+            for answer in filter(str.strip, answers.split(',')):
+                product = self.resolve_choice('products', answer)
+                if product is not None:
+                    items.append(product['id'])
+                else:
+                    invalid.append(answer.strip())
 
-                    if invalid_indices:
-                        print(f"\033[91mInvalid product indices: {', '.join(invalid_indices)}\033[0m")
-                        return
+            if invalid:
+                print(f"\033[91mNo matching products: {', '.join(invalid)}\033[0m")
+                return
 
-                    cursor.execute("DELETE FROM order_items WHERE order_id = %s", (actual_order_id,))
-                    for product_id in items:
-                        cursor.execute("INSERT INTO order_items (order_id, product_id) VALUES (%s, %s)", (actual_order_id, product_id))
-                        cursor.execute("UPDATE products SET inventory = inventory - 1 WHERE id = %s", (product_id,))
+        self.clear_screen()
+        self.show_choices('couriers')
+        answer = input("Select a new courier by index, name or phone (\033[90mor type 'cancel' to cancel\033[0m) (Leave blank to keep current): ")
+        if answer.strip().lower() == "cancel":
+            self.clear_screen()
+            print("\033[93mOrder update cancelled.\033[0m")
+            return
 
-                self.clear_screen()
-                self.print_courier_list()
-                courier_index = get_valid_input(int, f"Select new courier by index (\033[90mor type 'cancel' to cancel\033[0m) (Leave blank to keep current): ", "Invalid input. Please enter a valid index.", allow_empty=True, cancel_option=True)
-                if courier_index == "cancel":
-                    self.clear_screen()
-                    print("\033[93mOrder update cancelled.\033[0m")
-                    return
+        if answer.strip():
+            courier = self.resolve_choice('couriers', answer)
+            if courier is not None:
+                order['courier'] = courier['id']
 
-                if courier_index:
-                    courier_index -= 1
-                    if 0 <= courier_index < len(self.courier_list):
-                        order['courier'] = self.courier_list[courier_index]['id']
+        def write_update(cursor):
+            if items is not None:
+                replace_order_items(cursor, actual_order_id, items)
+            cursor.execute("UPDATE orders SET customer_id = %s, courier = %s WHERE id = %s",
+                           (order['customer_id'], order['courier'], actual_order_id))
+            refresh_orders(cursor, self.backend, [actual_order_id])
+
+        try:
+            run_in_transaction(self.db_conn, write_update)
+            self.load_data()
+            self.clear_screen()
+            print("\033[92mOrder updated successfully!\033[0m")
+        except (*DB_ERRORS, InsufficientStockError) as err:
+            print(f"\033[91mFailed to update order: {err}\033[0m")
 
-                cursor.execute("UPDATE orders SET customer_id = %s, courier = %s WHERE id = %s",
-                               (order['customer_id'], order['courier'], actual_order_id))
-                self.db_conn.commit()
-                cursor.close()
-                self.load_data()
-                self.clear_screen()
-                print("\033[92mOrder updated successfully!\033[0m")
-            except mysql.connector.Error as err:
-                self.db_conn.rollback()
-                print(f"\033[91mFailed to update order: {err}\033[0m")
-        else:
-            print("\033[91mInvalid order ID.\033[0m")
-    
     def delete_order(self):
         self.print_order_list()
         while True:
@@ -1053,18 +1115,11 @@ class CafeApp:
                 confirmation = get_valid_input(str, "Are you sure you want to delete all orders? (y/n): ", "Invalid input. Please enter 'y' or 'n'.", pattern=r'^(y|n)$')
                 if confirmation.lower() == 'y':
                     try:
-                        cursor = self.db_conn.cursor()
-                        cursor.execute("START TRANSACTION")
-
-                        # Delete all order items and orders
-                        cursor.execute("DELETE FROM order_items")
-                        cursor.execute("DELETE FROM orders")
-                        self.db_conn.commit()
-                        cursor.close()
+                        report = wipe(self.db_conn, self.backend, 'orders')
                         self.clear_screen()
                         print("\033[92mAll orders deleted successfully!\033[0m")
-                    except mysql.connector.Error as err:
-                        self.db_conn.rollback()
+                        self._report_delete(report)
+                    except DB_ERRORS as err:
                         print(f"\033[91mFailed to delete all orders: {err}\033[0m")
                 else:
                     self.clear_screen()
@@ -1074,7 +1129,7 @@ class CafeApp:
                 all_valid = True
                 for index in indices:
                     index = index.strip()
-                    if not index.isdigit() or not (0 < int(index) <= len(self.order_index_map)):
+                    if not index.isdigit() or int(index) not in self.order_index_map:
                         print(f"\033[91mInvalid input: {index}\033[0m")
                         all_valid = False
                         break
@@ -1090,19 +1145,19 @@ class CafeApp:
                                     cursor = self.db_conn.cursor(dictionary=True)
                                     cursor.execute("START TRANSACTION")
 
-                                    cursor.execute("SELECT product_id FROM order_items WHERE order_id = %s", (actual_order_id,))
-                                    product_ids = cursor.fetchall()
+                                    cursor.execute("SELECT product_id, quantity FROM order_items WHERE order_id = %s", (actual_order_id,))
+                                    quantities = {item['product_id']: item['quantity'] for item in cursor.fetchall()}
 
                                     cursor.execute("DELETE FROM order_items WHERE order_id = %s", (actual_order_id,))
-                                    for product in product_ids:
-                                        cursor.execute("UPDATE products SET inventory = inventory + 1 WHERE id = %s", (product['product_id'],))
+                                    release_stock(cursor, quantities)
                                     cursor.execute("DELETE FROM orders WHERE id = %s", (actual_order_id,))
+                                    remove_orders(cursor, [actual_order_id])
 
                                     self.db_conn.commit()
                                     cursor.close()
                                     self.clear_screen()
                                     print(f"\033[92mOrder ID {index} deleted successfully!\033[0m")
-                                except mysql.connector.Error as err:
+                                except DB_ERRORS as err:
                                     self.db_conn.rollback()
                                     print(f"\033[91mFailed to delete order: {err}\033[0m")
                             else:
@@ -1117,65 +1172,146 @@ class CafeApp:
 
 
 
-    def export_to_csv(self, table_name, file_name):
-        cursor = self.db_conn.cursor(dictionary=True)
-
-        if table_name == 'orders':
-            # Create a complex query to export order data with related customer, courier, and product information
-            query = """
-            SELECT
-                o.id,
-                cu.name AS customer_name,
-                cu.address AS customer_address,
-                cu.phone AS customer_phone,
-                co.name AS courier_name,
-                co.phone AS courier_phone,
-                os.order_status AS status,
-                GROUP_CONCAT(p.name ORDER BY p.id ASC SEPARATOR ', ') AS products,
-                GROUP_CONCAT(p.price ORDER BY p.id ASC SEPARATOR ', ') AS product_prices
-            FROM orders o
-            JOIN customers cu ON o.customer_id = cu.id
-            JOIN couriers co ON o.courier = co.id
-            JOIN order_status os ON o.status = os.id
-            JOIN order_items oi ON o.id = oi.order_id
-            JOIN products p ON oi.product_id = p.id
-            GROUP BY o.id
-            """
-            cursor.execute(query)
-        else:
-            cursor.execute(f"SELECT * FROM {table_name}")
-
-        rows = cursor.fetchall()
-        cursor.close()
-
+    def export_to_csv(self, table_name, file_name, chunk_size=5000, progress=True, include_archive=False, compression=EXPORT_COMPRESSION):
         # Ensure the export directory exists
         export_dir = "export"
         if not os.path.exists(export_dir):
             os.makedirs(export_dir)
 
+        if compression and not file_name.endswith(CODECS[compression]):
+            file_name += CODECS[compression]
         file_path = os.path.join(export_dir, file_name)
 
-        with open(file_path, 'w', newline='') as file:
-            if rows:
-                writer = csv.DictWriter(file, fieldnames=rows[0].keys())
-                writer.writeheader()
-                writer.writerows(rows)
-            else:
-                # Fetch column names from the table schema
-                if table_name == 'orders':
-                    columns = ['customer_name', 'customer_address', 'customer_phone', 'courier_name', 'courier_phone', 'status', 'products', 'product_prices']
-                else:
-                    cursor = self.db_conn.cursor()
-                    cursor.execute(f"DESCRIBE {table_name}")
-                    columns = [column[0] for column in cursor.fetchall()]
-                    cursor.close()
-
+        params = ()
+        if table_name == 'orders':
+            # Order data with customer, courier and product details comes from the denormalised summary;
+            # its item lists are written comma-separated for people reading the file
+            query = f"""
+            SELECT
+                order_id AS id, customer_name, customer_address, customer_phone,
+                courier_name, courier_phone, status, REPLACE(items, %s, ', ') AS products,
+                REPLACE(item_quantities, %s, ', ') AS product_quantities,
+                REPLACE(item_prices, %s, ', ') AS product_prices, created_at
+            FROM {'order_summary_all' if include_archive else 'order_summary'}
+            ORDER BY order_id
+            """
+            params = (ITEM_SEPARATOR,) * 3
+        elif table_name == 'order_items' and include_archive:
+            query = "SELECT * FROM order_items_all ORDER BY order_id, product_id"
+        else:
+            query = f"SELECT * FROM {table_name}"
+
+        # Stream rows from an unbuffered cursor on a pooled connection so memory stays flat
+        # however large the table is, and the app's own connection stays free
+        rows_written = 0
+        start = time.perf_counter()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            cursor.execute(query, params)
+            # Column names come from the result metadata, so empty tables still get a header
+            columns = [column[0] for column in cursor.description]
+
+            # Compressed files are written by a worker thread, so fetching carries on while a block compresses
+            with open_export(file_path, compression) as file:
                 writer = csv.DictWriter(file, fieldnames=columns)
                 writer.writeheader()
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    writer.writerows(rows)
+                    rows_written += len(rows)
+                    if not progress:
+                        continue
+                    elapsed = time.perf_counter() - start
+                    print(f"\rExported {rows_written} rows ({rows_written / elapsed if elapsed else 0:.0f} rows/sec)", end="", flush=True)
+            cursor.close()
 
-        print(f"\033[92mData exported to {file_path} successfully!\033[0m")
-    
-    def import_from_csv(self, table_name, file_name):
+        elapsed = time.perf_counter() - start
+        if rows_written and progress:
+            print()
+        size = f", {file.raw_bytes / 1e6:.1f} MB compressed to {file.compressed_bytes / 1e6:.1f} MB" if compression else ""
+        print(f"\033[92mData exported to {file_path} successfully! ({rows_written} rows in {elapsed:.2f}s{size})\033[0m")
+        return rows_written
+
+    def export_columnar(self, table_name, file_name=None, fmt='parquet', chunk_size=COLUMNAR_BATCH_SIZE, progress=True, include_archive=False, compression=None):
+        # Parquet or Arrow IPC with typed columns; orders leave their items to the order_items export
+        os.makedirs("export", exist_ok=True)
+        file_path = os.path.join("export", file_name or f"{table_name}{COLUMNAR_FORMATS.get(fmt, '')}")
+        start = time.perf_counter()
+
+        def report_batch(rows_written):
+            elapsed = time.perf_counter() - start
+            print(f"\rExported {rows_written} rows ({rows_written / elapsed if elapsed else 0:.0f} rows/sec)", end="", flush=True)
+
+        with self.pool.connection() as conn:
+            rows_written = export_columnar(conn, table_name, file_path, fmt, chunk_size, include_archive, report_batch if progress else None, compression)
+
+        elapsed = time.perf_counter() - start
+        if rows_written and progress:
+            print()
+        print(f"\033[92mData exported to {file_path} successfully! ({rows_written} rows in {elapsed:.2f}s)\033[0m")
+        return rows_written
+
+    def export_all(self, tables=EXPORT_TABLES, chunk_size=5000, workers=None, include_archive=False, fmt='csv', compression=EXPORT_COMPRESSION):
+        # Exports every table at once: each worker streams one table on its own pooled connection.
+        # The app keeps its own connection, so at most one worker fewer than the pool size is used; more would
+        # only wait on pool checkouts and could time out.
+        limit = max(1, min(len(tables), self.pool.size - 1))
+        if workers and workers > limit:
+            print(f"\033[93mUsing {limit} workers instead of {workers}: the connection pool holds {self.pool.size} connections (CAFEAPP_POOL_SIZE).\033[0m")
+        workers = min(workers or limit, limit)
+        results = {}
+        start = time.perf_counter()
+
+        # Parquet and Arrow compress inside the file, so only CSV names get a codec suffix
+        extension = '.csv' + (CODECS[compression] if compression else '') if fmt == 'csv' else COLUMNAR_FORMATS[fmt]
+
+        def export_table(table_name):
+            table_start = time.perf_counter()
+            if fmt == 'csv':
+                rows = self.export_to_csv(table_name, f"{table_name}.csv", chunk_size, progress=False, include_archive=include_archive, compression=compression)
+            else:
+                rows = self.export_columnar(table_name, fmt=fmt, progress=False, include_archive=include_archive, compression=compression)
+            return rows, time.perf_counter() - table_start
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export') as executor:
+            futures = {executor.submit(export_table, table_name): table_name for table_name in tables}
+            for future in as_completed(futures):
+                table_name = futures[future]
+                entry = {'table': table_name, 'file': f"{table_name}{extension}"}
+                try:
+                    entry['rows'], entry['seconds'] = future.result()
+                    entry['status'] = 'ok'
+                # A table that waited too long for a pooled connection fails alone; the rest still get a manifest
+                except (*DB_ERRORS, OSError, ValueError, PoolTimeoutError) as err:
+                    entry.update(rows=0, seconds=None, status='failed', error=str(err))
+                    print(f"\033[91mFailed to export {table_name}: {err}\033[0m")
+                results[table_name] = entry
+
+        elapsed = time.perf_counter() - start
+        manifest = {
+            'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'backend': self.backend.name,
+            'format': fmt,
+            'compression': compression,
+            'workers': workers,
+            'total_seconds': round(elapsed, 3),
+            'tables': [results[table_name] for table_name in tables],
+        }
+        os.makedirs("export", exist_ok=True)
+        manifest_path = os.path.join("export", "manifest.json")
+        with open(manifest_path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+
+        print(f"\n\033[93m{'table':<14}{'rows':>10}{'seconds':>10}\033[0m")
+        for entry in manifest['tables']:
+            seconds = f"{entry['seconds']:.2f}" if entry['seconds'] is not None else 'failed'
+            print(f"{entry['table']:<14}{entry['rows']:>10}{seconds:>10}")
+        print(f"\033[92mExported {len(tables)} tables in {elapsed:.2f}s with {workers} workers. Manifest written to {manifest_path}\033[0m")
+        return manifest
+
+    def import_from_csv(self, table_name, file_name, batch_size=IMPORT_BATCH_SIZE, use_load_data=False, writers=IMPORT_WRITERS):
         # Ensure the import directory exists
         import_dir = "import"
         if not os.path.exists(import_dir):
@@ -1185,130 +1321,217 @@ class CafeApp:
 
         if not os.path.exists(file_path):
             print(f"\033[91mFile '{file_path}' does not exist.\033[0m")
-            return
+            return False
 
-        with open(file_path, 'r') as file:
+        # The file is streamed, and decompressed on the fly if it is gzip or zstd; only one batch of rows is held in memory at a time
+        compressed = detect_codec(file_path)
+        with open_import(file_path) as file:
             reader = csv.DictReader(file)
-            rows = list(reader)
-
-        if not rows:
-            print(f"\033[91mFile '{file_path}' is empty or has invalid content.\033[0m")
-            return
-
-        cursor = self.db_conn.cursor()
-
-        if table_name == 'orders':
-            for row in rows:
-                customer_id = self.get_or_create_id('customers', {'name': row['customer_name'], 'address': row['customer_address'], 'phone': row['customer_phone']})
-                courier_id = self.get_or_create_id('couriers', {'name': row['courier_name'], 'phone': row['courier_phone']})
-                status_id = self.get_or_create_id('order_status', {'order_status': row['status']})
-                product_names = row['products'].split(', ')
-                product_prices = row['product_prices'].split(', ')
-
-                if customer_id is None or courier_id is None or status_id is None:
-                    print(f"\033[91mError: Could not resolve IDs for row: {row}\033[0m")
-                    continue
-
-                # Prepare the row data for insertion
-                order_data = {
-                    'customer_id': customer_id,
-                    'courier': courier_id,
-                    'status': status_id,
-                }
-
-                # Construct the query
-                columns = order_data.keys()
-                placeholders = ', '.join(['%s'] * len(columns))
-                columns_str = ', '.join(columns)
-                update_placeholders = ', '.join([f"{col} = VALUES({col})" for col in columns])
-
-                values = tuple(order_data.values())
-                query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders}) " \
-                        f"ON DUPLICATE KEY UPDATE {update_placeholders}"
+            first_row = next(reader, None)
+            if first_row is None:
+                print(f"\033[91mFile '{file_path}' is empty or has invalid content.\033[0m")
+                return False
+            rows = itertools.chain([first_row], reader)
+
+            # Rows that carry an id may update a customer, courier or product already shown on orders
+            changed_ids = []
+            if table_name in SUMMARY_SOURCES and 'id' in reader.fieldnames:
+                rows = (changed_ids.append(row['id']) or row for row in rows)
+
+            start = time.perf_counter()
+            if table_name == 'orders':
+                if not self._import_orders(rows, batch_size):
+                    return False
+            else:
                 try:
-                    cursor.execute(query, values)
-                    order_id = cursor.lastrowid if cursor.lastrowid != 0 else self.get_existing_order_id(cursor, customer_id, courier_id, status_id)
-
-                    # Insert products
-                    cursor.execute("DELETE FROM order_items WHERE order_id = %s", (order_id,))
-                    for product_name, product_price in zip(product_names, product_prices):
-                        product_id = self.get_or_create_id('products', {'name': product_name, 'price': product_price})
-                        if product_id:
-                            cursor.execute("INSERT INTO order_items (order_id, product_id) VALUES (%s, %s)", (order_id, product_id))
-                except mysql.connector.Error as err:
+                    pipeline = None
+                    if use_load_data and not self.backend.supports_load_data:
+                        print(f"\033[93mLOAD DATA is not available on the {self.backend.name} backend, using batched inserts.\033[0m")
+                    elif use_load_data and compressed:
+                        print(f"\033[93mLOAD DATA cannot read {compressed} files, using batched inserts.\033[0m")
+                    if use_load_data and self.backend.supports_load_data and not compressed:
+                        # The rows never pass through Python, so the orders to re-summarise are found from the staging table
+                        refresh_summaries = None
+                        if table_name in SUMMARY_SOURCES and 'id' in reader.fieldnames:
+                            refresh_summaries = lambda cursor: refresh_for_query(cursor, self.backend, table_name, "SELECT id FROM import_stage")
+                        imported = load_data_infile(self.db_conn, table_name, os.path.abspath(file_path), reader.fieldnames, on_staged=refresh_summaries)
+                    else:
+                        pipeline = pipelined_upsert(self.pool, table_name, rows, reader.fieldnames, batch_size, writers=writers, on_batch=self._report_import_batch, backend=self.backend)
+                        imported = pipeline['rows']
+                except (*DB_ERRORS, ValueError) as err:
                     print(f"\033[91mError: {err}\033[0m")
                     self.db_conn.rollback()
-                    cursor.close()
-                    return
+                    return False
+                elapsed = time.perf_counter() - start
+                print(f"Imported {imported} rows in {elapsed:.2f}s ({imported / elapsed if elapsed else 0:.0f} rows/sec)")
+                if pipeline:
+                    self._report_pipeline(pipeline)
 
-        else:
-            columns = rows[0].keys()
-            placeholders = ', '.join(['%s'] * len(columns))
-            columns_str = ', '.join(columns)
-            update_placeholders = ', '.join([f"{col} = VALUES({col})" for col in columns])
-
-            for row in rows:
-                values = tuple(row.values())
-                query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders}) " \
-                        f"ON DUPLICATE KEY UPDATE {update_placeholders}"
-                try:
-                    cursor.execute(query, values)
-                except mysql.connector.Error as err:
-                    print(f"\033[91mError: {err}\033[0m")
-                    self.db_conn.rollback()
-                    cursor.close()
-                    return
-
-        self.db_conn.commit()
-        cursor.close()
+                if pipeline and table_name in SUMMARY_SOURCES and 'id' in reader.fieldnames:
+                    try:
+                        self._refresh_summaries_for(table_name, changed_ids)
+                    except DB_ERRORS as err:
+                        print(f"\033[91mFailed to refresh order summaries: {err}. Run './cafeapp summary rebuild'.\033[0m")
+                        self.db_conn.rollback()
+                        return False
 
         print(f"\033[92mData imported from {file_path} successfully!\033[0m")
+        return True
 
-    def get_or_create_id(self, table, data):
-        cursor = self.db_conn.cursor(dictionary=True)
-
+    def _refresh_summaries_for(self, table_name, ids):
+        cursor = self.db_conn.cursor()
         try:
-            # Check if the record exists
-            columns = ' AND '.join([f"{key} = %s" for key in data.keys()])
-            values = tuple(data.values())
-            cursor.execute(f"SELECT id FROM {table} WHERE {columns}", values)
-            result = cursor.fetchone()
-
-            if result:
-                cursor.fetchall()  # Ensure all results are fetched
-                return result['id']
-            else:
-                # If not, create it
-                columns = ', '.join(data.keys())
-                placeholders = ', '.join(['%s'] * len(data))
-                cursor.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", values)
+            for batch in iter_batches(ids, IMPORT_BATCH_SIZE):
+                cursor.execute("START TRANSACTION")
+                refresh_for(cursor, self.backend, table_name, batch)
                 self.db_conn.commit()
-                return cursor.lastrowid
         finally:
             cursor.close()
 
-    def get_existing_order_id(self, cursor, customer_id, courier_id, status_id):
-        cursor.execute("SELECT id FROM orders WHERE customer_id = %s AND courier = %s AND status = %s", (customer_id, courier_id, status_id))
-        result = cursor.fetchone()
-        if result:
-            return result['id']
-        else:
+    def rebuild_order_summary(self):
+        start = time.perf_counter()
+        total = rebuild_summary(self.db_conn, self.backend, on_batch=lambda done: print(f"\rRebuilt {done} order summaries", end="", flush=True))
+        if total:
+            print()
+        print(f"\033[92mOrder summary rebuilt for {total} orders in {time.perf_counter() - start:.2f}s\033[0m")
+        return total
+
+    def refresh_analytics(self, rebuild=False):
+        # Extends the dashboard rollups with new orders, or recomputes them from scratch
+        update = rebuild_rollups if rebuild else refresh_rollups
+        report = update(self.db_conn, self.backend, on_batch=lambda done: print(f"\rRolled up {done} orders", end="", flush=True))
+        if report['orders']:
+            print()
+        print(f"\033[92mAnalytics {'rebuilt' if rebuild else 'refreshed'}: {report['orders']} orders added in {report['seconds']:.2f}s "
+              f"({report['orders_per_s']:.0f} orders/sec)\033[0m")
+        return report
+
+    def archive_orders(self, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+        # Moves delivered orders untouched for older_than_days out of the live tables
+        report = move_to_archive(self.db_conn, self.backend, older_than_days, batch_size,
+                                 on_batch=lambda moved: print(f"\rArchived {moved} orders", end="", flush=True))
+        if report['orders']:
+            print()
+        counts = archive_counts(self.db_conn)
+        print(f"\033[92mArchived {report['orders']} delivered orders older than {older_than_days} days in {report['batches']} batches, "
+              f"{report['seconds']:.2f}s ({report['orders_per_s']:.0f} orders/sec). {counts['live']} live, {counts['archived']} archived.\033[0m")
+        return report
+
+    def restore_archived_orders(self, order_ids=None, batch_size=ARCHIVE_BATCH_SIZE):
+        # order_ids=None restores the whole archive; returns None if an order's customer, courier or products are gone
+        try:
+            report = restore_from_archive(self.db_conn, self.backend, order_ids, batch_size)
+        except MissingParentError as err:
+            print(f"\033[91mFailed to restore archived orders: {err}\033[0m")
             return None
+        print(f"\033[92mRestored {report['orders']} archived orders in {report['seconds']:.2f}s\033[0m")
+        return report
+
+    def _report_import_batch(self, batch_number, row_count, seconds):
+        print(f"Batch {batch_number}: {row_count} rows in {seconds * 1000:.1f} ms ({row_count / seconds if seconds else 0:.0f} rows/sec)")
+
+    def _report_delete(self, report):
+        rows = ', '.join(f"{table}: {count}" for table, count in report['rows'].items()) or "nothing"
+        verb = "Soft-deleted" if report['soft'] else "Deleted"
+        print(f"{verb} {report['total']} rows ({rows}) in {report['chunks']} chunks, {report['seconds']:.2f}s ({report['rows_per_s']:.0f} rows/sec)")
+
+    def _report_pipeline(self, pipeline):
+        reader, writers = pipeline['reader'], pipeline['writers']
+        print(f"Reader: {reader['rows_per_s']:.0f} rows/sec parsing, {reader['blocked_s']:.2f}s waiting on writers")
+        print(f"Writers: {writers['rows_per_s']:.0f} rows/sec writing, {writers['idle_s']:.2f}s waiting on the reader")
+
+    def _import_orders(self, rows, batch_size=IMPORT_BATCH_SIZE):
+        # Natural key -> id maps are loaded once; customers, couriers, statuses and products missing
+        # from the database are created together at the end of each chunk instead of per row
+        resolver = IdResolver()
+        cursor = self.db_conn.cursor()
+        try:
+            resolver.preload(self.db_conn)
 
+            for batch_number, batch in enumerate(iter_batches(rows, batch_size), start=1):
+                start = time.perf_counter()
+                parsed = []
+                for row in batch:
+                    try:
+                        customer = {'name': row['customer_name'], 'address': row['customer_address'], 'phone': row['customer_phone']}
+                        courier = {'name': row['courier_name'], 'phone': row['courier_phone']}
+                        status = {'order_status': row['status']}
+                        products = [{'name': name, 'price': price} for name, price in zip(row['products'].split(', '), row['product_prices'].split(', ')) if name]
+                        # Exports from before quantities were stored list each unit separately instead
+                        quantities = [int(count) for count in (row.get('product_quantities') or '').split(', ') if count]
+                    except (KeyError, AttributeError, ValueError):
+                        print(f"\033[91mError: Could not resolve IDs for row: {row}\033[0m")
+                        continue
+                    resolver.resolve('customers', customer)
+                    resolver.resolve('couriers', courier)
+                    resolver.resolve('order_status', status)
+                    for product in products:
+                        resolver.resolve('products', product)
+                    parsed.append((customer, courier, status, products, quantities or [1] * len(products)))
 
+                cursor.execute("START TRANSACTION")
+                resolver.create_pending(cursor)
+
+                orders = [{
+                    'customer_id': resolver.lookup('customers', customer),
+                    'courier_id': resolver.lookup('couriers', courier),
+                    'status': resolver.lookup('order_status', status),
+                    'product_ids': [resolver.lookup('products', product) for product, quantity in zip(products, quantities) for _ in range(quantity)],
+                } for customer, courier, status, products, quantities in parsed]
+                order_ids = write_orders(cursor, orders, adjust_inventory=False)
+                refresh_orders(cursor, self.backend, order_ids)
+                self.db_conn.commit()
+                self._report_import_batch(batch_number, len(orders), time.perf_counter() - start)
+        except DB_ERRORS as err:
+            print(f"\033[91mError: {err}\033[0m")
+            self.db_conn.rollback()
+            return False
+        finally:
+            cursor.close()
 
+        return True
 
-    def run(self):
-        self.load_data()
+    def run_action(self, action, *args):
+        # Statements issued by one menu action are grouped for the diagnostics report
+        name = action.__name__ + (f"({args[0]})" if args else "")
+        with SQL_STATS.action(name):
+            return action(*args)
+
+    def print_diagnostics(self):
+        if not SQL_STATS_ENABLED:
+            print("\033[93mSQL statistics are disabled. Start the app with CAFEAPP_SQL_STATS=1 to collect them.\033[0m")
+        else:
+            print(format_report(SQL_STATS.report()))
+            print(f"\nStatements slower than {SQL_STATS.slow_query_ms:.0f} ms are logged to {SQL_STATS.slow_query_log}")
+        print("\n\033[93mConnection pool:\033[0m")
+        for key, value in self.pool.stats().items():
+            print(f"  {key:<24}{value:.3f}" if isinstance(value, float) else f"  {key:<24}{value}")
+        print(f"\n\033[93mCatalog cache:\033[0m\n  full loads {self.catalog.full_loads}, incremental refreshes {self.catalog.incremental_refreshes}, rows fetched {self.catalog.rows_fetched}")
+
+    def run(self, profile=None):
+        # The menu is drawn straight away; the data it needs loads in the background until the first choice
+        self.profile = profile
+        self.start_warm_up()
 
         while True:
             self.display_main_menu()
-            user_input = get_valid_input(int, "Select an option: ", "Invalid input. Please enter a valid option.", pattern=r'^[0-5]$')
+            if self.profile:
+                self.report_startup()
+            # Option 9 (Diagnostics) is deliberately not listed in the menu
+            user_input = get_valid_input(int, "Select an option: ", "Invalid input. Please enter a valid option.", pattern=r'^([0-5]|9)$')
+            if user_input != 0:
+                self.wait_for_warm_up()
 
             if user_input == 0:
                 self.clear_screen()
                 print("Exiting...")
+                if SQL_STATS_ENABLED:
+                    SQL_STATS.write_report(os.path.join("logs", "sql_stats.json"))
                 break
+            elif user_input == 9:
+                self.clear_screen()
+                self.print_diagnostics()
+                input("Press Enter to return to the Main Menu...")
             elif user_input == 1:
                 self.clear_screen()
                 while True:
@@ -1320,16 +1543,16 @@ class CafeApp:
                         break
                     elif user_input == 1:
                         self.clear_screen()
-                        self.print_product_list()
+                        self.run_action(self.print_product_list)
                     elif user_input == 2:
                         self.clear_screen()
-                        self.create_product()
+                        self.run_action(self.create_product)
                     elif user_input == 3:
                         self.clear_screen()
-                        self.update_product()
+                        self.run_action(self.update_product)
                     elif user_input == 4:
                         self.clear_screen()
-                        self.delete_product()
+                        self.run_action(self.delete_product)
             elif user_input == 2:
                 self.clear_screen()
                 while True:
@@ -1341,16 +1564,16 @@ class CafeApp:
                         break
                     elif user_input == 1:
                         self.clear_screen()
-                        self.print_courier_list()
+                        self.run_action(self.print_courier_list)
                     elif user_input == 2:
                         self.clear_screen()
-                        self.create_courier()
+                        self.run_action(self.create_courier)
                     elif user_input == 3:
                         self.clear_screen()
-                        self.update_courier()
+                        self.run_action(self.update_courier)
                     elif user_input == 4:
                         self.clear_screen()
-                        self.delete_courier()
+                        self.run_action(self.delete_courier)
             elif user_input == 3:
                 self.clear_screen()
                 while True:
@@ -1362,16 +1585,16 @@ class CafeApp:
                         break
                     elif user_input == 1:
                         self.clear_screen()
-                        self.print_customer_list()
+                        self.run_action(self.print_customer_list)
                     elif user_input == 2:
                         self.clear_screen()
-                        self.create_customer()
+                        self.run_action(self.create_customer)
                     elif user_input == 3:
                         self.clear_screen()
-                        self.update_customer()
+                        self.run_action(self.update_customer)
                     elif user_input == 4:
                         self.clear_screen()
-                        self.delete_customer()
+                        self.run_action(self.delete_customer)
             elif user_input == 4:
                 self.clear_screen()
                 while True:
@@ -1383,19 +1606,19 @@ class CafeApp:
                         break
                     elif user_input == 1:
                         self.clear_screen()
-                        self.print_order_list()
+                        self.run_action(self.print_order_list)
                     elif user_input == 2:
                         self.clear_screen()
-                        self.create_order()
+                        self.run_action(self.create_order)
                     elif user_input == 3:
                         self.clear_screen()
-                        self.update_order_status()
+                        self.run_action(self.update_order_status)
                     elif user_input == 4:
                         self.clear_screen()
-                        self.update_order()
+                        self.run_action(self.update_order)
                     elif user_input == 5:
                         self.clear_screen()
-                        self.delete_order()
+                        self.run_action(self.delete_order)
             elif user_input == 5:
                 self.clear_screen()
                 while True:
@@ -1409,22 +1632,25 @@ class CafeApp:
                         self.clear_screen()
                         while True:
                             self.display_export_menu()
-                            user_input = get_valid_input(int, "Select an option: ", "Invalid input. Please enter a valid option.", pattern=r'^[0-4]$')
+                            user_input = get_valid_input(int, "Select an option: ", "Invalid input. Please enter a valid option.", pattern=r'^[0-5]$')
                             if user_input == 0:
                                 self.clear_screen()
                                 break
                             elif user_input == 1:
                                 self.clear_screen()
-                                self.export_to_csv('products', 'products.csv')
+                                self.run_action(self.export_to_csv, 'products', 'products.csv')
                             elif user_input == 2:
                                 self.clear_screen()
-                                self.export_to_csv('couriers', 'couriers.csv')
+                                self.run_action(self.export_to_csv, 'couriers', 'couriers.csv')
                             elif user_input == 3:
                                 self.clear_screen()
-                                self.export_to_csv('customers', 'customers.csv')
+                                self.run_action(self.export_to_csv, 'customers', 'customers.csv')
                             elif user_input == 4:
                                 self.clear_screen()
-                                self.export_to_csv('orders', 'orders.csv')
+                                self.run_action(self.export_to_csv, 'orders', 'orders.csv')
+                            elif user_input == 5:
+                                self.clear_screen()
+                                self.run_action(self.export_all)
                     elif user_input == 2:
                         self.clear_screen()
                         while True:
@@ -1435,18 +1661,29 @@ class CafeApp:
                                 break
                             elif user_input == 1:
                                 self.clear_screen()
-                                self.import_from_csv('products', 'products.csv')
+                                self.run_action(self.import_from_csv, 'products', 'products.csv')
                             elif user_input == 2:
                                 self.clear_screen()
-                                self.import_from_csv('couriers', 'couriers.csv')
+                                self.run_action(self.import_from_csv, 'couriers', 'couriers.csv')
                             elif user_input == 3:
                                 self.clear_screen()
-                                self.import_from_csv('customers', 'customers.csv')
+                                self.run_action(self.import_from_csv, 'customers', 'customers.csv')
                             elif user_input == 4:
                                 self.clear_screen()
-                                self.import_from_csv('orders', 'orders.csv')
+                                self.run_action(self.import_from_csv, 'orders', 'orders.csv')
+
+    def report_startup(self):
+        # Printed once, under the first menu, after the warm-up so every phase is known
+        self.profile.since_start('first_paint')
+        self.wait_for_warm_up()
+        print(self.profile.report())
+        print(f"Written to {self.profile.write()}")
+        self.profile = None
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog='python -m src.app', description="Run the CafeApp menus.")
+    parser.add_argument('--startup-profile', action='store_true', help="report import, connect and first-paint timings")
+    args = parser.parse_args()
     app = CafeApp()
-    app.run()
+    app.run(StartupProfile(_IMPORT_STARTED, _IMPORT_FINISHED) if args.startup_profile else None)
     app.clear_screen()
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import time
+
+from src.order_summary import SUMMARY_COLUMNS, refresh_orders
+from src.orders import MAX_ROWS_PER_STATEMENT
+from src.storage import run_in_transaction
+
+# Hot/cold split for orders. Delivered orders that have not changed for ARCHIVE_AFTER_DAYS move, with
+# their items and summary row, into the *_archive tables, one batch per transaction. The live tables
+# then only hold the working set that the order board, load_data and the tills scan. Reports that need
+# the full history read the orders_all, order_items_all and order_summary_all views.
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("CAFEAPP_ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("CAFEAPP_ARCHIVE_BATCH_SIZE", "1000"))
+ARCHIVE_STATUS = 'DELIVERED'
+
+ORDER_COLUMNS = ['id', 'customer_id', 'courier', 'status', 'created_at', 'updated_at']
+ITEM_COLUMNS = ['order_id', 'product_id', 'quantity', 'unit_price']
+
+
+class MissingParentError(ValueError):
+
+    def __init__(self, missing):
+        # missing maps order_id -> ['customer 3', 'product 7', ...]
+        self.missing = missing
+        details = '; '.join(f"order {order_id}: {', '.join(rows)}" for order_id, rows in sorted(missing.items()))
+        super().__init__(f"Archived orders refer to deleted rows and cannot be restored ({details})")
+
+
+def _placeholders(ids):
+    return ', '.join(['%s'] * len(ids))
+
+
+def _missing_parents(cursor, order_ids):
+    # Archived rows have no foreign keys, so their customer, courier or products may have been deleted since
+    ids = tuple(order_ids)
+    cursor.execute(
+        f"SELECT a.id, 'customer', a.customer_id FROM orders_archive a WHERE a.id IN ({_placeholders(ids)}) "
+        f"AND NOT EXISTS (SELECT 1 FROM customers c WHERE c.id = a.customer_id) "
+        f"UNION ALL SELECT a.id, 'courier', a.courier FROM orders_archive a WHERE a.id IN ({_placeholders(ids)}) "
+        f"AND NOT EXISTS (SELECT 1 FROM couriers c WHERE c.id = a.courier) "
+        f"UNION ALL SELECT i.order_id, 'product', i.product_id FROM order_items_archive i WHERE i.order_id IN ({_placeholders(ids)}) "
+        f"AND NOT EXISTS (SELECT 1 FROM products p WHERE p.id = i.product_id)",
+        ids * 3
+    )
+    missing = {}
+    for order_id, table, row_id in cursor.fetchall():
+        missing.setdefault(order_id, []).append(f"{table} {row_id}")
+    return missing
+
+
+def _archive_chunk(cursor, order_ids):
+    ids = tuple(order_ids)
+    columns, items, summary = ', '.join(ORDER_COLUMNS), ', '.join(ITEM_COLUMNS), ', '.join(SUMMARY_COLUMNS)
+    cursor.execute(f"INSERT INTO orders_archive ({columns}) SELECT {columns} FROM orders WHERE id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"INSERT INTO order_items_archive ({items}) SELECT {items} FROM order_items WHERE order_id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"INSERT INTO order_summary_archive ({summary}) SELECT {summary} FROM order_summary WHERE order_id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"DELETE FROM order_summary WHERE order_id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"DELETE FROM order_items WHERE order_id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"DELETE FROM orders WHERE id IN ({_placeholders(ids)})", ids)
+
+
+def _restore_chunk(cursor, backend, order_ids):
+    ids = tuple(order_ids)
+    missing = _missing_parents(cursor, ids)
+    if missing:
+        raise MissingParentError(missing)
+    items = ', '.join(ITEM_COLUMNS)
+    # updated_at is reset so a restored order stays live for another ARCHIVE_AFTER_DAYS
+    cursor.execute(
+        f"INSERT INTO orders ({', '.join(ORDER_COLUMNS)}) "
+        f"SELECT id, customer_id, courier, status, created_at, CURRENT_TIMESTAMP FROM orders_archive WHERE id IN ({_placeholders(ids)})",
+        ids
+    )
+    restored = cursor.rowcount
+    cursor.execute(f"INSERT INTO order_items ({items}) SELECT {items} FROM order_items_archive WHERE order_id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"DELETE FROM order_items_archive WHERE order_id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"DELETE FROM order_summary_archive WHERE order_id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"DELETE FROM orders_archive WHERE id IN ({_placeholders(ids)})", ids)
+    # Live summaries show current names, so they are recomputed rather than copied back
+    refresh_orders(cursor, backend, ids)
+    return restored
+
+
+def _report(orders, batches, start):
+    seconds = time.perf_counter() - start
+    return {'orders': orders, 'batches': batches, 'seconds': seconds, 'orders_per_s': orders / seconds if seconds else 0.0}
+
+
+def archive_orders(conn, backend, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, status=ARCHIVE_STATUS, on_batch=None):
+    # Moves orders in the given status whose last change is older than older_than_days; returns a report
+    # with the orders moved, batches, seconds and orders_per_s
+    start = time.perf_counter()
+    batch_size = min(batch_size, MAX_ROWS_PER_STATEMENT)
+    moved = batches = 0
+
+    def move_batch(cursor):
+        cursor.execute(
+            f"SELECT o.id FROM orders o JOIN order_status s ON o.status = s.id "
+            f"WHERE s.order_status = %s AND o.updated_at < {backend.days_ago()} ORDER BY o.id LIMIT %s",
+            (status, older_than_days, batch_size)
+        )
+        order_ids = [row[0] for row in cursor.fetchall()]
+        if order_ids:
+            _archive_chunk(cursor, order_ids)
+        return len(order_ids)
+
+    while True:
+        count = run_in_transaction(conn, move_batch)
+        if count:
+            moved += count
+            batches += 1
+            if on_batch:
+                on_batch(moved)
+        if count < batch_size:
+            return _report(moved, batches, start)
+
+
+def restore_orders(conn, backend, order_ids=None, batch_size=ARCHIVE_BATCH_SIZE, on_batch=None):
+    # Moves the given archived orders (or all of them) back into the live tables. A batch with an order whose
+    # customer, courier or products were deleted raises MissingParentError and is left in the archive
+    start = time.perf_counter()
+    batch_size = min(batch_size, MAX_ROWS_PER_STATEMENT)
+    restored = batches = 0
+
+    if order_ids is not None:
+        order_ids = list(dict.fromkeys(order_ids))
+        for chunk_start in range(0, len(order_ids), batch_size):
+            chunk = order_ids[chunk_start:chunk_start + batch_size]
+            restored += run_in_transaction(conn, lambda cursor: _restore_chunk(cursor, backend, chunk))
+            batches += 1
+            if on_batch:
+                on_batch(restored)
+        return _report(restored, batches, start)
+
+    def restore_batch(cursor):
+        cursor.execute("SELECT id FROM orders_archive ORDER BY id LIMIT %s", (batch_size,))
+        chunk = [row[0] for row in cursor.fetchall()]
+        return _restore_chunk(cursor, backend, chunk) if chunk else 0
+
+    while True:
+        count = run_in_transaction(conn, restore_batch)
+        if count:
+            restored += count
+            batches += 1
+            if on_batch:
+                on_batch(restored)
+        if count < batch_size:
+            return _report(restored, batches, start)
+
+
+def archive_counts(conn):
+    # Live and archived order counts, for reporting what an archive run achieved
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT (SELECT COUNT(*) FROM orders), (SELECT COUNT(*) FROM orders_archive)")
+        live, archived = cursor.fetchone()
+    finally:
+        cursor.close()
+    return {'live': live, 'archived': archived}
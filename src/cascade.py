@@ -0,0 +1,155 @@
+import os
+import time
+
+from src.order_summary import remove_orders
+from src.orders import MAX_ROWS_PER_STATEMENT
+from src.storage import run_in_transaction
+
+# Deletes that cascade from products, couriers and customers to the orders that use them. Targeted
+# deletes find the affected orders with one query and remove them a chunk at a time; wiping a whole
+# table runs DELETE ... LIMIT loops. Either way every transaction touches at most DELETE_CHUNK_SIZE
+# orders, so deleting a popular product never holds locks long enough to stall the tills.
+# In soft-delete mode catalogue rows are only stamped with deleted_at: they disappear from the menus
+# and can no longer be ordered, but every order that used them is kept.
+
+DELETE_CHUNK_SIZE = int(os.getenv("CAFEAPP_DELETE_CHUNK_SIZE", "1000"))
+SOFT_DELETE = os.getenv("CAFEAPP_SOFT_DELETE", "0") == "1"
+SOFT_DELETE_TABLES = ('products', 'couriers', 'customers')
+
+# Orders that must go when rows of the given table are deleted
+_ORDERS_USING = {
+    'products': "SELECT DISTINCT order_id FROM order_items WHERE product_id IN ({ids})",
+    'couriers': "SELECT id FROM orders WHERE courier IN ({ids})",
+    'customers': "SELECT id FROM orders WHERE customer_id IN ({ids})",
+    'orders': "SELECT id FROM orders WHERE id IN ({ids})",
+}
+
+
+def _new_report(soft):
+    return {'rows': {}, 'total': 0, 'chunks': 0, 'seconds': 0.0, 'rows_per_s': 0.0, 'soft': soft}
+
+
+def _count(report, counts):
+    # counts maps table -> rows, merged only once its transaction has committed
+    for table, rows in counts.items():
+        if rows > 0:
+            report['rows'][table] = report['rows'].get(table, 0) + rows
+            report['total'] += rows
+
+
+def _finish(report, start):
+    report['seconds'] = time.perf_counter() - start
+    report['rows_per_s'] = report['total'] / report['seconds'] if report['seconds'] else 0.0
+    return report
+
+
+def _orders_using(cursor, table, ids):
+    order_ids = []
+    for start in range(0, len(ids), MAX_ROWS_PER_STATEMENT):
+        chunk = ids[start:start + MAX_ROWS_PER_STATEMENT]
+        cursor.execute(_ORDERS_USING[table].format(ids=', '.join(['%s'] * len(chunk))), tuple(chunk))
+        order_ids.extend(row[0] for row in cursor.fetchall())
+    return order_ids
+
+
+def _delete_orders(cursor, order_ids):
+    # Items, orders and summaries of the given orders, one statement per table
+    placeholders = ', '.join(['%s'] * len(order_ids))
+    cursor.execute(f"DELETE FROM order_items WHERE order_id IN ({placeholders})", tuple(order_ids))
+    counts = {'order_items': cursor.rowcount}
+    cursor.execute(f"DELETE FROM orders WHERE id IN ({placeholders})", tuple(order_ids))
+    counts['orders'] = cursor.rowcount
+    remove_orders(cursor, order_ids)
+    return counts
+
+
+def _soft_delete(conn, table, ids, chunk_size, report, on_chunk):
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+
+        def stamp(cursor):
+            cursor.execute(f"UPDATE {table} SET deleted_at = CURRENT_TIMESTAMP WHERE deleted_at IS NULL AND id IN ({', '.join(['%s'] * len(chunk))})", tuple(chunk))
+            return {table: cursor.rowcount}
+        _count(report, run_in_transaction(conn, stamp))
+        report['chunks'] += 1
+        if on_chunk:
+            on_chunk(report)
+
+
+def delete_rows(conn, table, ids, soft=SOFT_DELETE, chunk_size=DELETE_CHUNK_SIZE, on_chunk=None):
+    # Deletes the given rows of products, couriers, customers or orders together with every order that
+    # depends on them. Returns a report of rows deleted per table, chunks, seconds and rows_per_s.
+    start = time.perf_counter()
+    ids = list(dict.fromkeys(ids))
+    report = _new_report(soft and table in SOFT_DELETE_TABLES)
+    if report['soft']:
+        _soft_delete(conn, table, ids, min(chunk_size, MAX_ROWS_PER_STATEMENT), report, on_chunk)
+        return _finish(report, start)
+
+    cursor = conn.cursor()
+    try:
+        order_ids = _orders_using(cursor, table, ids)
+    finally:
+        cursor.close()
+
+    chunk_size = min(chunk_size, MAX_ROWS_PER_STATEMENT)
+    for chunk_start in range(0, len(order_ids), chunk_size):
+        chunk = order_ids[chunk_start:chunk_start + chunk_size]
+        _count(report, run_in_transaction(conn, lambda cursor: _delete_orders(cursor, chunk)))
+        report['chunks'] += 1
+        if on_chunk:
+            on_chunk(report)
+
+    if table != 'orders':
+        def delete_parents(cursor):
+            # Orders placed while the chunks ran would otherwise block the delete with a foreign key error
+            late_orders = _orders_using(cursor, table, ids)
+            counts = _delete_orders(cursor, late_orders) if late_orders else {}
+            counts[table] = 0
+            for id_start in range(0, len(ids), MAX_ROWS_PER_STATEMENT):
+                id_chunk = ids[id_start:id_start + MAX_ROWS_PER_STATEMENT]
+                cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(id_chunk))})", tuple(id_chunk))
+                counts[table] += cursor.rowcount
+            return counts
+        _count(report, run_in_transaction(conn, delete_parents))
+        report['chunks'] += 1
+    return _finish(report, start)
+
+
+def _delete_in_chunks(conn, backend, table, condition, chunk_size, report, on_chunk):
+    sql = backend.delete_limit(table, condition)
+    while True:
+        def delete_chunk(cursor):
+            cursor.execute(sql, (chunk_size,))
+            return cursor.rowcount
+        deleted = run_in_transaction(conn, delete_chunk)
+        _count(report, {table: deleted})
+        report['chunks'] += 1
+        if on_chunk:
+            on_chunk(report)
+        if deleted < chunk_size:
+            return
+
+
+def wipe(conn, backend, table, soft=SOFT_DELETE, chunk_size=DELETE_CHUNK_SIZE, on_chunk=None):
+    # Empties a table. Every order references a product, courier and customer, so wiping any of them
+    # also removes every order; each loop commits after chunk_size rows
+    start = time.perf_counter()
+    report = _new_report(soft and table in SOFT_DELETE_TABLES)
+    if report['soft']:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT id FROM {table} WHERE deleted_at IS NULL ORDER BY id")
+            ids = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        _soft_delete(conn, table, ids, min(chunk_size, MAX_ROWS_PER_STATEMENT), report, on_chunk)
+        return _finish(report, start)
+
+    _delete_in_chunks(conn, backend, 'order_items', "1 = 1", chunk_size, report, on_chunk)
+    # Orders that still have items were placed after the first loop finished and are left alone
+    _delete_in_chunks(conn, backend, 'orders', "id NOT IN (SELECT order_id FROM order_items)", chunk_size, report, on_chunk)
+    _delete_in_chunks(conn, backend, 'order_summary', "order_id NOT IN (SELECT id FROM orders)", chunk_size, report, on_chunk)
+    if table != 'orders':
+        _delete_in_chunks(conn, backend, table, "1 = 1", chunk_size, report, on_chunk)
+    return _finish(report, start)
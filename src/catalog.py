@@ -0,0 +1,254 @@
+import re
+import time
+from bisect import bisect_left
+
+CATALOG_TABLES = ('products', 'couriers', 'customers')
+
+# Columns each table can be searched by. Phones are indexed by their digits only, so '07123 456' finds '07123456789'
+SEARCH_FIELDS = {
+    'products': ('name',),
+    'couriers': ('name', 'phone'),
+    'customers': ('name', 'phone'),
+}
+SEARCH_LIMIT = 20
+
+# change_log ids are allocated when a transaction writes, not when it commits, so a slow
+# transaction can commit ids below our watermark. Every id skipped on the way up to the watermark
+# is remembered as a gap and looked for again on each refresh until it turns up. A gap that never
+# fills (a rolled-back transaction, or an id the database skipped) is dropped after
+# CHANGE_LOG_GAP_TIMEOUT seconds, well beyond any transaction the app runs.
+CHANGE_LOG_GAP_TIMEOUT = 600
+
+# A full load cannot tell which missing ids below MAX(id) are still in flight, so ids missing between
+# the entries it sees this far behind the watermark are treated as gaps. Bulk imports and order
+# batches write thousands of entries per transaction, so the window has to be at least that wide.
+CHANGE_LOG_LOOKBACK = 20000
+
+# Only the most recent entries are kept. A cache whose watermark falls behind the
+# oldest retained entry cannot trust the log and falls back to a full load.
+CHANGE_LOG_RETAIN = 100000
+
+ID_CHUNK_SIZE = 1000
+
+
+def _visible(row):
+    # Soft-deleted products, couriers and customers stay in the database for their orders but leave the menus
+    return row.get('deleted_at') is None
+
+
+def _search_text(field, value):
+    text = str(value or '').lower()
+    return re.sub(r'\D', '', text) if field == 'phone' else text
+
+
+def _terms(text):
+    return re.findall(r'\w+', text)
+
+
+def _trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class SearchIndex:
+    # Trigrams find query terms anywhere inside a name or phone; terms shorter than three characters
+    # match the start of a word through the prefix map instead. Rows are added and removed one at a
+    # time, so an incremental refresh only touches the rows that changed.
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.texts = {}  # id -> indexed text
+        self.trigrams = {}  # trigram -> {id}
+        self.prefixes = {}  # first one or two characters of a word -> {id}
+
+    def _keys(self, text):
+        grams, prefixes = set(), set()
+        for term in _terms(text):
+            grams |= _trigrams(term)
+            prefixes.update((term[:1], term[:2]))
+        return grams, prefixes
+
+    def add(self, row):
+        self.remove(row['id'])
+        text = ' '.join(_search_text(field, row.get(field)) for field in self.fields)
+        self.texts[row['id']] = text
+        grams, prefixes = self._keys(text)
+        for gram in grams:
+            self.trigrams.setdefault(gram, set()).add(row['id'])
+        for prefix in prefixes:
+            self.prefixes.setdefault(prefix, set()).add(row['id'])
+
+    def remove(self, row_id):
+        text = self.texts.pop(row_id, None)
+        if text is None:
+            return
+        grams, prefixes = self._keys(text)
+        for index, keys in ((self.trigrams, grams), (self.prefixes, prefixes)):
+            for key in keys:
+                ids = index[key]
+                ids.discard(row_id)
+                if not ids:
+                    del index[key]
+
+    def search(self, query):
+        # Ids whose text contains every term of the query
+        terms = _terms(query.lower())
+        candidates = None
+        for term in terms:
+            if len(term) < 3:
+                ids = self.prefixes.get(term, set())
+            else:
+                # Start from the rarest trigram so the intersection stays small
+                sets = sorted((self.trigrams.get(gram, set()) for gram in _trigrams(term)), key=len)
+                ids = sets[0].intersection(*sets[1:])
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        # Trigrams can all be present without the term itself, e.g. 'latte' in 'lat tea', so the text is checked
+        return {row_id for row_id in candidates or () if all(term in self.texts[row_id] for term in terms)}
+
+
+class CatalogCache:
+
+    def __init__(self, tables=CATALOG_TABLES):
+        self.tables = tables
+        self.rows = {table: {} for table in tables}  # table -> {id: row}
+        self._lists = {table: [] for table in tables}
+        self._ids = {table: [] for table in tables}  # sorted ids, parallel to _lists
+        self.indexes = {table: SearchIndex(SEARCH_FIELDS[table]) for table in tables if table in SEARCH_FIELDS}
+        self.watermark = None
+        self._gaps = {}  # change_log id not seen yet -> when it was first missed
+
+        # Counters for diagnostics
+        self.full_loads = 0
+        self.incremental_refreshes = 0
+        self.rows_fetched = 0
+
+    def list(self, table):
+        return self._lists[table]
+
+    def get(self, table, row_id):
+        return self.rows[table].get(row_id)
+
+    def position(self, table, row_id):
+        # 1-based position of the row in list(table), the number shown next to it on the list screens
+        ids = self._ids[table]
+        index = bisect_left(ids, row_id)
+        return index + 1 if index < len(ids) and ids[index] == row_id else None
+
+    def search(self, table, query, limit=SEARCH_LIMIT):
+        # Rows whose name (or phone) contains every word of the query; names starting with the query come first
+        index = self.indexes[table]
+        query = query.strip().lower()
+        ids = sorted(index.search(query), key=lambda row_id: (not index.texts[row_id].startswith(query), row_id))
+        return [self.rows[table][row_id] for row_id in ids[:limit]]
+
+    def refresh(self, conn):
+        cursor = conn.cursor(dictionary=True)
+        try:
+            if self.watermark is None or not self._incremental_load(cursor):
+                self._full_load(cursor)
+        finally:
+            cursor.close()
+
+    def _full_load(self, cursor):
+        # Read the watermark first so changes committed while we load are picked up next time
+        cursor.execute("SELECT COALESCE(MAX(id), 0) AS id FROM change_log")
+        watermark = cursor.fetchone()['id']
+
+        # Entries already committed inside the lookback window are reflected in the rows we are about to read;
+        # the ones missing may belong to transactions that have not committed yet
+        cursor.execute("SELECT id FROM change_log WHERE id > %s AND id <= %s", (max(watermark - CHANGE_LOG_LOOKBACK, 0), watermark))
+        applied = {row['id'] for row in cursor.fetchall()}
+        # Ids below the oldest entry in the window were pruned or never used, so only holes between entries are gaps
+        now = time.monotonic()
+        gaps = {change_id: now for change_id in range(min(applied, default=watermark) + 1, watermark) if change_id not in applied}
+
+        for table in self.tables:
+            cursor.execute(f"SELECT * FROM {table} ORDER BY id")
+            rows = [row for row in cursor.fetchall() if _visible(row)]
+            self.rows[table] = {row['id']: row for row in rows}
+            self._lists[table] = rows
+            self._ids[table] = [row['id'] for row in rows]
+            if table in self.indexes:
+                self.indexes[table] = index = SearchIndex(SEARCH_FIELDS[table])
+                for row in rows:
+                    index.add(row)
+            self.rows_fetched += len(rows)
+
+        if watermark > CHANGE_LOG_RETAIN:
+            cursor.execute("DELETE FROM change_log WHERE id <= %s", (watermark - CHANGE_LOG_RETAIN,))
+
+        self.watermark = watermark
+        self._gaps = gaps
+        self.full_loads += 1
+
+    def _incremental_load(self, cursor):
+        # Everything from the oldest open gap upwards is read, so late commits below the watermark are found.
+        # The oldest retained entry comes back too, so pruning can be detected in the same round trip
+        now = time.monotonic()
+        self._gaps = {change_id: missed for change_id, missed in self._gaps.items() if now - missed < CHANGE_LOG_GAP_TIMEOUT}
+        read_from = min(self._gaps, default=self.watermark + 1)
+        cursor.execute(
+            "SELECT id, table_name, row_id FROM change_log "
+            "WHERE id >= %s OR id = (SELECT MIN(id) FROM change_log) ORDER BY id",
+            (read_from,)
+        )
+        rows = cursor.fetchall()
+        if rows and rows[0]['id'] > self.watermark + 1:
+            # Entries we never saw have been pruned
+            return False
+
+        changes = [change for change in rows if change['id'] > self.watermark or change['id'] in self._gaps]
+        if not changes:
+            return True
+
+        changed_ids = {}
+        for change in changes:
+            if change['table_name'] in self.rows:
+                changed_ids.setdefault(change['table_name'], set()).add(change['row_id'])
+
+        for table, row_ids in changed_ids.items():
+            self._apply(cursor, table, sorted(row_ids))
+
+        seen = {change['id'] for change in changes}
+        for change_id in seen.intersection(self._gaps):
+            del self._gaps[change_id]
+        # Ids skipped between the old and the new watermark are still in flight
+        watermark = max(self.watermark, changes[-1]['id'])
+        for change_id in range(self.watermark + 1, watermark):
+            if change_id not in seen:
+                self._gaps[change_id] = now
+        self.watermark = watermark
+        self.incremental_refreshes += 1
+        return True
+
+    def _apply(self, cursor, table, row_ids):
+        for start in range(0, len(row_ids), ID_CHUNK_SIZE):
+            chunk = row_ids[start:start + ID_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"SELECT * FROM {table} WHERE id IN ({placeholders})", tuple(chunk))
+            found = {row['id']: row for row in cursor.fetchall() if _visible(row)}
+            self.rows_fetched += len(found)
+
+            for row_id in chunk:
+                self._place(table, row_id, found.get(row_id))
+
+    def _place(self, table, row_id, row):
+        # Updates the id map, the ordered list and the search index in place instead of re-sorting the table
+        rows, ids, index = self._lists[table], self._ids[table], self.indexes.get(table)
+        position = bisect_left(ids, row_id)
+        present = position < len(ids) and ids[position] == row_id
+        if row is not None:
+            self.rows[table][row_id] = row
+            if present:
+                rows[position] = row
+            else:
+                ids.insert(position, row_id)
+                rows.insert(position, row)
+            if index is not None:
+                index.add(row)
+        elif present:
+            # The row no longer exists or was soft-deleted, so the change was a delete
+            del self.rows[table][row_id], ids[position], rows[position]
+            if index is not None:
+                index.remove(row_id)
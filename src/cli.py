@@ -0,0 +1,152 @@
+import argparse
+import sys
+
+from src.app import CafeApp, EXPORT_TABLES
+from src.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+from src.compression import CODECS, EXPORT_COMPRESSION
+from src.columnar_export import COLUMNAR_BATCH_SIZE, COLUMNAR_FORMATS
+from src.csv_import import IMPORT_WRITERS
+from src.storage import DB_ERRORS
+
+# Tables that can be exported/imported, matching the Data Import/Export menu
+TABLES = ['products', 'couriers', 'customers', 'orders']
+
+
+def parse_ids(value):
+    try:
+        return [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated ids, got {value!r}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cafeapp', description="Run CafeApp operations without the interactive menus.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="export a table to export/<table>.csv, or 'all' to export every table in parallel")
+    export.add_argument('table', choices=[*EXPORT_TABLES, 'all'])
+    export.add_argument('--file', help="file name under export/ (default: <table>.<format>)")
+    export.add_argument('--format', choices=['csv', *COLUMNAR_FORMATS], default='csv', help="parquet and arrow write typed columns and need pyarrow")
+    export.add_argument('--compress', choices=list(CODECS), default=EXPORT_COMPRESSION, help="compress the file (csv gets a .gz/.zst suffix; zstd needs zstandard)")
+    export.add_argument('--chunk-size', type=int, help="rows fetched per batch (default: 5000 for csv, 65536 for parquet and arrow)")
+    export.add_argument('--workers', type=int, help="parallel workers for 'all' (at most pool size - 1, the default)")
+    export.add_argument('--include-archive', action='store_true', help="include archived orders in the orders and order_items exports")
+
+    import_ = commands.add_parser('import', help="import a CSV file into a table (gzip and zstd files are detected)")
+    import_.add_argument('table', choices=TABLES)
+    import_.add_argument('file', help="file name under import/, or an absolute path")
+    import_.add_argument('--batch-size', type=int, default=1000)
+    import_.add_argument('--writers', type=int, default=IMPORT_WRITERS, help="parallel writer connections")
+    import_.add_argument('--load-data', action='store_true', help="use LOAD DATA LOCAL INFILE (MySQL only)")
+
+    order = commands.add_parser('order', help="create orders and change their status")
+    order_commands = order.add_subparsers(dest='order_command', required=True)
+
+    create = order_commands.add_parser('create', help="create one order")
+    create.add_argument('--customer', type=int, required=True, help="customer id")
+    create.add_argument('--courier', type=int, required=True, help="courier id")
+    create.add_argument('--items', type=parse_ids, required=True, help="comma-separated product ids, repeat an id for quantity")
+
+    status = order_commands.add_parser('status', help="set the status of one or more orders")
+    status.add_argument('orders', type=parse_ids, help="comma-separated order ids")
+    status.add_argument('status', help="status name, e.g. READY")
+
+    sweep = order_commands.add_parser('sweep', help="move every order in one status to another")
+    sweep.add_argument('--from', dest='from_status', required=True)
+    sweep.add_argument('--to', dest='to_status', required=True)
+
+    summary = commands.add_parser('summary', help="maintain the order_summary table")
+    summary_commands = summary.add_subparsers(dest='summary_command', required=True)
+    summary_commands.add_parser('rebuild', help="recompute every order summary, e.g. after a migration")
+
+    analytics = commands.add_parser('analytics', help="dashboard rollup tables")
+    analytics_commands = analytics.add_subparsers(dest='analytics_command', required=True)
+    analytics_commands.add_parser('refresh', help="add orders placed since the last refresh")
+    analytics_commands.add_parser('rebuild', help="recompute the rollups from every order")
+
+    archive = commands.add_parser('archive', help="move old delivered orders out of the live tables, or bring them back")
+    archive_commands = archive.add_subparsers(dest='archive_command', required=True)
+
+    run = archive_commands.add_parser('run', help="archive DELIVERED orders unchanged for --days")
+    run.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS, help=f"minimum age in days (default: {ARCHIVE_AFTER_DAYS})")
+    run.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help="orders moved per transaction")
+
+    restore = archive_commands.add_parser('restore', help="move archived orders back into the live tables")
+    which = restore.add_mutually_exclusive_group(required=True)
+    which.add_argument('--orders', type=parse_ids, help="comma-separated order ids")
+    which.add_argument('--all', action='store_true', help="restore the whole archive")
+
+    return parser
+
+
+def run_command(app, args):
+    # Returns the process exit code
+    if args.command == 'export' and args.table == 'all':
+        manifest = app.export_all(chunk_size=args.chunk_size or 5000, workers=args.workers, include_archive=args.include_archive, fmt=args.format, compression=args.compress)
+        return 0 if all(entry['status'] == 'ok' for entry in manifest['tables']) else 1
+
+    if args.command == 'export' and args.format != 'csv':
+        app.export_columnar(args.table, args.file, args.format, args.chunk_size or COLUMNAR_BATCH_SIZE, include_archive=args.include_archive, compression=args.compress)
+        return 0
+
+    if args.command == 'export':
+        app.export_to_csv(args.table, args.file or f"{args.table}.csv", chunk_size=args.chunk_size or 5000, include_archive=args.include_archive, compression=args.compress)
+        return 0
+
+    if args.command == 'import':
+        return 0 if app.import_from_csv(args.table, args.file, batch_size=args.batch_size, use_load_data=args.load_data, writers=args.writers) else 1
+
+    if args.command == 'order':
+        if args.order_command == 'create':
+            order_ids = app.create_orders_bulk([{'customer_id': args.customer, 'courier_id': args.courier, 'product_ids': args.items}])
+            if not order_ids:
+                return 1
+            print(f"\033[92mOrder {order_ids[0]} created.\033[0m")
+            return 0
+
+        if args.order_command == 'status':
+            updated = app.set_order_status(args.orders, args.status)
+            print(f"\033[92m{updated} order(s) set to {args.status}.\033[0m")
+            return 0 if updated else 1
+
+        if args.order_command == 'sweep':
+            updated = app.sweep_order_status(args.from_status, args.to_status)
+            print(f"\033[92m{updated} order(s) moved from {args.from_status} to {args.to_status}.\033[0m")
+            return 0
+
+    if args.command == 'summary' and args.summary_command == 'rebuild':
+        app.rebuild_order_summary()
+        return 0
+
+    if args.command == 'analytics':
+        app.refresh_analytics(rebuild=args.analytics_command == 'rebuild')
+        return 0
+
+    if args.command == 'archive':
+        if args.archive_command == 'run':
+            app.archive_orders(args.days, args.batch_size)
+            return 0
+
+        if args.archive_command == 'restore':
+            report = app.restore_archived_orders(None if args.all else args.orders)
+            return 0 if report and report['orders'] else 1
+
+    return 2
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # No menu, no clear_screen and no load_data: only the statements the command needs are run
+    app = CafeApp()
+    try:
+        return run_command(app, args)
+    except (*DB_ERRORS, ValueError) as err:
+        print(f"\033[91mError: {err}\033[0m", file=sys.stderr)
+        return 1
+    finally:
+        app.close()
+        app.pool.close_all()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# Typed, columnar exports for analysts. Each table is written as Parquet or Arrow IPC record batches with
+# integer ids, decimal prices and real timestamps, so nothing has to be re-parsed from text. Orders are
+# written without the comma-joined item strings of the CSV export; their items are the normalised
+# order_items table (one row per product with quantity and unit_price), joined on order_id.
+# pyarrow is optional and only imported when a columnar export runs. Compression happens inside the file:
+# Parquet pages default to snappy and accept gzip or zstd, Arrow IPC buffers accept zstd.
+
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+COLUMNAR_BATCH_SIZE = 65536
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError("Parquet and Arrow exports need pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _columns(pa):
+    # (column, type) per exported table, in file order
+    ID, TEXT, TIME = pa.int32(), pa.string(), pa.timestamp('s')
+    return {
+        'products': [('id', ID), ('name', TEXT), ('price', pa.decimal128(5, 2)), ('inventory', ID), ('deleted_at', TIME)],
+        'couriers': [('id', ID), ('name', TEXT), ('phone', TEXT), ('deleted_at', TIME)],
+        'customers': [('id', ID), ('name', TEXT), ('address', TEXT), ('phone', TEXT), ('deleted_at', TIME)],
+        'orders': [
+            ('id', ID), ('customer_id', ID), ('customer_name', TEXT), ('customer_address', TEXT), ('customer_phone', TEXT),
+            ('courier_id', ID), ('courier_name', TEXT), ('courier_phone', TEXT), ('status', TEXT),
+            ('item_count', ID), ('total', pa.decimal128(10, 2)), ('created_at', TIME),
+        ],
+        'order_items': [('order_id', ID), ('product_id', ID), ('quantity', ID), ('unit_price', pa.decimal128(5, 2))],
+    }
+
+
+def _query(table_name, columns, include_archive):
+    if table_name == 'orders':
+        source = 'order_summary_all' if include_archive else 'order_summary'
+        return f"""
+        SELECT order_id, customer_id, customer_name, customer_address, customer_phone,
+            courier_id, courier_name, courier_phone, status, item_count, total, created_at
+        FROM {source}
+        ORDER BY order_id
+        """
+    if table_name == 'order_items':
+        source = 'order_items_all' if include_archive else 'order_items'
+        return f"SELECT order_id, product_id, quantity, unit_price FROM {source} ORDER BY order_id, product_id"
+    return f"SELECT {', '.join(name for name, _ in columns)} FROM {table_name} ORDER BY id"
+
+
+def _array(pa, values, arrow_type):
+    # MySQL returns Decimal and datetime values that convert directly; SQLite returns floats and
+    # timestamp text, which Arrow casts a whole column at a time
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return pa.array(values).cast(arrow_type)
+
+
+def _writer(pa, file_path, schema, fmt, compression):
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(file_path, schema, compression=compression or 'snappy')
+    if compression not in (None, 'zstd'):
+        raise ValueError(f"Arrow files cannot be compressed with {compression}; use zstd")
+    return pa.ipc.new_file(file_path, schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+
+
+def export_columnar(conn, table_name, file_path, fmt='parquet', batch_size=COLUMNAR_BATCH_SIZE, include_archive=False, on_batch=None, compression=None):
+    # Streams one table into a Parquet or Arrow IPC file, one record batch per fetch; returns the rows written
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    pa = _pyarrow()
+    columns = _columns(pa)[table_name]
+    schema = pa.schema([pa.field(name, arrow_type) for name, arrow_type in columns])
+
+    rows_written = 0
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(_query(table_name, columns, include_archive))
+        # Empty tables still produce a file with the schema
+        with _writer(pa, file_path, schema, fmt, compression) as writer:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                values = list(zip(*rows))
+                arrays = [_array(pa, list(values[position]), arrow_type) for position, (_, arrow_type) in enumerate(columns)]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                rows_written += len(rows)
+                if on_batch:
+                    on_batch(rows_written)
+    finally:
+        cursor.close()
+    return rows_written
+
+
+def read_columnar(file_path):
+    # Loads an exported file back as a pyarrow Table, whichever of the two formats it is
+    pa = _pyarrow()
+    if file_path.endswith(COLUMNAR_FORMATS['parquet']):
+        import pyarrow.parquet as pq
+        return pq.read_table(file_path)
+    with pa.memory_map(file_path) as source:
+        return pa.ipc.open_file(source).read_all()
+
@@ -0,0 +1,135 @@
+import io
+import os
+import queue
+import threading
+import zlib
+
+# Compressed CSV streams for exports and imports. CompressedWriter is a text file for csv.writer whose
+# output is cut into CHUNK_SIZE blocks and handed to a worker thread that compresses and writes them, so the
+# export thread goes straight back to fetching rows. zlib and zstandard release the GIL while compressing,
+# so the two really run side by side. Imports recognise the codec from the file's magic bytes.
+# zstd needs the optional zstandard package; gzip is always available.
+
+CODECS = {'gzip': '.gz', 'zstd': '.zst'}
+EXPORT_COMPRESSION = os.getenv("CAFEAPP_EXPORT_COMPRESSION") or None
+COMPRESSION_LEVEL = {'gzip': 6, 'zstd': 3}
+CHUNK_SIZE = 1 << 20  # bytes of CSV per compressed block
+QUEUE_DEPTH = 4  # blocks waiting for the compressor before the export blocks
+
+_MAGIC = {b'\x1f\x8b': 'gzip', b'\x28\xb5\x2f\xfd': 'zstd'}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compression needs zstandard: pip install zstandard") from None
+    return zstandard
+
+
+def _compressor(codec, level):
+    # Objects with compress(bytes) and flush() that produce one continuous stream
+    if codec == 'gzip':
+        return zlib.compressobj(level, zlib.DEFLATED, 31)
+    if codec == 'zstd':
+        return _zstandard().ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Unknown compression: {codec}")
+
+
+class CompressedWriter(io.TextIOBase):
+
+    def __init__(self, file_path, codec, level=None, chunk_size=CHUNK_SIZE, queue_depth=QUEUE_DEPTH):
+        self._compressor = _compressor(codec, level or COMPRESSION_LEVEL[codec])
+        self._file = open(file_path, 'wb')
+        self._chunk_size = chunk_size
+        self._buffer = []
+        self._buffered = 0
+        self._chunks = queue.Queue(maxsize=queue_depth)
+        self._error = None
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self._thread = threading.Thread(target=self._compress, name='export-compressor', daemon=True)
+        self._thread.start()
+
+    def _compress(self):
+        while True:
+            chunk = self._chunks.get()
+            # After a failure blocks are only drained, so the exporting thread never blocks on a full queue
+            if self._error is None:
+                try:
+                    data = self._compressor.compress(chunk) if chunk is not None else self._compressor.flush()
+                    self._file.write(data)
+                    self.compressed_bytes += len(data)
+                except Exception as err:
+                    self._error = err
+            if chunk is None:
+                return
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._check()
+        data = text.encode('utf-8')
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self._chunk_size:
+            self._hand_off()
+        return len(text)
+
+    def _hand_off(self):
+        chunk = b''.join(self._buffer)
+        self._buffer, self._buffered = [], 0
+        self.raw_bytes += len(chunk)
+        self._chunks.put(chunk)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffered:
+                self._hand_off()
+            self._chunks.put(None)
+            self._thread.join()
+        finally:
+            self._file.close()
+            super().close()
+        self._check()
+
+
+def detect_codec(file_path):
+    # 'gzip', 'zstd' or None for a plain file, from the first bytes rather than the file name
+    with open(file_path, 'rb') as file:
+        head = file.read(4)
+    for magic, codec in _MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def open_export(file_path, codec=None):
+    # Text file for csv.writer: plain, or compressed on a worker thread
+    if codec is None:
+        return open(file_path, 'w', newline='')
+    return CompressedWriter(file_path, codec)
+
+
+def open_import(file_path):
+    # Text file for csv.reader over a plain, gzip or zstd file
+    codec = detect_codec(file_path)
+    if codec is None:
+        return open(file_path, 'r', newline='')
+    if codec == 'gzip':
+        import gzip
+        return gzip.open(file_path, 'rt', newline='', encoding='utf-8')
+    raw = open(file_path, 'rb')
+    try:
+        reader = _zstandard().ZstdDecompressor().stream_reader(raw, closefd=True)
+    except BaseException:
+        raw.close()
+        raise
+    return io.TextIOWrapper(reader, newline='', encoding='utf-8')
@@ -0,0 +1,224 @@
+import os
+import queue
+import re
+import threading
+import time
+from itertools import islice
+from src.storage import DB_ERRORS, MySQLBackend
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_WRITERS = int(os.getenv("CAFEAPP_IMPORT_WRITERS", "1"))
+IMPORT_QUEUE_DEPTH = int(os.getenv("CAFEAPP_IMPORT_QUEUE_DEPTH", "4"))  # parsed batches waiting for a writer
+
+# CSV has no NULL, so empty values in these nullable columns are written as NULL
+NULLABLE_COLUMNS = {'deleted_at'}
+
+# Column names come from the CSV header and end up in the SQL text, so only plain identifiers are accepted
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def validate_columns(columns):
+    for column in columns:
+        if not _IDENTIFIER.match(column or ''):
+            raise ValueError(f"Invalid column name in CSV header: {column!r}")
+    return list(columns)
+
+
+def iter_batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class UpsertStatement:
+    # Builds the multi-row INSERT ... ON DUPLICATE KEY UPDATE text once per batch size instead of once per row
+
+    def __init__(self, table, columns, backend=None):
+        backend = backend or MySQLBackend()
+        self.columns = validate_columns(columns)
+        self.prefix = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES "
+        self.row_placeholder = f"({', '.join(['%s'] * len(self.columns))})"
+        self.suffix = " " + backend.upsert_clause(self.columns)
+        self._sql_by_row_count = {}
+
+    def sql(self, row_count):
+        if row_count not in self._sql_by_row_count:
+            self._sql_by_row_count[row_count] = self.prefix + ', '.join([self.row_placeholder] * row_count) + self.suffix
+        return self._sql_by_row_count[row_count]
+
+    def values(self, rows):
+        return tuple(row[column] or None if column in NULLABLE_COLUMNS else row[column] for row in rows for column in self.columns)
+
+
+class PipelineStats:
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.read_s = 0.0      # reader busy parsing and validating
+        self.blocked_s = 0.0   # reader waiting on a full queue (backpressure)
+        self.write_s = 0.0     # writers busy in the database, summed over writers
+        self.idle_s = 0.0      # writers waiting on an empty queue, summed over writers
+        self.total_s = 0.0
+        self._lock = threading.Lock()
+
+    def add_write(self, row_count, busy, idle):
+        with self._lock:
+            self.rows += row_count
+            self.batches += 1
+            self.write_s += busy
+            self.idle_s += idle
+
+    def summary(self):
+        def rate(seconds):
+            return self.rows / seconds if seconds else 0.0
+        return {
+            'rows': self.rows,
+            'batches': self.batches,
+            'total_s': self.total_s,
+            'reader': {'busy_s': self.read_s, 'blocked_s': self.blocked_s, 'rows_per_s': rate(self.read_s)},
+            'writers': {'busy_s': self.write_s, 'idle_s': self.idle_s, 'rows_per_s': rate(self.write_s)},
+        }
+
+
+def _checked_rows(rows, columns):
+    # csv.DictReader pads short rows with None and collects extra fields under the None key
+    for line_number, row in enumerate(rows, start=2):
+        if None in row or any(row.get(column) is None for column in columns):
+            raise ValueError(f"Line {line_number}: expected {len(columns)} fields")
+        yield row
+
+
+def _next_batch(batches, stop):
+    # None once the reader is finished or the pipeline has been stopped
+    while not stop.is_set():
+        try:
+            return batches.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+
+def pipelined_upsert(pool, table, rows, columns, batch_size=IMPORT_BATCH_SIZE, writers=IMPORT_WRITERS,
+                     queue_depth=IMPORT_QUEUE_DEPTH, on_batch=None, backend=None):
+    # Streams rows into the table in multi-row upserts, one transaction per batch. Parsing overlaps with
+    # the database writes: the calling thread parses and validates batches into a bounded queue while
+    # writer threads, each on its own pooled connection, flush them. A full queue blocks the reader, so
+    # memory stays at queue_depth batches. on_batch(batch_number, row_count, seconds) is called after
+    # every committed batch.
+    statement = UpsertStatement(table, columns, backend)
+    stats = PipelineStats()
+    batches = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+    errors = []
+
+    def write():
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                while True:
+                    waited = time.perf_counter()
+                    item = _next_batch(batches, stop)
+                    if item is None:
+                        return
+                    batch_number, row_count, values = item
+                    start = time.perf_counter()
+                    try:
+                        cursor.execute("START TRANSACTION")
+                        cursor.execute(statement.sql(row_count), values)
+                        conn.commit()
+                    except DB_ERRORS as err:
+                        conn.rollback()
+                        errors.append(err)
+                        stop.set()
+                        return
+                    busy = time.perf_counter() - start
+                    stats.add_write(row_count, busy, start - waited)
+                    if on_batch:
+                        on_batch(batch_number, row_count, busy)
+            finally:
+                cursor.close()
+
+    def put(item):
+        # Retries so a failed writer cannot leave the reader blocked on a full queue forever
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    threads = [threading.Thread(target=write, name=f'import-writer-{n}', daemon=True) for n in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        reading = time.perf_counter()
+        for batch_number, batch in enumerate(iter_batches(_checked_rows(rows, statement.columns), batch_size), start=1):
+            item = (batch_number, len(batch), statement.values(batch))
+            blocked = time.perf_counter()
+            stats.read_s += blocked - reading
+            if not put(item):
+                break
+            reading = time.perf_counter()
+            stats.blocked_s += reading - blocked
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for _ in threads:
+            put(None)
+        for thread in threads:
+            thread.join()
+        stats.total_s = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return stats.summary()
+
+
+def detect_line_terminator(file_path):
+    with open(file_path, 'rb') as file:
+        first_line = file.readline()
+    return '\r\n' if first_line.endswith(b'\r\n') else '\n'
+
+
+def load_data_infile(conn, table, file_path, columns, on_staged=None):
+    # MySQL only. Fast path: the server parses the file itself. Rows land in a temporary staging table
+    # first so existing rows are upserted rather than REPLACEd (REPLACE would delete parent
+    # rows that orders still reference). on_staged(cursor) runs in the same transaction while
+    # import_stage still holds the imported rows.
+    columns = validate_columns(columns)
+    column_list = ', '.join(columns)
+    updates = ', '.join([f"{col} = VALUES({col})" for col in columns])
+    # With ESCAPED BY '' an empty field loads as '', so nullable columns go through a variable and NULLIF,
+    # as UpsertStatement.values does for the batched path
+    targets = ', '.join([f"@{col}" if col in NULLABLE_COLUMNS else col for col in columns])
+    nulls = ', '.join([f"{col} = NULLIF(@{col}, '')" for col in columns if col in NULLABLE_COLUMNS])
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS import_stage")
+        cursor.execute(f"CREATE TEMPORARY TABLE import_stage LIKE {table}")
+        cursor.execute(
+            "LOAD DATA LOCAL INFILE %s INTO TABLE import_stage "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY %s IGNORE 1 LINES ({targets})" + (f" SET {nulls}" if nulls else ""),
+            (file_path, detect_line_terminator(file_path))
+        )
+        cursor.execute("START TRANSACTION")
+        cursor.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM import_stage ON DUPLICATE KEY UPDATE {updates}")
+        if on_staged:
+            on_staged(cursor)
+        cursor.execute("SELECT COUNT(*) FROM import_stage")
+        total = cursor.fetchone()[0]
+        conn.commit()
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS import_stage")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return total
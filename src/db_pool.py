@@ -0,0 +1,181 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ConnectionPool:
+
+    def __init__(self, factory, size=5, timeout=30, health_check=True):
+        # factory is a zero-argument callable returning a new DB-API connection
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.health_check = health_check
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._checked_out = {}  # id(conn) -> checkout timestamp
+        self._started = time.perf_counter()
+
+        # Counters exposed through stats()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._busy_total = 0.0
+        self._peak_in_use = 0
+        self._health_failures = 0
+
+    def acquire(self):
+        start = time.perf_counter()
+        waited = False
+
+        while True:
+            conn = None
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        conn = self.factory()
+                    except BaseException:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                else:
+                    # Pool is at capacity, block until another caller releases a connection
+                    waited = True
+                    remaining = self.timeout - (time.perf_counter() - start)
+                    try:
+                        conn = self._idle.get(timeout=max(remaining, 0))
+                    except queue.Empty:
+                        raise PoolTimeoutError(f"No database connection available after {self.timeout}s (pool size {self.size})")
+
+            if self.health_check and not self._is_healthy(conn):
+                self._discard(conn)
+                continue
+
+            break
+
+        waited_for = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+            self._wait_total += waited_for
+            self._wait_max = max(self._wait_max, waited_for)
+            self._checked_out[id(conn)] = time.perf_counter()
+            self._peak_in_use = max(self._peak_in_use, len(self._checked_out))
+        return conn
+
+    def release(self, conn):
+        with self._lock:
+            checked_out_at = self._checked_out.pop(id(conn), None)
+            if checked_out_at is not None:
+                self._busy_total += time.perf_counter() - checked_out_at
+
+        # Never hand a half-finished transaction to the next caller
+        try:
+            if getattr(conn, 'in_transaction', False):
+                conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            in_use = len(self._checked_out)
+            now = time.perf_counter()
+            busy = self._busy_total + sum(now - t for t in self._checked_out.values())
+            elapsed = now - self._started
+            return {
+                'size': self.size,
+                'created': self._created,
+                'in_use': in_use,
+                'idle': self._idle.qsize(),
+                'peak_in_use': self._peak_in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_total_s': self._wait_total,
+                'wait_avg_ms': (self._wait_total / self._checkouts * 1000) if self._checkouts else 0.0,
+                'wait_max_ms': self._wait_max * 1000,
+                'health_check_failures': self._health_failures,
+                'utilisation': busy / (self.size * elapsed) if elapsed > 0 else 0.0,
+            }
+
+    def _is_healthy(self, conn):
+        try:
+            # mysql.connector pings the server in is_connected()
+            if hasattr(conn, 'is_connected'):
+                healthy = conn.is_connected()
+            else:
+                healthy = True
+        except Exception:
+            healthy = False
+        if not healthy:
+            with self._lock:
+                self._health_failures += 1
+        return healthy
+
+    def _discard(self, conn):
+        with self._lock:
+            self._created -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pool(factory):
+    # One pool per process, shared by the app, the import/export paths and the analytics code
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ConnectionPool(
+                factory,
+                size=int(os.getenv("CAFEAPP_POOL_SIZE", "5")),
+                timeout=float(os.getenv("CAFEAPP_POOL_TIMEOUT", "30")),
+                health_check=os.getenv("CAFEAPP_POOL_HEALTH_CHECK", "1") != "0",
+            )
+        return _shared_pool
+
+
+def reset_pool():
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.close_all()
+        _shared_pool = None
@@ -0,0 +1,80 @@
+from decimal import Decimal, InvalidOperation
+
+# Natural key columns used to match CSV values to existing rows
+NATURAL_KEYS = {
+    'customers': ('name', 'address', 'phone'),
+    'couriers': ('name', 'phone'),
+    'order_status': ('order_status',),
+    'products': ('name', 'price'),
+}
+
+MAX_ROWS_PER_STATEMENT = 1000
+
+
+def _normalise(column, value):
+    # Prices come back from MySQL as Decimal('1.50') but from CSV as '1.5' or '1.50'
+    if column == 'price':
+        try:
+            return f"{Decimal(str(value)):.2f}"
+        except InvalidOperation:
+            return str(value)
+    return str(value)
+
+
+class IdResolver:
+
+    def __init__(self, tables=NATURAL_KEYS):
+        self.keys = {table: NATURAL_KEYS[table] for table in tables}
+        self.ids = {table: {} for table in self.keys}  # table -> {natural key tuple: id}
+        self.pending = {table: {} for table in self.keys}  # table -> {natural key tuple: raw values}
+        self.created = {table: 0 for table in self.keys}
+
+    def key(self, table, values):
+        return tuple(_normalise(column, values[column]) for column in self.keys[table])
+
+    def preload(self, conn):
+        # One SELECT per table replaces a SELECT (and often an INSERT) per CSV row
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for table, columns in self.keys.items():
+                cursor.execute(f"SELECT id, {', '.join(columns)} FROM {table}")
+                for row in cursor.fetchall():
+                    self.ids[table].setdefault(self.key(table, row), row['id'])
+        finally:
+            cursor.close()
+
+    def resolve(self, table, values):
+        # Returns the id if known; otherwise queues the entity for creation and returns None
+        key = self.key(table, values)
+        row_id = self.ids[table].get(key)
+        if row_id is None:
+            self.pending[table].setdefault(key, tuple(values[column] for column in self.keys[table]))
+        return row_id
+
+    def lookup(self, table, values):
+        return self.ids[table].get(self.key(table, values))
+
+    def has_pending(self):
+        return any(self.pending.values())
+
+    def create_pending(self, cursor):
+        # Creates every queued entity with one multi-row INSERT per table, then reads the new ids back by natural key
+        for table, pending in self.pending.items():
+            if not pending:
+                continue
+            columns = self.keys[table]
+            column_list = ', '.join(columns)
+            row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+            pending_rows = list(pending.values())
+
+            for start in range(0, len(pending_rows), MAX_ROWS_PER_STATEMENT):
+                chunk = pending_rows[start:start + MAX_ROWS_PER_STATEMENT]
+                values = tuple(value for row in chunk for value in row)
+                cursor.execute(f"INSERT INTO {table} ({column_list}) VALUES {', '.join([row_placeholder] * len(chunk))}", values)
+                cursor.execute(f"SELECT id, {column_list} FROM {table} WHERE ({column_list}) IN ({', '.join([row_placeholder] * len(chunk))})", values)
+                for row in cursor.fetchall():
+                    row = dict(zip(('id',) + columns, row))
+                    self.ids[table].setdefault(self.key(table, row), row['id'])
+
+            self.created[table] += len(pending_rows)
+            pending.clear()
@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Collection is opt-in so the till pays nothing for it by default
+ENABLED = os.getenv("CAFEAPP_SQL_STATS") == "1"
+SLOW_QUERY_MS = float(os.getenv("CAFEAPP_SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG = os.getenv("CAFEAPP_SLOW_QUERY_LOG", os.path.join("logs", "slow_query.log"))
+
+MAX_SAMPLES = 10000  # latency samples kept per statement (reservoir sampled beyond this)
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+
+def fingerprint(sql):
+    # Normalises a statement so every execution of the same query shape shares one bucket:
+    # literals become ?, and IN lists / multi-row VALUES collapse regardless of their length
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _LIST.sub('(...)', sql)
+    sql = _ROWS.sub('(...)', sql)
+    return sql
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class StatementStats:
+
+    def __init__(self):
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.rows = 0
+        self.samples = []
+
+    def record(self, seconds):
+        self.count += 1
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'rows': self.rows,
+            'total_ms': self.total_s * 1000,
+            'p50_ms': percentile(ordered, 0.50) * 1000,
+            'p95_ms': percentile(ordered, 0.95) * 1000,
+            'p99_ms': percentile(ordered, 0.99) * 1000,
+            'max_ms': self.max_s * 1000,
+        }
+
+
+class SqlStats:
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, slow_query_log=SLOW_QUERY_LOG):
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_log = slow_query_log
+        self.statements = {}
+        self.actions = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._slow_logger = None
+
+    @contextmanager
+    def action(self, name):
+        # Groups every statement issued inside the block, e.g. one menu action
+        previous = getattr(self._local, 'action', None)
+        self._local.action = name
+        start = time.perf_counter()
+        round_trips_before = self.actions.get(name, {}).get('round_trips', 0)
+        try:
+            yield
+        finally:
+            self._local.action = previous
+            with self._lock:
+                action = self.actions.setdefault(name, {'runs': 0, 'round_trips': 0, 'seconds': 0.0, 'max_round_trips': 0})
+                action['runs'] += 1
+                action['seconds'] += time.perf_counter() - start
+                action['max_round_trips'] = max(action['max_round_trips'], action['round_trips'] - round_trips_before)
+
+    def record(self, sql, seconds, params=None):
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = StatementStats()
+            stats.record(seconds)
+            action_name = getattr(self._local, 'action', None)
+            if action_name is not None:
+                action = self.actions.setdefault(action_name, {'runs': 0, 'round_trips': 0, 'seconds': 0.0, 'max_round_trips': 0})
+                action['round_trips'] += 1
+        if seconds * 1000 >= self.slow_query_ms:
+            self._log_slow(sql, seconds, params)
+        return key
+
+    def add_rows(self, key, rows):
+        if rows and rows > 0:
+            with self._lock:
+                self.statements[key].rows += rows
+
+    def _log_slow(self, sql, seconds, params):
+        if self._slow_logger is None:
+            log_dir = os.path.dirname(self.slow_query_log)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            logger = logging.getLogger('cafeapp.slow_query')
+            logger.propagate = False
+            handler = logging.FileHandler(self.slow_query_log)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            self._slow_logger = logger
+        action = getattr(self._local, 'action', None)
+        self._slow_logger.info("%.1f ms [%s] %s -- params: %.200r", seconds * 1000, action or '-', _WHITESPACE.sub(' ', sql).strip(), params)
+
+    def report(self):
+        with self._lock:
+            statements = {key: stats.summary() for key, stats in self.statements.items()}
+            actions = {name: dict(action) for name, action in self.actions.items()}
+        return {'statements': statements, 'actions': actions}
+
+    def write_report(self, file_path):
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, 'w') as file:
+            json.dump(self.report(), file, indent=2, sort_keys=True)
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+            self.actions.clear()
+
+
+class InstrumentedCursor:
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._key = None
+
+    def execute(self, sql, params=None):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params)
+        finally:
+            self._key = self._stats.record(sql, time.perf_counter() - start, params)
+            if not sql.lstrip()[:6].upper() == 'SELECT':
+                self._stats.add_rows(self._key, self._cursor.rowcount)
+
+    def executemany(self, sql, seq_of_params):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_of_params)
+        finally:
+            self._key = self._stats.record(sql, time.perf_counter() - start)
+            self._stats.add_rows(self._key, self._cursor.rowcount)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None and self._key:
+            self._stats.add_rows(self._key, 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        if self._key:
+            self._stats.add_rows(self._key, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._key:
+            self._stats.add_rows(self._key, len(rows))
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    # Transparent proxy that times every statement issued through its cursors
+
+    def __init__(self, conn, stats):
+        self._conn = conn
+        self._stats = stats
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._stats)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            return self._conn.commit()
+        finally:
+            self._stats.record("COMMIT", time.perf_counter() - start)
+
+    def rollback(self):
+        start = time.perf_counter()
+        try:
+            return self._conn.rollback()
+        finally:
+            self._stats.record("ROLLBACK", time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        if name in ('_conn', '_stats'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+
+SQL_STATS = SqlStats()
+
+
+def instrument(conn):
+    return InstrumentedConnection(conn, SQL_STATS) if ENABLED else conn
+
+
+def format_report(report, limit=25):
+    lines = ["\033[93mSQL statements (slowest total time first):\033[0m"]
+    header = f"{'count':>7} {'rows':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'total ms':>10}  statement"
+    lines.append(f"\033[44;37m{header}\033[0m")
+    statements = sorted(report['statements'].items(), key=lambda item: item[1]['total_ms'], reverse=True)
+    for key, stats in statements[:limit]:
+        lines.append(f"{stats['count']:>7} {stats['rows']:>9} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['total_ms']:>10.1f}  {key[:100]}")
+    if not statements:
+        lines.append("\033[90mEmpty\033[0m")
+
+    lines.append("")
+    lines.append("\033[93mRound trips per menu action:\033[0m")
+    header = f"{'runs':>6} {'avg trips':>10} {'max trips':>10} {'avg ms':>9}  action"
+    lines.append(f"\033[44;37m{header}\033[0m")
+    for name, action in sorted(report['actions'].items(), key=lambda item: item[1]['round_trips'], reverse=True):
+        runs = action['runs'] or 1
+        lines.append(f"{action['runs']:>6} {action['round_trips'] / runs:>10.1f} {action['max_round_trips']:>10} {action['seconds'] / runs * 1000:>9.1f}  {name}")
+    if not report['actions']:
+        lines.append("\033[90mEmpty\033[0m")
+    return "\n".join(lines)
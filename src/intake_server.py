@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from src.app import get_connection_pool
+from src.order_summary import refresh_orders, set_summary_status
+from src.orders import DEFAULT_ORDER_STATUS, set_status, write_order
+from src.storage import DB_ERRORS, get_backend, run_in_transaction
+
+# Order intake over a local socket. Every request and response is one JSON object per line:
+#   {"id": 1, "op": "create_order", "customer_id": 3, "courier_id": 1, "product_ids": [4, 4, 7]}
+#   {"id": 2, "op": "set_status", "order_ids": [12, 13], "status": "READY"}
+#   {"id": 3, "op": "ping"}
+# Responses echo the request id: {"id": 1, "ok": true, "order_id": 42} or {"id": 1, "ok": false, "error": "..."}
+# An order is rejected whole, with an error naming the products that are short, if any of its stock cannot be reserved.
+
+INTAKE_HOST = os.getenv("CAFEAPP_INTAKE_HOST", "127.0.0.1")
+INTAKE_PORT = int(os.getenv("CAFEAPP_INTAKE_PORT", "8765"))
+INTAKE_WORKERS = int(os.getenv("CAFEAPP_INTAKE_WORKERS", "4"))  # threads (and pooled connections) doing DB work
+INTAKE_CONCURRENCY = int(os.getenv("CAFEAPP_INTAKE_CONCURRENCY", "32"))  # requests in flight at once across all clients
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+def _ids(request, key):
+    value = request.get(key)
+    if not isinstance(value, list) or not value or not all(isinstance(item, int) and not isinstance(item, bool) for item in value):
+        raise ValueError(f"'{key}' must be a non-empty list of integer ids")
+    return value
+
+
+def _id(request, key):
+    value = request.get(key)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"'{key}' must be an integer id")
+    return value
+
+
+def _require_live(cursor, backend, table, row_id):
+    # Soft-deleted customers and couriers take no new orders, as in the interactive menus; the row stays
+    # locked so it cannot be deleted before the order commits
+    cursor.execute(f"SELECT id FROM {table} WHERE id = %s AND deleted_at IS NULL{backend.share_lock}", (row_id,))
+    if cursor.fetchone() is None:
+        raise ValueError(f"No {table[:-1]} with id {row_id}")
+
+
+class IntakeServer:
+
+    def __init__(self, pool, workers=INTAKE_WORKERS, concurrency=INTAKE_CONCURRENCY, backend=None):
+        self.pool = pool
+        self.backend = backend or get_backend()
+        # Each worker holds a pooled connection while it works; more workers than connections would only
+        # wait on pool checkouts and could time out
+        if workers > pool.size:
+            print(f"\033[93mUsing {pool.size} workers instead of {workers}: the connection pool holds {pool.size} connections (CAFEAPP_POOL_SIZE).\033[0m")
+        self.workers = max(1, min(workers, pool.size))
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='intake')
+        self.limit = asyncio.Semaphore(concurrency)
+        self.status_ids = {}
+        self.handled = 0
+        self.failed = 0
+        self.retries = 0
+        self._server = None
+
+    def load_statuses(self, conn):
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, order_status FROM order_status ORDER BY id DESC")
+        # Descending so the lowest id wins if a name is duplicated, as in CafeApp.get_status_id
+        self.status_ids = {name: status_id for status_id, name in cursor.fetchall()}
+        cursor.close()
+
+    def _status_id(self, name):
+        if name not in self.status_ids:
+            raise ValueError(f"Unknown order status: {name}")
+        return self.status_ids[name]
+
+    def _count_retry(self, err):
+        self.retries += 1
+
+    def _in_transaction(self, work):
+        # Runs on an executor thread with a pooled connection; one transaction per request, run again
+        # if it loses a deadlock to another till ordering the same products
+        with self.pool.connection() as conn:
+            return run_in_transaction(conn, work, on_retry=self._count_retry)
+
+    def create_order(self, request):
+        customer_id, courier_id = _id(request, 'customer_id'), _id(request, 'courier_id')
+        product_ids = _ids(request, 'product_ids')
+        status = self._status_id(request['status']) if 'status' in request else DEFAULT_ORDER_STATUS
+
+        def work(cursor):
+            _require_live(cursor, self.backend, 'customers', customer_id)
+            _require_live(cursor, self.backend, 'couriers', courier_id)
+            order_id = write_order(cursor, customer_id, courier_id, product_ids, status)
+            refresh_orders(cursor, self.backend, [order_id])
+            return order_id
+        return {'order_id': self._in_transaction(work)}
+
+    def set_status(self, request):
+        order_ids = _ids(request, 'order_ids')
+        status_id = self._status_id(request.get('status'))
+
+        def work(cursor):
+            updated = set_status(cursor, self.backend, order_ids, status_id)
+            set_summary_status(cursor, order_ids, status_id)
+            return updated
+        return {'updated': self._in_transaction(work)}
+
+    async def dispatch(self, request):
+        op = request.get('op')
+        if op == 'ping':
+            return {}
+        if op == 'create_order':
+            work = self.create_order
+        elif op == 'set_status':
+            work = self.set_status
+        else:
+            raise ValueError(f"Unknown op: {op!r}")
+        return await asyncio.get_running_loop().run_in_executor(self.executor, work, request)
+
+    async def respond(self, line):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get('id')
+            response = dict(await self.dispatch(request), ok=True)
+        except (*DB_ERRORS, ValueError) as err:
+            self.failed += 1
+            response = {'ok': False, 'error': str(err)}
+        except Exception as err:
+            # Anything else (a pool timeout, a field of the wrong shape) still gets an answer on this line
+            self.failed += 1
+            response = {'ok': False, 'error': f"{type(err).__name__}: {err}"}
+        self.handled += 1
+        response['id'] = request_id
+        return response
+
+    async def handle_client(self, reader, writer):
+        # Requests on one connection are handled concurrently; responses are matched by id, not order
+        write_lock = asyncio.Lock()
+        pending = set()
+
+        async def answer(line):
+            response = await self.respond(line)
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        def finished(task):
+            pending.discard(task)
+            self.limit.release()
+            if not task.cancelled():
+                task.exception()  # a client that went away is not an error worth reporting
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than MAX_LINE_BYTES; the stream cannot be resynchronised
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    # A slot is taken before the task exists, so when the server is busy this client's socket is
+                    # not read any further and its requests wait in the kernel buffer instead of in memory here
+                    await self.limit.acquire()
+                    task = asyncio.create_task(answer(line))
+                    pending.add(task)
+                    task.add_done_callback(finished)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host=INTAKE_HOST, port=INTAKE_PORT, unix_path=None):
+        with self.pool.connection() as conn:
+            self.load_statuses(conn)
+        if unix_path:
+            self._server = await asyncio.start_unix_server(self.handle_client, path=unix_path, limit=MAX_LINE_BYTES)
+        else:
+            self._server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE_BYTES)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+
+async def serve(args):
+    server = IntakeServer(get_connection_pool(), workers=args.workers, concurrency=args.concurrency)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or ', '.join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"\033[92mOrder intake listening on {where} ({server.workers} workers, {args.concurrency} concurrent requests)\033[0m", flush=True)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+        print(f"Handled {server.handled} requests ({server.failed} failed, {server.retries} deadlock retries)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accept orders and status updates over a local JSON-lines socket.")
+    parser.add_argument('--host', default=INTAKE_HOST)
+    parser.add_argument('--port', type=int, default=INTAKE_PORT)
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--workers', type=int, default=INTAKE_WORKERS, help="threads doing database work")
+    parser.add_argument('--concurrency', type=int, default=INTAKE_CONCURRENCY, help="requests admitted at once")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
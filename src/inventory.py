@@ -0,0 +1,79 @@
+# Stock reservation for orders. Every product in an order is decremented by one guarded UPDATE
+# (WHERE inventory >= quantity), so concurrent tills can never sell stock that is not there: either
+# every product in the reservation has enough units and all are taken, or none are and the caller
+# gets an InsufficientStockError listing the shortfalls.
+
+MAX_PRODUCTS_PER_STATEMENT = 1000
+
+
+class InsufficientStockError(ValueError):
+
+    def __init__(self, shortages):
+        # shortages maps product_id -> (requested, available)
+        self.shortages = shortages
+        details = ', '.join(f"product {product_id}: requested {requested}, in stock {available}"
+                            for product_id, (requested, available) in sorted(shortages.items()))
+        super().__init__(f"Not enough stock ({details})")
+
+
+def _case_update(cursor, quantities, sign, guarded):
+    # One CASE UPDATE per chunk of products, in id order so concurrent reservations lock rows in the
+    # same sequence and cannot deadlock each other. That holds only if nothing earlier in the transaction
+    # has read-locked the products, so callers reserve before writing order items. Returns the number of
+    # products changed
+    product_ids = sorted(quantities)
+    changed = 0
+    for start in range(0, len(product_ids), MAX_PRODUCTS_PER_STATEMENT):
+        chunk = product_ids[start:start + MAX_PRODUCTS_PER_STATEMENT]
+        cases = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+        values = [value for product_id in chunk for value in (product_id, quantities[product_id])]
+        sql = f"UPDATE products SET inventory = inventory {sign} CASE id {cases} END WHERE id IN ({', '.join(['%s'] * len(chunk))})"
+        params = [*values, *chunk]
+        if guarded:
+            # Soft-deleted products can still be restocked by returns, but not sold
+            sql += f" AND deleted_at IS NULL AND inventory >= CASE id {cases} END"
+            params += values
+        cursor.execute(sql, tuple(params))
+        changed += cursor.rowcount
+    return changed
+
+
+def _shortages(cursor, quantities):
+    product_ids = list(quantities)
+    cursor.execute(f"SELECT id, inventory FROM products WHERE deleted_at IS NULL AND id IN ({', '.join(['%s'] * len(product_ids))})", tuple(product_ids))
+    in_stock = {}
+    for row in cursor.fetchall():
+        product_id, inventory = (row['id'], row['inventory']) if isinstance(row, dict) else row
+        in_stock[product_id] = inventory or 0
+    return {product_id: (quantity, in_stock.get(product_id, 0))
+            for product_id, quantity in quantities.items() if in_stock.get(product_id, 0) < quantity}
+
+
+def reserve(cursor, quantities):
+    # quantities maps product_id -> units; must run inside the caller's transaction
+    quantities = {product_id: quantity for product_id, quantity in quantities.items() if quantity > 0}
+    if not quantities:
+        return
+    # The savepoint undoes a partial reservation without discarding the rest of the caller's transaction
+    cursor.execute("SAVEPOINT reserve_stock")
+    if _case_update(cursor, quantities, '-', guarded=True) == len(quantities):
+        cursor.execute("RELEASE SAVEPOINT reserve_stock")
+        return
+    cursor.execute("ROLLBACK TO SAVEPOINT reserve_stock")
+    cursor.execute("RELEASE SAVEPOINT reserve_stock")
+    raise InsufficientStockError(_shortages(cursor, quantities))
+
+
+def release(cursor, quantities):
+    # Returns units to stock, e.g. when an order is deleted or loses items
+    quantities = {product_id: quantity for product_id, quantity in quantities.items() if quantity > 0}
+    if quantities:
+        _case_update(cursor, quantities, '+', guarded=False)
+
+
+def adjust(cursor, previous, wanted):
+    # Moves an edited order from its previous quantities to the wanted ones: only the differences are
+    # reserved or released, so keeping an item does not take its stock twice
+    products = set(previous) | set(wanted)
+    release(cursor, {product_id: previous.get(product_id, 0) - wanted.get(product_id, 0) for product_id in products})
+    reserve(cursor, {product_id: wanted.get(product_id, 0) - previous.get(product_id, 0) for product_id in products})
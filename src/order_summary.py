@@ -0,0 +1,218 @@
+from src.orders import MAX_ROWS_PER_STATEMENT
+
+# order_summary holds one denormalised row per order (names, status, items with quantities and the prices
+# charged, count and total), so the order board and the orders export read a single table instead of joining
+# six. Every write path that changes an order, or a customer/courier/product shown on one, refreshes the affected rows in the same
+# transaction. rebuild() recreates the table from scratch without readers ever seeing it empty.
+
+SUMMARY_COLUMNS = [
+    'order_id', 'customer_id', 'customer_name', 'customer_address', 'customer_phone',
+    'courier_id', 'courier_name', 'courier_phone', 'status_id', 'status',
+    'items', 'item_quantities', 'item_prices', 'item_count', 'total', 'created_at',
+]
+
+REBUILD_BATCH_SIZE = 5000
+SUMMARY_TABLE = 'order_summary'
+SHADOW_TABLE = 'order_summary_rebuild'
+
+# Orders showing a customer, courier or product; {ids} is a placeholder list or a subquery
+SOURCE_CONDITIONS = {
+    'customers': "o.customer_id IN ({ids})",
+    'couriers': "o.courier IN ({ids})",
+    'products': "o.id IN (SELECT order_id FROM order_items WHERE product_id IN ({ids}))",
+}
+
+
+# Joins the item lists stored in order_summary. Product names may contain ", " but not this control
+# character, so names, quantities and prices split back into aligned entries
+ITEM_SEPARATOR = '\x1f'
+
+
+def _order_select(backend, row_count):
+    return f"""
+    SELECT
+        o.id, o.customer_id, cu.name, cu.address, cu.phone,
+        o.courier, co.name, co.phone, o.status, os.order_status, o.created_at
+    FROM orders o
+    LEFT JOIN customers cu ON o.customer_id = cu.id
+    LEFT JOIN couriers co ON o.courier = co.id
+    LEFT JOIN order_status os ON o.status = os.id
+    WHERE o.id IN ({', '.join(['%s'] * row_count)}){backend.share_lock}
+    """
+
+
+def _item_select(backend, row_count):
+    return f"""
+    SELECT oi.order_id, p.name, oi.quantity, oi.unit_price
+    FROM order_items oi
+    JOIN products p ON oi.product_id = p.id
+    WHERE oi.order_id IN ({', '.join(['%s'] * row_count)})
+    ORDER BY oi.order_id, p.id{backend.share_lock}
+    """
+
+
+def split_items(value):
+    return value.split(ITEM_SEPARATOR) if value else []
+
+
+def format_items(items, quantities):
+    # "Tea", "Cake" with quantities 2, 1 -> "Tea x2, Cake"
+    counts = split_items(quantities)
+    formatted = []
+    for position, name in enumerate(split_items(items)):
+        count = counts[position] if position < len(counts) else '1'
+        formatted.append(name if count == '1' else f"{name} x{count}")
+    return ', '.join(formatted)
+
+
+def _summary_rows(cursor, backend, chunk):
+    # Items are aggregated here rather than with GROUP_CONCAT, which MySQL truncates at group_concat_max_len
+    cursor.execute(_item_select(backend, len(chunk)), chunk)
+    items = {}
+    for order_id, name, quantity, unit_price in cursor.fetchall():
+        items.setdefault(order_id, []).append((name, quantity, unit_price))
+    cursor.execute(_order_select(backend, len(chunk)), chunk)
+    rows = []
+    for order in cursor.fetchall():
+        order_items = items.get(order[0], [])
+        names = ITEM_SEPARATOR.join([name for name, _, _ in order_items])
+        quantities = ITEM_SEPARATOR.join([str(quantity) for _, quantity, _ in order_items])
+        prices = ITEM_SEPARATOR.join([str(unit_price) for _, _, unit_price in order_items])
+        count = sum([quantity for _, quantity, _ in order_items])
+        total = sum([quantity * unit_price for _, quantity, unit_price in order_items])
+        rows.append(order[:10] + (names, quantities, prices, count, total, order[10]))
+    return rows
+
+
+def refresh_orders(cursor, backend, order_ids, target=SUMMARY_TABLE):
+    # Recomputes the summary rows of the given orders; ids of deleted orders simply lose their row
+    order_ids = list(dict.fromkeys(order_ids))
+    for start in range(0, len(order_ids), MAX_ROWS_PER_STATEMENT):
+        chunk = tuple(order_ids[start:start + MAX_ROWS_PER_STATEMENT])
+        rows = _summary_rows(cursor, backend, chunk)
+        cursor.execute(f"DELETE FROM {target} WHERE order_id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+        if rows:
+            cursor.executemany(f"INSERT INTO {target} ({', '.join(SUMMARY_COLUMNS)}) VALUES ({', '.join(['%s'] * len(SUMMARY_COLUMNS))})", rows)
+
+
+def refresh_where(cursor, backend, condition, params=(), target=SUMMARY_TABLE):
+    # For changes to a customer, courier or product: condition selects the affected orders (alias o)
+    cursor.execute(f"SELECT o.id FROM orders o WHERE {condition}", tuple(params))
+    order_ids = [row[0] for row in cursor.fetchall()]
+    refresh_orders(cursor, backend, order_ids, target)
+    return len(order_ids)
+
+
+def _source_condition(table, ids):
+    if table not in SOURCE_CONDITIONS:
+        raise ValueError(f"Order summaries do not depend on table {table!r}")
+    return SOURCE_CONDITIONS[table].format(ids=ids)
+
+
+def refresh_for(cursor, backend, table, ids, target=SUMMARY_TABLE):
+    # Orders showing any of the given customers, couriers or products
+    ids = list(ids)
+    for start in range(0, len(ids), MAX_ROWS_PER_STATEMENT):
+        chunk = ids[start:start + MAX_ROWS_PER_STATEMENT]
+        refresh_where(cursor, backend, _source_condition(table, ', '.join(['%s'] * len(chunk))), chunk, target)
+
+
+def refresh_for_query(cursor, backend, table, id_query):
+    # As refresh_for, for ids selected by SQL, e.g. every id in an import staging table
+    return refresh_where(cursor, backend, _source_condition(table, id_query))
+
+
+def set_summary_status(cursor, order_ids, status_id):
+    # Status changes touch two columns, so they are applied in place instead of recomputing the row
+    order_ids = list(order_ids)
+    if not order_ids:
+        return
+    cursor.execute(
+        f"UPDATE order_summary SET status_id = %s, status = (SELECT order_status FROM order_status WHERE id = %s) "
+        f"WHERE order_id IN ({', '.join(['%s'] * len(order_ids))})",
+        (status_id, status_id, *order_ids)
+    )
+
+
+def sweep_summary_status(cursor, from_status_id, to_status_id):
+    cursor.execute(
+        "UPDATE order_summary SET status_id = %s, status = (SELECT order_status FROM order_status WHERE id = %s) WHERE status_id = %s",
+        (to_status_id, to_status_id, from_status_id)
+    )
+
+
+def remove_orders(cursor, order_ids):
+    order_ids = list(order_ids)
+    for start in range(0, len(order_ids), MAX_ROWS_PER_STATEMENT):
+        chunk = order_ids[start:start + MAX_ROWS_PER_STATEMENT]
+        cursor.execute(f"DELETE FROM order_summary WHERE order_id IN ({', '.join(['%s'] * len(chunk))})", tuple(chunk))
+
+
+def _refresh_changed(cursor, backend, since, target):
+    # Re-summarises orders touched by change_log entries after since; returns the newest entry seen
+    cursor.execute("SELECT id, table_name, row_id FROM change_log WHERE id > %s ORDER BY id", (since,))
+    changes = cursor.fetchall()
+    changed = {}
+    for _, table, row_id in changes:
+        changed.setdefault(table, set()).add(row_id)
+    refresh_orders(cursor, backend, sorted(changed.pop('orders', ())), target)
+    for table, ids in changed.items():
+        if table in SOURCE_CONDITIONS:
+            refresh_for(cursor, backend, table, sorted(ids), target)
+    return changes[-1][0] if changes else since
+
+
+def _fill(conn, cursor, backend, target, batch_size, on_batch, commit_batches):
+    total = 0
+    last_id = 0
+    while True:
+        cursor.execute("SELECT id FROM orders WHERE id > %s ORDER BY id LIMIT %s", (last_id, batch_size))
+        order_ids = [row[0] for row in cursor.fetchall()]
+        if not order_ids:
+            return total
+        if commit_batches:
+            cursor.execute("START TRANSACTION")
+        refresh_orders(cursor, backend, order_ids, target)
+        if commit_batches:
+            conn.commit()
+        total += len(order_ids)
+        last_id = order_ids[-1]
+        if on_batch:
+            on_batch(total)
+
+
+def rebuild(conn, backend, batch_size=REBUILD_BATCH_SIZE, on_batch=None):
+    # Recreates every summary row. Readers keep seeing the old rows until the new ones are complete, and a
+    # failure part way through leaves the old table as it was
+    cursor = conn.cursor()
+    try:
+        if not backend.swaps_tables:
+            # One transaction: other connections read the old rows until it commits
+            cursor.execute("START TRANSACTION")
+            cursor.execute(f"DELETE FROM {SUMMARY_TABLE}")
+            total = _fill(conn, cursor, backend, SUMMARY_TABLE, batch_size, on_batch, commit_batches=False)
+            conn.commit()
+            return total
+
+        # A shadow copy is filled a batch per transaction, so the live table is never locked for the whole
+        # rebuild. Orders that change meanwhile are found through change_log and re-summarised into the copy
+        # before the swap, and once more in the live table after it for writes that raced the swap
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM change_log")
+        since = cursor.fetchone()[0]
+        cursor.execute(f"DROP TABLE IF EXISTS {SHADOW_TABLE}")
+        cursor.execute(f"CREATE TABLE {SHADOW_TABLE} LIKE {SUMMARY_TABLE}")
+        total = _fill(conn, cursor, backend, SHADOW_TABLE, batch_size, on_batch, commit_batches=True)
+        cursor.execute("START TRANSACTION")
+        since = _refresh_changed(cursor, backend, since, SHADOW_TABLE)
+        conn.commit()
+        cursor.execute(f"RENAME TABLE {SUMMARY_TABLE} TO {SUMMARY_TABLE}_old, {SHADOW_TABLE} TO {SUMMARY_TABLE}")
+        cursor.execute(f"DROP TABLE {SUMMARY_TABLE}_old")
+        cursor.execute("START TRANSACTION")
+        _refresh_changed(cursor, backend, since, SUMMARY_TABLE)
+        conn.commit()
+        return total
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
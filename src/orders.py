@@ -0,0 +1,97 @@
+from collections import Counter
+
+from src.analytics import move_status_counts
+from src.inventory import adjust, reserve
+
+# Upper bound on rows per multi-row statement, keeps packets well under max_allowed_packet
+MAX_ROWS_PER_STATEMENT = 1000
+
+DEFAULT_ORDER_STATUS = 1  # 'PREPARING'
+
+
+def insert_order_items(cursor, items):
+    # items is a list of (order_id, product_id) pairs, one per unit; repeats become a quantity on a single
+    # row and the product's current price is captured as unit_price, with as few INSERTs as possible
+    rows = list(Counter(items).items())
+    for start in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+        chunk = rows[start:start + MAX_ROWS_PER_STATEMENT]
+        placeholders = ', '.join(['(%s, %s, %s, (SELECT price FROM products WHERE id = %s))'] * len(chunk))
+        values = [value for (order_id, product_id), quantity in chunk for value in (order_id, product_id, quantity, product_id)]
+        cursor.execute(f"INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES {placeholders}", tuple(values))
+
+
+def replace_order_items(cursor, order_id, product_ids):
+    # Rewrites an order's items as a diff: removed products are deleted, changed quantities updated in
+    # place (keeping the unit price captured when the order was placed) and only new products inserted.
+    # Stock is moved by the difference first. Returns the previous product_id -> quantity map
+    cursor.execute("SELECT product_id, quantity FROM order_items WHERE order_id = %s", (order_id,))
+    current = {product_id: quantity for product_id, quantity in cursor.fetchall()}
+    wanted = Counter(product_ids)
+    adjust(cursor, current, wanted)
+
+    removed = [product_id for product_id in current if product_id not in wanted]
+    if removed:
+        cursor.execute(f"DELETE FROM order_items WHERE order_id = %s AND product_id IN ({', '.join(['%s'] * len(removed))})",
+                       (order_id, *removed))
+
+    changed = [product_id for product_id in wanted if product_id in current and current[product_id] != wanted[product_id]]
+    if changed:
+        cases = ' '.join(['WHEN %s THEN %s'] * len(changed))
+        values = [value for product_id in changed for value in (product_id, wanted[product_id])]
+        cursor.execute(
+            f"UPDATE order_items SET quantity = CASE product_id {cases} END WHERE order_id = %s AND product_id IN ({', '.join(['%s'] * len(changed))})",
+            (*values, order_id, *changed)
+        )
+
+    insert_order_items(cursor, [(order_id, product_id) for product_id in product_ids if product_id not in current])
+    return current
+
+
+def write_order(cursor, customer_id, courier_id, product_ids, status=DEFAULT_ORDER_STATUS):
+    cursor.execute("INSERT INTO orders (customer_id, courier, status) VALUES (%s, %s, %s)",
+                   (customer_id, courier_id, status))
+    order_id = cursor.lastrowid
+    # Stock is reserved before the items are written: their foreign key check and price lookup take shared
+    # locks on the product rows, and two orders for one product deadlock upgrading those to the UPDATE's
+    reserve(cursor, Counter(product_ids))
+    insert_order_items(cursor, [(order_id, product_id) for product_id in product_ids])
+    return order_id
+
+
+def write_orders(cursor, orders, adjust_inventory=True):
+    # Each order row needs its own INSERT to learn its id, but the items and the
+    # inventory changes of the whole batch are written with a couple of set-based statements.
+    order_ids = []
+    items = []
+    quantities = Counter()
+    for order in orders:
+        cursor.execute("INSERT INTO orders (customer_id, courier, status) VALUES (%s, %s, %s)",
+                       (order['customer_id'], order['courier_id'], order.get('status', DEFAULT_ORDER_STATUS)))
+        order_id = cursor.lastrowid
+        order_ids.append(order_id)
+        items.extend((order_id, product_id) for product_id in order['product_ids'])
+        quantities.update(order['product_ids'])
+
+    if adjust_inventory:
+        # Before the items, as in write_order
+        reserve(cursor, quantities)
+    insert_order_items(cursor, items)
+    return order_ids
+
+
+def set_status(cursor, backend, order_ids, status_id):
+    # One UPDATE for any number of orders; returns how many rows changed
+    order_ids = list(order_ids)
+    if not order_ids:
+        return 0
+    condition = f"id IN ({', '.join(['%s'] * len(order_ids))})"
+    move_status_counts(cursor, backend, condition, order_ids, status_id)
+    cursor.execute(f"UPDATE orders SET status = %s WHERE {condition}", (status_id, *order_ids))
+    return cursor.rowcount
+
+
+def sweep_status(cursor, backend, from_status_id, to_status_id):
+    # Moves every order in one status to another; returns how many rows changed
+    move_status_counts(cursor, backend, "status = %s", (from_status_id,), to_status_id)
+    cursor.execute("UPDATE orders SET status = %s WHERE status = %s", (to_status_id, from_status_id))
+    return cursor.rowcount
@@ -0,0 +1,192 @@
+-- SQLite version of init.sql, applied automatically by the sqlite backend on first connect
+
+CREATE TABLE IF NOT EXISTS couriers (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL,
+  phone TEXT NOT NULL,
+  deleted_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS customers (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL,
+  address TEXT NOT NULL,
+  phone TEXT NOT NULL,
+  deleted_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS order_status (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  order_status TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS products (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL,
+  price NUMERIC NOT NULL,
+  inventory INTEGER DEFAULT 0,
+  deleted_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  customer_id INTEGER NOT NULL REFERENCES customers (id),
+  courier INTEGER NOT NULL REFERENCES couriers (id),
+  status INTEGER NOT NULL REFERENCES order_status (id),
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS orders_customer_id ON orders (customer_id);
+CREATE INDEX IF NOT EXISTS orders_courier ON orders (courier);
+CREATE INDEX IF NOT EXISTS orders_status ON orders (status);
+CREATE INDEX IF NOT EXISTS orders_created_at ON orders (created_at);
+CREATE INDEX IF NOT EXISTS orders_updated_at ON orders (updated_at);
+-- SQLite has no ON UPDATE CURRENT_TIMESTAMP; the nested UPDATE does not match the column list, so it does not re-fire
+CREATE TRIGGER IF NOT EXISTS orders_touch_updated_at AFTER UPDATE OF customer_id, courier, status ON orders FOR EACH ROW BEGIN UPDATE orders SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id; END;
+
+-- One row per product in an order; unit_price is the product's price when the order was placed
+CREATE TABLE IF NOT EXISTS order_items (
+  order_id INTEGER NOT NULL REFERENCES orders (id),
+  product_id INTEGER NOT NULL REFERENCES products (id),
+  quantity INTEGER NOT NULL DEFAULT 1,
+  unit_price NUMERIC NOT NULL,
+  PRIMARY KEY (order_id, product_id)
+);
+CREATE INDEX IF NOT EXISTS order_items_product_id ON order_items (product_id);
+
+-- One denormalised row per order, kept up to date by the app's write paths (see src/order_summary.py)
+CREATE TABLE IF NOT EXISTS order_summary (
+  order_id INTEGER PRIMARY KEY,
+  customer_id INTEGER NOT NULL,
+  customer_name TEXT,
+  customer_address TEXT,
+  customer_phone TEXT,
+  courier_id INTEGER NOT NULL,
+  courier_name TEXT,
+  courier_phone TEXT,
+  status_id INTEGER NOT NULL,
+  status TEXT,
+  items TEXT NOT NULL,
+  item_quantities TEXT NOT NULL DEFAULT '',
+  item_prices TEXT NOT NULL,
+  item_count INTEGER NOT NULL DEFAULT 0,
+  total NUMERIC NOT NULL DEFAULT 0,
+  created_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS order_summary_status_order ON order_summary (status, order_id);
+CREATE INDEX IF NOT EXISTS order_summary_courier_order ON order_summary (courier_id, order_id);
+CREATE INDEX IF NOT EXISTS order_summary_customer_id ON order_summary (customer_id);
+CREATE INDEX IF NOT EXISTS order_summary_status_id ON order_summary (status_id);
+
+-- Delivered orders older than CAFEAPP_ARCHIVE_AFTER_DAYS are moved here (see src/archive.py); rows keep their ids
+-- and have no foreign keys, so catalogue rows can still be deleted
+CREATE TABLE IF NOT EXISTS orders_archive (
+  id INTEGER PRIMARY KEY,
+  customer_id INTEGER NOT NULL,
+  courier INTEGER NOT NULL,
+  status INTEGER NOT NULL,
+  created_at TIMESTAMP NOT NULL,
+  updated_at TIMESTAMP NOT NULL,
+  archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS orders_archive_created_at ON orders_archive (created_at);
+CREATE INDEX IF NOT EXISTS orders_archive_archived_at ON orders_archive (archived_at);
+
+CREATE TABLE IF NOT EXISTS order_items_archive (
+  order_id INTEGER NOT NULL,
+  product_id INTEGER NOT NULL,
+  quantity INTEGER NOT NULL DEFAULT 1,
+  unit_price NUMERIC NOT NULL,
+  PRIMARY KEY (order_id, product_id)
+);
+CREATE INDEX IF NOT EXISTS order_items_archive_product_id ON order_items_archive (product_id);
+
+-- Summaries move with their orders and keep the names as they were when the order was archived
+CREATE TABLE IF NOT EXISTS order_summary_archive (
+  order_id INTEGER PRIMARY KEY,
+  customer_id INTEGER NOT NULL,
+  customer_name TEXT,
+  customer_address TEXT,
+  customer_phone TEXT,
+  courier_id INTEGER NOT NULL,
+  courier_name TEXT,
+  courier_phone TEXT,
+  status_id INTEGER NOT NULL,
+  status TEXT,
+  items TEXT NOT NULL,
+  item_quantities TEXT NOT NULL DEFAULT '',
+  item_prices TEXT NOT NULL,
+  item_count INTEGER NOT NULL DEFAULT 0,
+  total NUMERIC NOT NULL DEFAULT 0,
+  created_at TIMESTAMP
+);
+
+-- Reports that need the full history read these views instead of the live tables
+CREATE VIEW IF NOT EXISTS orders_all AS
+  SELECT id, customer_id, courier, status, created_at, updated_at FROM orders
+  UNION ALL
+  SELECT id, customer_id, courier, status, created_at, updated_at FROM orders_archive;
+CREATE VIEW IF NOT EXISTS order_items_all AS
+  SELECT order_id, product_id, quantity, unit_price FROM order_items
+  UNION ALL
+  SELECT order_id, product_id, quantity, unit_price FROM order_items_archive;
+CREATE VIEW IF NOT EXISTS order_summary_all AS
+  SELECT * FROM order_summary UNION ALL SELECT * FROM order_summary_archive;
+
+-- Rollups read by the dashboards (see src/analytics.py). sales_daily and courier_orders are running totals
+-- of orders placed, extended from rollup_watermark on each refresh; status_counts also follows status changes
+CREATE TABLE IF NOT EXISTS rollup_watermark (
+  rollup TEXT PRIMARY KEY,
+  last_order_id INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO rollup_watermark (rollup, last_order_id) VALUES ('orders', 0);
+
+CREATE TABLE IF NOT EXISTS sales_daily (
+  day DATE NOT NULL,
+  product_id INTEGER NOT NULL,
+  quantity INTEGER NOT NULL DEFAULT 0,
+  revenue NUMERIC NOT NULL DEFAULT 0,
+  orders INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, product_id)
+);
+CREATE INDEX IF NOT EXISTS sales_daily_product_id ON sales_daily (product_id);
+
+CREATE TABLE IF NOT EXISTS courier_orders (
+  courier_id INTEGER PRIMARY KEY,
+  orders INTEGER NOT NULL DEFAULT 0,
+  items INTEGER NOT NULL DEFAULT 0,
+  revenue NUMERIC NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS status_counts (
+  status_id INTEGER PRIMARY KEY,
+  status TEXT,
+  orders INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS change_log (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  table_name TEXT NOT NULL,
+  row_id INTEGER NOT NULL,
+  changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS change_log_changed_at ON change_log (changed_at);
+
+CREATE TRIGGER IF NOT EXISTS products_after_insert AFTER INSERT ON products FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('products', NEW.id); END;
+CREATE TRIGGER IF NOT EXISTS products_after_update AFTER UPDATE ON products FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('products', NEW.id); END;
+CREATE TRIGGER IF NOT EXISTS products_after_delete AFTER DELETE ON products FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('products', OLD.id); END;
+CREATE TRIGGER IF NOT EXISTS couriers_after_insert AFTER INSERT ON couriers FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('couriers', NEW.id); END;
+CREATE TRIGGER IF NOT EXISTS couriers_after_update AFTER UPDATE ON couriers FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('couriers', NEW.id); END;
+CREATE TRIGGER IF NOT EXISTS couriers_after_delete AFTER DELETE ON couriers FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('couriers', OLD.id); END;
+CREATE TRIGGER IF NOT EXISTS customers_after_insert AFTER INSERT ON customers FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('customers', NEW.id); END;
+CREATE TRIGGER IF NOT EXISTS customers_after_update AFTER UPDATE ON customers FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('customers', NEW.id); END;
+CREATE TRIGGER IF NOT EXISTS customers_after_delete AFTER DELETE ON customers FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('customers', OLD.id); END;
+CREATE TRIGGER IF NOT EXISTS orders_after_insert AFTER INSERT ON orders FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('orders', NEW.id); END;
+CREATE TRIGGER IF NOT EXISTS orders_after_update AFTER UPDATE ON orders FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('orders', NEW.id); END;
+CREATE TRIGGER IF NOT EXISTS orders_after_delete AFTER DELETE ON orders FOR EACH ROW BEGIN INSERT INTO change_log (table_name, row_id) VALUES ('orders', OLD.id); END;
+
+-- Default statuses; the app creates orders as 'PREPARING' (id 1)
+INSERT OR IGNORE INTO order_status (id, order_status) VALUES (1, 'PREPARING'), (2, 'READY'), (3, 'DELIVERED');
+
+-- Schema version, compared against migrations/sqlite/ when an existing database file is opened
+PRAGMA user_version = 6;
@@ -0,0 +1,63 @@
+import json
+import os
+import time
+
+# Timings behind `python -m src.app --startup-profile`. Everything is measured from the moment src.app
+# starts importing: how long the imports took, when the main menu was first drawn, and how long the
+# background warm-up spent connecting and filling the catalog cache. Only first paint counts against the
+# budget; the warm-up runs while the menu is already on screen.
+
+STARTUP_BUDGET_MS = float(os.getenv("CAFEAPP_STARTUP_BUDGET_MS", "250"))
+STARTUP_PROFILE_LOG = os.path.join("logs", "startup_profile.json")
+
+# Report order and labels; phases measured on the warm-up thread are marked as background
+PHASES = [
+    ('imports', "imports", False),
+    ('first_paint', "first paint", False),
+    ('connect', "connect", True),
+    ('statuses', "order statuses", True),
+    ('catalog', "catalog warm-up", True),
+    ('ready', "ready", True),
+]
+
+
+class StartupProfile:
+
+    def __init__(self, started, imported=None, budget_ms=STARTUP_BUDGET_MS):
+        self.started = started
+        self.budget_ms = budget_ms
+        self.phases = {}
+        if imported is not None:
+            self.phases['imports'] = (imported - started) * 1000
+
+    def since_start(self, phase):
+        # Milliseconds from the start of the import to now, e.g. first_paint and ready
+        self.phases[phase] = (time.perf_counter() - self.started) * 1000
+
+    def duration(self, phase, start):
+        self.phases[phase] = (time.perf_counter() - start) * 1000
+
+    @property
+    def within_budget(self):
+        return self.phases.get('first_paint', 0.0) <= self.budget_ms
+
+    def report(self):
+        colour = "\033[92m" if self.within_budget else "\033[91m"
+        lines = [f"\033[93mStartup profile (first paint budget {self.budget_ms:.0f} ms)\033[0m"]
+        for phase, label, background in PHASES:
+            if phase not in self.phases:
+                continue
+            line = f"  {label:<18}{self.phases[phase]:>9.1f} ms{'  (background)' if background else ''}"
+            lines.append(f"{colour}{line}\033[0m" if phase == 'first_paint' else line)
+        return '\n'.join(lines)
+
+    def write(self, path=STARTUP_PROFILE_LOG):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump({
+                'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'budget_ms': self.budget_ms,
+                'within_budget': self.within_budget,
+                'phases_ms': {phase: round(ms, 2) for phase, ms in self.phases.items()},
+            }, file, indent=2)
+        return path
@@ -0,0 +1,295 @@
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import mysql.connector
+
+# Every backend's driver errors, for except clauses that must work against either database
+DB_ERRORS = (mysql.connector.Error, sqlite3.Error)
+
+DEADLOCK_RETRIES = int(os.getenv("CAFEAPP_DEADLOCK_RETRIES", "3"))
+RETRY_BACKOFF = 0.01  # seconds before the first retry, doubled for each one after it
+
+
+def is_retryable(err):
+    # Deadlock victims and lock wait timeouts (MySQL 1213/1205, SQLite "database is locked") succeed
+    # when the whole transaction is simply run again
+    if isinstance(err, mysql.connector.Error):
+        return err.errno in (1205, 1213)
+    return isinstance(err, sqlite3.OperationalError) and 'locked' in str(err)
+
+
+def run_in_transaction(conn, work, retries=DEADLOCK_RETRIES, on_retry=None):
+    # Runs work(cursor) in its own transaction and returns its result. Any error rolls back; retryable
+    # ones start the transaction again after a short randomised backoff, so colliding writers spread out
+    attempt = 0
+    while True:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("START TRANSACTION")
+            result = work(cursor)
+            conn.commit()
+            return result
+        except Exception as err:
+            conn.rollback()
+            if attempt >= retries or not is_retryable(err):
+                raise
+            attempt += 1
+            if on_retry:
+                on_retry(err)
+            time.sleep(random.uniform(0, RETRY_BACKOFF * 2 ** attempt))
+        finally:
+            cursor.close()
+
+
+class MySQLBackend:
+    name = 'mysql'
+
+    def connect(self):
+        conn = mysql.connector.connect(
+            host=os.getenv("MYSQL_HOST", "localhost"),
+            port=int(os.getenv("MYSQL_PORT", "3306")),
+            user=os.getenv("MYSQL_USER"),
+            password=os.getenv("MYSQL_PASSWORD"),
+            database=os.getenv("MYSQL_DATABASE"),
+            allow_local_infile=os.getenv("CAFEAPP_LOCAL_INFILE") == "1"
+        )
+        conn.autocommit = True
+        return conn
+
+    def upsert_clause(self, columns):
+        return "ON DUPLICATE KEY UPDATE " + ', '.join([f"{col} = VALUES({col})" for col in columns])
+
+    def upsert_add_clause(self, columns):
+        # For running totals: an existing row has the new values added to it
+        return "ON DUPLICATE KEY UPDATE " + ', '.join([f"{col} = {col} + VALUES({col})" for col in columns])
+
+    @property
+    def share_lock(self):
+        # Appended to a SELECT that must read committed rows and keep them until commit, as INSERT ... SELECT does
+        return " FOR SHARE"
+
+    def delete_limit(self, table, condition):
+        # Deletes at most %s matching rows
+        return f"DELETE FROM {table} WHERE {condition} LIMIT %s"
+
+    def days_ago(self):
+        # SQL for the timestamp %s days before now, in the same clock as CURRENT_TIMESTAMP
+        return "(CURRENT_TIMESTAMP - INTERVAL %s DAY)"
+
+    def seconds_ago(self):
+        return "(CURRENT_TIMESTAMP - INTERVAL %s SECOND)"
+
+    @property
+    def swaps_tables(self):
+        # Rebuilt tables are filled as a shadow copy and swapped in with one atomic RENAME TABLE
+        return True
+
+    @property
+    def supports_load_data(self):
+        return True
+
+
+class SQLiteBackend:
+    name = 'sqlite'
+    schema_file = os.path.join(os.path.dirname(__file__), 'schema_sqlite.sql')
+    migrations_dir = os.path.join(os.path.dirname(__file__), '..', 'migrations', 'sqlite')
+    schema_version = 6  # matches the PRAGMA user_version set at the end of schema_file
+
+    def __init__(self, path):
+        self.path = path
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._keeper = None
+
+        if path == ':memory:':
+            # A named memdb database lets every pooled connection see the same in-memory data;
+            # the keeper connection keeps it alive while the pool is empty. Unlike a shared-cache
+            # database, memdb uses normal file locking, so concurrent writers wait on the busy timeout
+            # instead of failing with "database table is locked".
+            self._target = f"file:/cafeapp-{uuid.uuid4().hex}?vfs=memdb"
+            self._keeper = self._open()
+        else:
+            self._target = path
+
+    def _open(self):
+        conn = sqlite3.connect(self._target, uri=self._target.startswith('file:'), isolation_level=None, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.path != ':memory:':
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def connect(self):
+        conn = self._open()
+        with self._schema_lock:
+            if not self._schema_ready:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < self.schema_version:
+                    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products'").fetchone() is not None:
+                        self._migrate(conn, version)
+                    # Every statement in the schema is idempotent, so it also adds any tables, indexes and triggers the migrations left out
+                    with open(self.schema_file) as file:
+                        conn.executescript(file.read())
+                self._schema_ready = True
+        return SQLiteConnection(conn)
+
+    def _migrate(self, conn, version):
+        # Existing database files run each migrations/sqlite/NNN_*.sql newer than their user_version, in order
+        for name in sorted(os.listdir(self.migrations_dir)):
+            number = int(name.split('_', 1)[0])
+            if version < number <= self.schema_version:
+                with open(os.path.join(self.migrations_dir, name)) as file:
+                    conn.executescript(file.read())
+
+    def upsert_clause(self, columns):
+        return "ON CONFLICT DO UPDATE SET " + ', '.join([f"{col} = excluded.{col}" for col in columns])
+
+    def upsert_add_clause(self, columns):
+        return "ON CONFLICT DO UPDATE SET " + ', '.join([f"{col} = {col} + excluded.{col}" for col in columns])
+
+    @property
+    def share_lock(self):
+        # Writers are serialised, so reads inside a write transaction already see the latest rows
+        return ""
+
+    def delete_limit(self, table, condition):
+        # DELETE ... LIMIT needs a compile-time option most SQLite builds leave out
+        return f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {condition} LIMIT %s)"
+
+    def days_ago(self):
+        # CURRENT_TIMESTAMP is UTC text in SQLite, so the cutoff is computed the same way
+        return "datetime('now', '-' || %s || ' days')"
+
+    def seconds_ago(self):
+        return "datetime('now', '-' || %s || ' seconds')"
+
+    @property
+    def swaps_tables(self):
+        # Readers keep their snapshot until a writer commits, so a rebuild is simply one transaction
+        return False
+
+    @property
+    def supports_load_data(self):
+        return False
+
+
+class SQLiteConnection:
+    # Gives sqlite3 the small part of the mysql.connector API that CafeApp relies on:
+    # %s placeholders, dictionary cursors, START TRANSACTION and is_connected()
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._closed = False
+        self.autocommit = True
+
+    def cursor(self, dictionary=False, buffered=None):
+        return SQLiteCursor(self._conn.cursor(), dictionary)
+
+    def commit(self):
+        if self._conn.in_transaction:
+            self._conn.commit()
+
+    def rollback(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def is_connected(self):
+        if self._closed:
+            return False
+        try:
+            self._conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self._closed = True
+        self._conn.close()
+
+
+# %s is a parameter and %% a literal percent sign, as in the format strings the MySQL driver takes
+_PLACEHOLDER = re.compile(r'%[s%]')
+
+
+def _translate(sql):
+    return _PLACEHOLDER.sub(lambda match: '?' if match.group() == '%s' else '%', sql)
+
+
+class SQLiteCursor:
+
+    def __init__(self, cursor, dictionary):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, sql, params=None):
+        if sql.strip().upper() == "START TRANSACTION":
+            sql = "BEGIN"
+        self._cursor.execute(_translate(sql), params or ())
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(_translate(sql), seq_of_params)
+
+    def _convert(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([column[0] for column in self._cursor.description], row))
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._convert(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name=None, sqlite_path=None):
+    name = (name or os.getenv("CAFEAPP_DB_BACKEND", "mysql")).lower()
+    if name == 'mysql':
+        return MySQLBackend()
+    if name == 'sqlite':
+        return SQLiteBackend(sqlite_path or os.getenv("CAFEAPP_SQLITE_PATH", "cafeapp.db"))
+    raise ValueError(f"Unknown database backend: {name}")
+
+
+def get_backend():
+    # Chosen once per process from CAFEAPP_DB_BACKEND (mysql or sqlite)
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+        return _backend
+
+
+def set_backend(backend):
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,92 @@
+import os
+import shutil
+import sys
+
+# Terminal tables for the list screens. Column widths come from one pass over the rows, the whole table is
+# built as one string and written with a single call, so a slow serial or SSH link sees one burst instead
+# of a print() per row. On a terminal, tables wider than the screen have their widest columns truncated
+# and tables taller than it are shown a screenful at a time; piped output is always written in full.
+
+HEADER_STYLE = "\033[44;37m"  # blue background, white text
+ROW_STYLES = ("\033[47;30m", "\033[100;30m")  # even and odd rows
+RESET = "\033[0m"
+CLEAR = "\033[H\033[2J\033[3J"  # home, clear screen, clear scrollback
+ELLIPSIS = "…"
+MIN_COLUMN_WIDTH = 4
+PAGER = os.getenv("CAFEAPP_TABLE_PAGER", "1") == "1"
+
+
+def clear_screen(out=None):
+    out = out or sys.stdout
+    out.write(CLEAR)
+    out.flush()
+
+
+def _widths(headers, rows, min_widths):
+    widths = [max(len(header), minimum) for header, minimum in zip(headers, min_widths or [0] * len(headers))]
+    if rows:
+        # zip(*rows) turns the rows into columns, so each column is measured with one map(len) pass
+        widths = [max(width, max(map(len, column))) for width, column in zip(widths, zip(*rows))]
+    return widths
+
+
+def _fit(widths, available):
+    # Narrows the widest columns until the table fits the screen
+    widths = list(widths)
+    while sum(widths) > available:
+        widest = max(range(len(widths)), key=widths.__getitem__)
+        if widths[widest] <= MIN_COLUMN_WIDTH:
+            break
+        widths[widest] -= 1
+    return widths
+
+
+def _cell(value, width, align):
+    if len(value) > width:
+        value = value[:width - 1] + ELLIPSIS
+    return value.rjust(width) if align == '>' else value.ljust(width)
+
+
+def render_table(headers, rows, align=None, min_widths=None, start=1, width=None):
+    # Returns the header line and one line per row; rows are sequences of already formatted strings
+    align = align or '<' * len(headers)
+    index_width = max(len("No."), len(str(start + len(rows) - 1)))
+    widths = _widths(headers, rows, min_widths)
+    if width:
+        widths = _fit(widths, width - index_width - 2 * len(headers))
+
+    header = "  ".join(_cell(title, widths[i], '<') for i, title in enumerate(headers))
+    lines = [f"{HEADER_STYLE}{'No.':<{index_width}}  {header}{RESET}"]
+    for number, row in enumerate(rows, start=start):
+        cells = "  ".join(_cell(value, widths[i], align[i]) for i, value in enumerate(row))
+        lines.append(f"{ROW_STYLES[number % 2]}{str(number).ljust(index_width)}  {cells}{RESET}")
+    return lines
+
+
+def print_table(title, headers, rows, align=None, min_widths=None, start=1, out=None, page=PAGER):
+    out = out or sys.stdout
+    lines = [f"\033[93m{title}\033[0m"]
+    if not rows:
+        out.write('\n'.join(lines + ["\033[90mEmpty\033[0m"]) + '\n')
+        out.flush()
+        return
+
+    terminal = out.isatty()
+    size = shutil.get_terminal_size() if terminal else None
+    table = render_table(headers, rows, align, min_widths, start, size.columns if size else None)
+    # Title, header and the pager prompt take three lines of each screen
+    per_page = size.lines - 3 if terminal and page else 0
+    if per_page <= 0 or len(table) - 1 <= per_page:
+        out.write('\n'.join(lines + table) + '\n')
+        out.flush()
+        return
+
+    header, body = table[0], table[1:]
+    for first in range(0, len(body), per_page):
+        out.write('\n'.join(lines + [header] + body[first:first + per_page]) + '\n')
+        out.flush()
+        lines = []
+        if first + per_page < len(body):
+            shown = min(first + per_page, len(body))
+            if input(f"-- {shown} of {len(body)} -- [Enter] More  [q] Stop: ").strip().lower() == 'q':
+                return
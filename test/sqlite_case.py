@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from src.app import CafeApp
+from src.db_pool import reset_pool
+from src.storage import SQLiteBackend, set_backend
+
+# Shared fixture for tests that run the app against a fresh in-memory SQLite database instead of MySQL.
+# Subclasses change the class attributes to seed different rows; ids follow the order given.
+
+
+class SQLiteFixture:
+    products = (('Tea', 1.5, 10), ('Cake', 2.25, 5))  # (name, price, inventory)
+    couriers = (('Bob', '07123456789'),)  # (name, phone)
+    customers = (('Ann', '1 High St', '07987654321'),)  # (name, address, phone)
+    in_tempdir = False  # run each test in its own working directory, for tests that write files
+
+    def setUp(self):
+        self.backend = SQLiteBackend(':memory:')
+        set_backend(self.backend)
+        reset_pool()
+        # Cleanups run last-in first-out, so the pool is closed before the backend is unset
+        self.addCleanup(set_backend, None)
+        self.addCleanup(reset_pool)
+        if self.in_tempdir:
+            self.addCleanup(os.chdir, os.getcwd())
+            tmp = tempfile.TemporaryDirectory()
+            self.addCleanup(tmp.cleanup)
+            os.chdir(tmp.name)
+        self.execute_many("INSERT INTO products (name, price, inventory) VALUES (%s, %s, %s)", self.products)
+        self.execute_many("INSERT INTO couriers (name, phone) VALUES (%s, %s)", self.couriers)
+        self.execute_many("INSERT INTO customers (name, address, phone) VALUES (%s, %s, %s)", self.customers)
+        # Creating the app does not connect; its connection is taken from the pool on first use
+        self.app = CafeApp()
+
+    @property
+    def conn(self):
+        return self.app.db_conn
+
+    # The helpers below use a connection of their own, so they leave the shared pool and its stats alone
+
+    def execute_many(self, sql, rows):
+        if not rows:
+            return
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        cursor.executemany(sql, rows)
+        cursor.close()
+        conn.close()
+
+    def execute(self, sql, params=None):
+        self.execute_many(sql, [params or ()])
+
+    def query(self, sql, params=None):
+        conn = self.backend.connect()
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return rows
+
+
+class SQLiteTestCase(SQLiteFixture, unittest.TestCase):
+    pass
+
+
+class AsyncSQLiteTestCase(SQLiteFixture, unittest.IsolatedAsyncioTestCase):
+    pass
@@ -0,0 +1,162 @@
+import importlib.util
+import unittest
+from src import analytics
+from src.archive import archive_orders
+from test.sqlite_case import SQLiteTestCase
+
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+
+class TestAnalyticsRollups(SQLiteTestCase):
+    products = (('Tea', 1.5, 1000), ('Cake', 2.25, 1000))
+    couriers = (('Bob', '07123456789'), ('Cy', '07000000000'))
+
+    def setUp(self):
+        super().setUp()
+        self.place([{'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 1, 2]}] * 3)
+
+    def place(self, orders):
+        self.app.create_orders_bulk(orders)
+
+    def test_refresh_only_adds_new_orders(self):
+        # Arrange
+        analytics.refresh(self.conn, self.backend)
+        self.place([{'customer_id': 1, 'courier_id': 2, 'product_ids': [1]}])
+
+        # Act
+        report = analytics.refresh(self.conn, self.backend)
+        again = analytics.refresh(self.conn, self.backend)
+
+        # Assert
+        self.assertEqual((report['orders'], again['orders']), (1, 0))
+        self.assertEqual(self.query("SELECT product_id, quantity, revenue, orders FROM sales_daily ORDER BY product_id"), [(1, 7, 10.5, 4), (2, 3, 6.75, 3)])
+        self.assertEqual(self.query("SELECT courier_id, orders, items, revenue FROM courier_orders ORDER BY courier_id"), [(1, 3, 9, 15.75), (2, 1, 1, 1.5)])
+        self.assertEqual(self.query("SELECT last_order_id FROM rollup_watermark"), [(4,)])
+
+    def test_refresh_works_through_the_range_in_batches(self):
+        # Arrange
+        progress = []
+
+        # Act
+        report = analytics.refresh(self.conn, self.backend, batch_size=2, on_batch=progress.append)
+
+        # Assert
+        self.assertEqual((report['orders'], report['batches']), (3, 2))
+        self.assertEqual(progress, [2, 3])
+
+    def test_order_committing_late_is_still_added(self):
+        # Arrange
+        analytics.refresh(self.conn, self.backend)
+        cursor = self.conn.cursor()
+        # Order 4 is still being written by another till when order 5 commits
+        cursor.execute("INSERT INTO orders (id, customer_id, courier, status) VALUES (5, 1, 2, 1)")
+        cursor.execute("INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (5, 2, 1, 2.25)")
+        cursor.close()
+        held = analytics.refresh(self.conn, self.backend)
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT INTO orders (id, customer_id, courier, status) VALUES (4, 1, 2, 1)")
+        cursor.execute("INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (4, 1, 2, 1.5)")
+        cursor.close()
+
+        # Act
+        report = analytics.refresh(self.conn, self.backend)
+
+        # Assert
+        self.assertEqual((held['orders'], report['orders']), (0, 2))
+        self.assertEqual(self.query("SELECT courier_id, orders, items, revenue FROM courier_orders ORDER BY courier_id"), [(1, 3, 9, 15.75), (2, 2, 3, 5.25)])
+        self.assertEqual(self.query("SELECT last_order_id FROM rollup_watermark"), [(5,)])
+
+    def test_old_gaps_are_passed_over(self):
+        # Arrange
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT INTO orders (id, customer_id, courier, status, created_at) VALUES (9, 1, 2, 1, datetime('now', '-1 hour'))")
+        cursor.execute("INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (9, 1, 1, 1.5)")
+        cursor.close()
+
+        # Act
+        report = analytics.refresh(self.conn, self.backend)
+
+        # Assert
+        self.assertEqual(report['orders'], 4)
+        self.assertEqual(self.query("SELECT last_order_id FROM rollup_watermark"), [(9,)])
+
+    def test_gap_wider_than_a_batch_is_passed_over(self):
+        # Arrange
+        self.place([{'customer_id': 1, 'courier_id': 2, 'product_ids': [1]}] * 10)
+        # Orders 4-10 were deleted, leaving a gap wider than a batch; the orders after it are old
+        self.execute("DELETE FROM order_summary WHERE order_id BETWEEN 4 AND 10")
+        self.execute("DELETE FROM order_items WHERE order_id BETWEEN 4 AND 10")
+        self.execute("DELETE FROM orders WHERE id BETWEEN 4 AND 10")
+        self.execute("UPDATE orders SET created_at = datetime('now', '-1 hour')")
+
+        # Act
+        report = analytics.rebuild(self.conn, self.backend, batch_size=2)
+
+        # Assert
+        self.assertEqual(report['orders'], 6)
+        self.assertEqual(self.query("SELECT courier_id, orders FROM courier_orders ORDER BY courier_id"), [(1, 3), (2, 3)])
+        self.assertEqual(self.query("SELECT last_order_id FROM rollup_watermark"), [(13,)])
+
+    def test_status_changes_move_the_counts(self):
+        # Arrange
+        analytics.refresh(self.conn, self.backend)
+        self.place([{'customer_id': 1, 'courier_id': 2, 'product_ids': [1]}])
+
+        # Act
+        self.app.set_order_status([1], 'READY')
+        self.app.sweep_order_status('PREPARING', 'DELIVERED')
+        moved = self.query("SELECT status, orders FROM status_counts ORDER BY status_id")
+        analytics.refresh(self.conn, self.backend)
+
+        # Assert
+        self.assertEqual(moved, [('PREPARING', 0), ('READY', 1), ('DELIVERED', 2)])
+        self.assertEqual(self.query("SELECT status, orders FROM status_counts ORDER BY status_id"), [('PREPARING', 0), ('READY', 1), ('DELIVERED', 3)])
+
+    def test_statuses_are_recounted_and_archived_orders_kept(self):
+        # Arrange
+        analytics.refresh(self.conn, self.backend)
+        self.app.set_order_status([1, 2], 'DELIVERED')
+        cursor = self.conn.cursor()
+        cursor.execute("UPDATE orders SET updated_at = '2020-01-01 00:00:00'")
+        cursor.close()
+        self.conn.commit()
+        archive_orders(self.conn, self.backend, older_than_days=30)
+
+        # Act
+        analytics.rebuild(self.conn, self.backend)
+
+        # Assert
+        self.assertEqual(self.query("SELECT status, orders FROM status_counts ORDER BY status_id"), [('PREPARING', 1), ('DELIVERED', 2)])
+        self.assertEqual(self.query("SELECT SUM(orders) FROM courier_orders"), [(3,)])
+
+    @unittest.skipUnless(HAS_PANDAS, "pandas is not installed")
+    def test_frames_read_the_rollups(self):
+        # Arrange
+        self.place([{'customer_id': 1, 'courier_id': 2, 'product_ids': [2, 2]}])
+        analytics.refresh(self.conn, self.backend)
+
+        # Act
+        products = analytics.product_sales(self.conn)
+        couriers = analytics.courier_totals(self.conn)
+        statuses = analytics.status_counts(self.conn)
+
+        # Assert
+        self.assertEqual(products['product'].tolist(), ['Tea', 'Cake'])
+        self.assertEqual(products['quantity'].tolist(), [6, 5])
+        self.assertEqual(couriers.set_index('courier')['revenue_per_order'].round(2).to_dict(), {'Bob': 5.25, 'Cy': 4.5})
+        self.assertEqual(statuses.to_dict(), {'PREPARING': 4})
+        self.assertAlmostEqual(analytics.revenue_by_day(self.conn).sum(), 20.25)
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_refresh_only_adds_new_orders: a refresh adds only the orders placed since the watermark to the per-product and per-courier totals; a second refresh adds nothing.
+# test_refresh_works_through_the_range_in_batches: a backlog of new orders is rolled up a range of ids per transaction.
+# test_order_committing_late_is_still_added: the watermark stops below a missing id while newer orders are recent, so an order that commits late is rolled up on the next refresh.
+# test_old_gaps_are_passed_over: a missing id followed by an order older than CAFEAPP_ROLLUP_GAP_TIMEOUT (a rollback or a delete) does not hold the rollups back.
+# test_gap_wider_than_a_batch_is_passed_over: a range of deleted orders wider than CAFEAPP_ROLLUP_BATCH_SIZE does not stop the rollups at the gap.
+# test_status_changes_move_the_counts: status changes move rolled-up orders between status counts without a recount, and orders not rolled up yet are counted with their status by the next refresh.
+# test_statuses_are_recounted_and_archived_orders_kept: status counts follow status changes, and a rebuild still counts orders that were archived.
+# test_frames_read_the_rollups: the pandas helpers return best-selling products, revenue per courier order, status counts and daily revenue from the rollup tables.
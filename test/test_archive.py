@@ -0,0 +1,98 @@
+import csv
+import os
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from src.archive import MissingParentError, archive_counts, archive_orders, restore_orders
+from src.cascade import delete_rows
+from test.sqlite_case import SQLiteTestCase
+
+class TestOrderArchive(SQLiteTestCase):
+    products = (('Tea', 1.5, 1000), ('Cake', 2.25, 1000))
+    in_tempdir = True
+
+    def setUp(self):
+        super().setUp()
+        # Orders 1-10 delivered long ago, 11-12 delivered today, 13-14 still being prepared but old
+        self.app.create_orders_bulk([{'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 1, 2]}] * 14)
+        self.execute("UPDATE orders SET status = 3 WHERE id <= 12")
+        self.execute("UPDATE order_summary SET status_id = 3, status = 'DELIVERED' WHERE order_id <= 12")
+        self.execute("UPDATE orders SET updated_at = '2020-01-01 00:00:00' WHERE id <= 10 OR id >= 13")
+
+    def test_only_old_delivered_orders_are_archived_in_batches(self):
+        # Arrange
+        progress = []
+
+        # Act
+        report = archive_orders(self.conn, self.backend, older_than_days=30, batch_size=4, on_batch=progress.append)
+
+        # Assert
+        self.assertEqual((report['orders'], report['batches']), (10, 3))
+        self.assertEqual(progress, [4, 8, 10])
+        self.assertEqual(archive_counts(self.conn), {'live': 4, 'archived': 10})
+        self.assertEqual(self.query("SELECT id FROM orders ORDER BY id"), [(11,), (12,), (13,), (14,)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM order_items_archive"), [(20,)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM order_summary_all"), [(14,)])
+        self.assertEqual([order['id'] for order in self.app.fetch_order_page()], [11, 12, 13, 14])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_can_include_the_archive(self, mock_stdout):
+        # Arrange
+        archive_orders(self.conn, self.backend, older_than_days=30)
+
+        # Act
+        live = self.app.export_to_csv('orders', 'live.csv')
+        everything = self.app.export_to_csv('orders', 'all.csv', include_archive=True)
+
+        # Assert
+        self.assertEqual((live, everything), (4, 14))
+        with open(os.path.join('export', 'all.csv')) as file:
+            first = next(csv.DictReader(file))
+        self.assertEqual((first['id'], first['products'], first['product_quantities']), ('1', 'Tea, Cake', '2, 1'))
+
+    def test_restored_order_is_live_again(self):
+        # Arrange
+        archive_orders(self.conn, self.backend, older_than_days=30)
+        self.execute("UPDATE customers SET name = 'Anne' WHERE id = 1")
+
+        # Act
+        report = restore_orders(self.conn, self.backend, [3, 3, 99])
+
+        # Assert
+        self.assertEqual(report['orders'], 1)
+        self.assertEqual(archive_counts(self.conn), {'live': 5, 'archived': 9})
+        self.assertEqual(self.query("SELECT quantity FROM order_items WHERE order_id = 3 ORDER BY product_id"), [(2,), (1,)])
+        self.assertEqual(self.query("SELECT customer_name, item_count FROM order_summary WHERE order_id = 3"), [('Anne', 3)])
+        # A restored order is not archived again by the next run
+        self.assertEqual(archive_orders(self.conn, self.backend, older_than_days=30)['orders'], 0)
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_restoring_an_order_of_a_deleted_parent_is_refused(self, mock_stdout):
+        # Arrange
+        archive_orders(self.conn, self.backend, older_than_days=30)
+        self.execute_many("INSERT INTO customers (name, address, phone) VALUES (%s, %s, %s)", [('Dee', '2 Low St', '07111111111')])
+        self.execute("UPDATE orders_archive SET customer_id = 2 WHERE id = 4")
+        delete_rows(self.conn, 'customers', [2], soft=False)
+        delete_rows(self.conn, 'products', [2], soft=False)
+
+        # Act
+        with self.assertRaises(MissingParentError) as raised:
+            restore_orders(self.conn, self.backend, [3, 4])
+        report = self.app.restore_archived_orders([4])
+
+        # Assert
+        self.assertEqual(raised.exception.missing, {3: ['product 2'], 4: ['customer 2', 'product 2']})
+        self.assertIsNone(report)
+        self.assertIn("order 4: customer 2, product 2", mock_stdout.getvalue())
+        self.assertEqual(archive_counts(self.conn), {'live': 0, 'archived': 10})
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_only_old_delivered_orders_are_archived_in_batches: delivered orders unchanged for longer than the cut-off move with their items and summaries in batches; recent and undelivered orders stay on the order board.
+# test_export_can_include_the_archive: the orders export only covers live orders unless include_archive is set, in which case archived orders are exported with their items.
+# test_restored_order_is_live_again: restoring an archived order moves it and its items back, recomputes its summary with current names, ignores duplicate and unknown ids and keeps it live for another cut-off period.
+# test_restoring_an_order_of_a_deleted_parent_is_refused: an archived order whose customer or products were deleted after archiving is left in the archive with an error naming the missing rows, instead of failing on a foreign key.
@@ -0,0 +1,86 @@
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from src.cascade import delete_rows, wipe
+from src.inventory import InsufficientStockError, reserve
+from test.sqlite_case import SQLiteTestCase
+
+class TestCascadingDeletes(SQLiteTestCase):
+    products = (('Tea', 1.5, 1000), ('Cake', 2.25, 1000))
+    couriers = (('Bob', '07123456789'), ('Cy', '07000000000'))
+
+    def setUp(self):
+        super().setUp()
+        # 25 orders with Tea (courier 1) and 5 with only Cake (courier 2)
+        self.app.create_orders_bulk([{'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 2]}] * 25 +
+                                    [{'customer_id': 1, 'courier_id': 2, 'product_ids': [2]}] * 5)
+
+    def count(self, table):
+        return self.query(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+    def test_popular_product_is_deleted_in_chunks(self):
+        # Arrange
+        chunks = []
+
+        # Act
+        report = delete_rows(self.conn, 'products', [1], soft=False, chunk_size=10, on_chunk=lambda report: chunks.append(report['total']))
+
+        # Assert
+        self.assertEqual(report['rows'], {'order_items': 50, 'orders': 25, 'products': 1})
+        self.assertEqual((report['chunks'], chunks), (4, [30, 60, 75]))
+        self.assertEqual([self.count(table) for table in ('products', 'orders', 'order_items', 'order_summary')], [1, 5, 5, 5])
+
+    def test_wipe_runs_limited_delete_loops(self):
+        # Act
+        report = wipe(self.conn, self.backend, 'couriers', soft=False, chunk_size=20)
+
+        # Assert
+        self.assertEqual(report['rows'], {'order_items': 55, 'orders': 30, 'order_summary': 30, 'couriers': 2})
+        self.assertEqual(report['total'], 117)
+        # order_items 20+20+15, orders 20+10, order_summary 20+10, couriers 2
+        self.assertEqual(report['chunks'], 8)
+        self.assertGreater(report['rows_per_s'], 0)
+        self.assertEqual([self.count(table) for table in ('couriers', 'orders', 'order_items', 'order_summary', 'products')], [0, 0, 0, 0, 2])
+
+    def test_soft_delete_hides_the_product_but_keeps_its_orders(self):
+        # Act
+        report = delete_rows(self.conn, 'products', [1], soft=True)
+        self.app.load_data()
+
+        # Assert
+        self.assertEqual(report['rows'], {'products': 1})
+        self.assertEqual([product['name'] for product in self.app.product_list], ['Cake'])
+        self.assertEqual(self.count('orders'), 30)
+        cursor = self.conn.cursor()
+        cursor.execute("START TRANSACTION")
+        with self.assertRaises(InsufficientStockError):
+            reserve(cursor, {1: 1})
+        self.conn.rollback()
+        cursor.close()
+
+    @patch('builtins.input', side_effect=['all'])
+    @patch('src.app.get_valid_input', return_value='y')
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_delete_all_orders_reports_throughput(self, mock_stdout, mock_get_valid_input, mock_input):
+        # Arrange
+        self.app.clear_screen = lambda: None
+        self.app.print_order_list = lambda: None
+
+        # Act
+        self.app.delete_order()
+
+        # Assert
+        self.assertEqual(self.count('orders'), 0)
+        self.assertIn("Deleted 115 rows (order_items: 55, orders: 30, order_summary: 30)", mock_stdout.getvalue())
+        self.assertIn("rows/sec", mock_stdout.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_popular_product_is_deleted_in_chunks: the orders containing a product are found once and deleted chunk_size at a time, each chunk in its own transaction, before the product itself.
+# test_wipe_runs_limited_delete_loops: wiping couriers empties order_items, orders, order_summary and couriers with DELETE ... LIMIT loops, and reports rows per table and rows/sec.
+# test_soft_delete_hides_the_product_but_keeps_its_orders: a soft-deleted product leaves the product list and can no longer be reserved, while its orders stay.
+# test_delete_all_orders_reports_throughput: the 'all' branch of the Orders menu uses the chunked wipe and prints the rows deleted and rows/sec.
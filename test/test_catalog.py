@@ -0,0 +1,237 @@
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from src.catalog import CHANGE_LOG_GAP_TIMEOUT, CatalogCache
+from test.sqlite_case import SQLiteTestCase
+
+class TestCatalogCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.conn = MagicMock()
+        self.conn.cursor.return_value = self.cursor
+        self.cache = CatalogCache(tables=('products',))
+
+    def test_full_load_on_first_refresh(self):
+        # Arrange
+        self.cursor.fetchone.return_value = {'id': 7}
+        self.cursor.fetchall.side_effect = [[], [{'id': 1, 'name': 'Tea'}, {'id': 2, 'name': 'Coffee'}]]
+
+        # Act
+        self.cache.refresh(self.conn)
+
+        # Assert
+        self.cursor.execute.assert_any_call("SELECT * FROM products ORDER BY id")
+        self.assertEqual([p['name'] for p in self.cache.list('products')], ['Tea', 'Coffee'])
+        self.assertEqual(self.cache.watermark, 7)
+        self.assertEqual(self.cache.full_loads, 1)
+
+    def test_incremental_refresh_applies_updates_and_deletes(self):
+        # Arrange
+        self.cursor.fetchone.return_value = {'id': 7}
+        self.cursor.fetchall.side_effect = [[], [{'id': 1, 'name': 'Tea'}, {'id': 2, 'name': 'Coffee'}]]
+        self.cache.refresh(self.conn)
+        self.cursor.reset_mock()
+        self.cursor.fetchall.side_effect = [
+            [{'id': 1, 'table_name': 'change_log', 'row_id': 0},
+             {'id': 8, 'table_name': 'products', 'row_id': 1},
+             {'id': 9, 'table_name': 'products', 'row_id': 2}],
+            [{'id': 1, 'name': 'Green Tea'}],
+        ]
+
+        # Act
+        self.cache.refresh(self.conn)
+
+        # Assert
+        self.cursor.execute.assert_any_call("SELECT * FROM products WHERE id IN (%s, %s)", (1, 2))
+        self.assertEqual(self.cache.list('products'), [{'id': 1, 'name': 'Green Tea'}])
+        self.assertEqual(self.cache.watermark, 9)
+        self.assertEqual(self.cache.full_loads, 1)
+        self.assertEqual(self.cache.incremental_refreshes, 1)
+
+    def test_full_load_marks_window_as_applied(self):
+        # Arrange
+        self.cursor.fetchone.return_value = {'id': 7}
+        self.cursor.fetchall.side_effect = [[{'id': 6}, {'id': 7}], [{'id': 1, 'name': 'Tea'}]]
+        self.cache.refresh(self.conn)
+        self.cursor.reset_mock()
+        self.cursor.fetchall.side_effect = [[{'id': 6, 'table_name': 'products', 'row_id': 1}, {'id': 7, 'table_name': 'products', 'row_id': 1}]]
+
+        # Act
+        self.cache.refresh(self.conn)
+
+        # Assert
+        self.cursor.execute.assert_called_once()
+
+    def test_no_changes_skips_table_queries(self):
+        # Arrange
+        self.cursor.fetchone.return_value = {'id': 7}
+        self.cursor.fetchall.return_value = []
+        self.cache.refresh(self.conn)
+        self.cursor.reset_mock()
+        self.cursor.fetchall.return_value = []
+
+        # Act
+        self.cache.refresh(self.conn)
+
+        # Assert
+        self.cursor.execute.assert_called_once()
+
+    def test_late_commit_below_watermark_is_applied(self):
+        # Arrange
+        self.cursor.fetchone.return_value = {'id': 7}
+        self.cursor.fetchall.side_effect = [[{'id': n} for n in range(1, 8)], [{'id': 1, 'name': 'Tea'}, {'id': 2, 'name': 'Coffee'}]]
+        self.cache.refresh(self.conn)
+        # Entries 8-1507 belong to a bulk transaction still in flight when 1508 commits
+        self.cursor.fetchall.side_effect = [
+            [{'id': 1, 'table_name': 'products', 'row_id': 1}, {'id': 1508, 'table_name': 'products', 'row_id': 2}],
+            [{'id': 2, 'name': 'Mocha'}],
+        ]
+        self.cache.refresh(self.conn)
+        self.cursor.reset_mock()
+        self.cursor.fetchall.side_effect = [
+            [{'id': 1, 'table_name': 'products', 'row_id': 1},
+             {'id': 9, 'table_name': 'products', 'row_id': 1},
+             {'id': 1508, 'table_name': 'products', 'row_id': 2}],
+            [{'id': 1, 'name': 'Green Tea'}],
+        ]
+
+        # Act
+        self.cache.refresh(self.conn)
+
+        # Assert
+        self.cursor.execute.assert_any_call(
+            "SELECT id, table_name, row_id FROM change_log WHERE id >= %s OR id = (SELECT MIN(id) FROM change_log) ORDER BY id", (8,))
+        self.cursor.execute.assert_any_call("SELECT * FROM products WHERE id IN (%s)", (1,))
+        self.assertEqual([p['name'] for p in self.cache.list('products')], ['Green Tea', 'Mocha'])
+        self.assertEqual(self.cache.watermark, 1508)
+        self.assertEqual(min(self.cache._gaps), 8)
+        self.assertNotIn(9, self.cache._gaps)
+
+    def test_full_load_seeds_only_missing_ids_between_entries(self):
+        # Arrange
+        self.cursor.fetchone.return_value = {'id': 25003}
+        self.cursor.fetchall.side_effect = [[{'id': 25000}, {'id': 25003}], []]
+
+        # Act
+        self.cache.refresh(self.conn)
+
+        # Assert
+        self.assertEqual(sorted(self.cache._gaps), [25001, 25002])
+
+    def test_unfilled_gaps_expire(self):
+        # Arrange
+        self.cursor.fetchone.return_value = {'id': 7}
+        self.cursor.fetchall.side_effect = [[{'id': 5}, {'id': 7}], []]
+        with patch('src.catalog.time.monotonic', return_value=100.0):
+            self.cache.refresh(self.conn)
+        self.cursor.reset_mock()
+        self.cursor.fetchall.side_effect = [[]]
+
+        # Act
+        with patch('src.catalog.time.monotonic', return_value=100.0 + CHANGE_LOG_GAP_TIMEOUT):
+            self.cache.refresh(self.conn)
+
+        # Assert
+        self.cursor.execute.assert_called_once_with(
+            "SELECT id, table_name, row_id FROM change_log WHERE id >= %s OR id = (SELECT MIN(id) FROM change_log) ORDER BY id", (8,))
+
+    def test_pruned_change_log_forces_full_load(self):
+        # Arrange
+        self.cursor.fetchone.return_value = {'id': 7}
+        self.cursor.fetchall.return_value = []
+        self.cache.refresh(self.conn)
+        self.cursor.fetchall.side_effect = [[{'id': 500, 'table_name': 'products', 'row_id': 1}], [], []]
+
+        # Act
+        self.cache.refresh(self.conn)
+
+        # Assert
+        self.assertEqual(self.cache.full_loads, 2)
+
+class TestCatalogSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.conn = MagicMock()
+        self.conn.cursor.return_value = self.cursor
+        self.cache = CatalogCache(tables=('customers',))
+        self.cursor.fetchone.return_value = {'id': 7}
+        self.cursor.fetchall.side_effect = [[], [
+            {'id': 1, 'name': 'Alice Smith', 'phone': '07123 456789'},
+            {'id': 2, 'name': 'Bob Smithers', 'phone': '07999000111'},
+            {'id': 3, 'name': 'Smith Jones', 'phone': '07555123456'},
+        ]]
+        self.cache.refresh(self.conn)
+
+    def names(self, query):
+        return [row['name'] for row in self.cache.search('customers', query)]
+
+    def test_search_by_substring_prefix_and_phone(self):
+        # Assert
+        self.assertEqual(self.names('smith'), ['Smith Jones', 'Alice Smith', 'Bob Smithers'])
+        self.assertEqual(self.names('ithe'), ['Bob Smithers'])
+        self.assertEqual(self.names('al sm'), ['Alice Smith'])
+        self.assertEqual(self.names('07123456'), ['Alice Smith'])
+        self.assertEqual(self.names('latte'), [])
+
+    def test_incremental_refresh_updates_index_in_place(self):
+        # Arrange
+        rows = self.cache.list('customers')
+        self.cursor.fetchall.side_effect = [
+            [{'id': 8, 'table_name': 'customers', 'row_id': 1}, {'id': 9, 'table_name': 'customers', 'row_id': 4}],
+            [{'id': 1, 'name': 'Alice Brown', 'phone': '07123 456789'}, {'id': 4, 'name': 'Dan Smith', 'phone': '07000000000'}],
+        ]
+
+        # Act
+        self.cache.refresh(self.conn)
+
+        # Assert
+        self.assertIs(self.cache.list('customers'), rows)
+        self.assertEqual([row['id'] for row in rows], [1, 2, 3, 4])
+        self.assertEqual(self.names('smith'), ['Smith Jones', 'Bob Smithers', 'Dan Smith'])
+        self.assertEqual(self.names('brown'), ['Alice Brown'])
+        self.assertEqual(self.cache.position('customers', 4), 4)
+        self.assertEqual(self.cache.get('customers', 4)['name'], 'Dan Smith')
+
+class TestSearchInOrderFlow(SQLiteTestCase):
+    products = (('Latte', 2.5, 10), ('Iced Latte', 3.0, 10), ('Tea', 1.5, 10))
+    couriers = (('Bob', '07000000000'),)
+    customers = (('Alice', '1 High St', '07123456789'),)
+
+    def setUp(self):
+        super().setUp()
+        self.app.clear_screen = MagicMock()
+
+    @patch('src.app.SELECT_LIST_LIMIT', 0)
+    @patch('src.app.get_valid_input', return_value=2)
+    @patch('builtins.input', side_effect=['07123', 'tea, latte', 'bob'])
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_order_entities_are_found_by_search(self, mock_stdout, mock_input, mock_get_valid_input):
+        # Act
+        self.app.create_order()
+
+        # Assert
+        output = mock_stdout.getvalue()
+        self.assertIn("Order added successfully!", output)
+        self.assertIn("Matches for 'latte':", output)
+        self.assertNotIn("Product List:", output)
+        self.assertEqual(self.query("SELECT customer_name, courier_name, items FROM order_summary"), [('Alice', 'Bob', 'Iced Latte\x1fTea')])
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_full_load_on_first_refresh: the first refresh reads every table once and records the change_log watermark.
+# test_incremental_refresh_applies_updates_and_deletes: later refreshes only fetch changed ids; missing rows are dropped.
+# test_full_load_marks_window_as_applied: change_log entries the full load already reflects are not re-fetched afterwards.
+# test_no_changes_skips_table_queries: when nothing changed, a refresh is a single change_log query.
+# test_late_commit_below_watermark_is_applied: ids skipped when the watermark moves past an in-flight bulk transaction are read again until they commit, and then applied.
+# test_full_load_seeds_only_missing_ids_between_entries: a full load looks again only for ids missing between the change_log entries it saw, not for the whole lookback window.
+# test_unfilled_gaps_expire: ids that never commit stop being looked for after CHANGE_LOG_GAP_TIMEOUT.
+# test_pruned_change_log_forces_full_load: if entries after our watermark were pruned, the cache reloads everything.
+# test_search_by_substring_prefix_and_phone: names are found by any part of a word, short terms match word starts, phones match by digits, and names starting with the query rank first.
+# test_incremental_refresh_updates_index_in_place: changed and new rows are placed into the existing list and search index without rebuilding either.
+# test_order_entities_are_found_by_search: with long lists the order flow asks for a search instead of printing them, and a search with several matches lets the user pick one.
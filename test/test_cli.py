@@ -0,0 +1,89 @@
+import os
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from src.cli import build_parser, main
+from src.db_pool import get_pool, reset_pool
+from test.sqlite_case import SQLiteTestCase
+
+class TestCli(SQLiteTestCase):
+    in_tempdir = True
+
+    def test_parses_item_list(self):
+        args = build_parser().parse_args(['order', 'create', '--customer', '1', '--courier', '2', '--items', '4,4,7'])
+        self.assertEqual((args.customer, args.courier, args.items), (1, 2, [4, 4, 7]))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_order_create_status_and_sweep(self, mock_stdout):
+        # Act
+        created = main(['order', 'create', '--customer', '1', '--courier', '1', '--items', '1,1,2'])
+        reset_pool()
+        status = main(['order', 'status', '1', 'READY'])
+        reset_pool()
+        swept = main(['order', 'sweep', '--from', 'READY', '--to', 'DELIVERED'])
+
+        # Assert
+        self.assertEqual((created, status, swept), (0, 0, 0))
+        self.assertIn("Order 1 created.", mock_stdout.getvalue())
+        self.assertEqual(self.query("SELECT id, status FROM orders"), [(1, 3)])
+        self.assertEqual(self.query("SELECT inventory FROM products ORDER BY id"), [(8,), (4,)])
+
+    @patch('sys.stderr', new_callable=StringIO)
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_unknown_status_fails(self, mock_stdout, mock_stderr):
+        self.assertEqual(main(['order', 'sweep', '--from', 'READY', '--to', 'LOST']), 1)
+        self.assertIn("Unknown order status: LOST", mock_stderr.getvalue())
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_then_import(self, mock_stdout):
+        # Act
+        exported = main(['export', 'couriers', '--file', 'couriers_backup.csv'])
+        reset_pool()
+        os.rename('export', 'import')
+        imported = main(['import', 'couriers', 'couriers_backup.csv', '--batch-size', '10'])
+        reset_pool()
+        missing = main(['import', 'couriers', 'missing.csv'])
+
+        # Assert
+        self.assertEqual((exported, imported, missing), (0, 0, 1))
+        self.assertEqual(self.query("SELECT name, phone FROM couriers"), [('Bob', '07123456789')])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_archive_run_and_restore(self, mock_stdout):
+        # Arrange
+        main(['order', 'create', '--customer', '1', '--courier', '1', '--items', '1'])
+        reset_pool()
+        main(['order', 'status', '1', 'DELIVERED'])
+        self.execute("UPDATE orders SET updated_at = '2020-01-01 00:00:00'")
+
+        # Act
+        reset_pool()
+        archived = main(['archive', 'run', '--days', '30'])
+        reset_pool()
+        restored = main(['archive', 'restore', '--orders', '1'])
+        reset_pool()
+        nothing = main(['archive', 'restore', '--all'])
+
+        # Assert
+        self.assertEqual((archived, restored, nothing), (0, 0, 1))
+        self.assertIn("Archived 1 delivered orders older than 30 days", mock_stdout.getvalue())
+        self.assertEqual(self.query("SELECT id FROM orders"), [(1,)])
+
+    def test_pool_is_closed_on_exit(self):
+        with patch('sys.stdout', new_callable=StringIO):
+            main(['export', 'products'])
+        stats = get_pool(None).stats()
+        self.assertEqual((stats['in_use'], stats['idle']), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_parses_item_list: --items accepts a comma-separated product id list with repeats for quantity.
+# test_order_create_status_and_sweep: an order created from the command line can have its status set and swept, and inventory is decremented.
+# test_unknown_status_fails: an unknown status name exits with code 1 and an error on stderr.
+# test_export_then_import: a table exported from the command line imports back; a missing file exits with code 1.
+# test_archive_run_and_restore: an old delivered order is archived and restored from the command line; restoring an empty archive exits with code 1.
+# test_pool_is_closed_on_exit: the command closes its pooled connections before exiting.
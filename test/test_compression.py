@@ -0,0 +1,119 @@
+import csv
+import gzip
+import importlib.util
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from src.compression import CompressedWriter, detect_codec, open_import
+from test.sqlite_case import SQLiteTestCase
+
+HAS_ZSTANDARD = importlib.util.find_spec('zstandard') is not None
+
+class TestCompressedStreams(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.rows = [{'id': n, 'name': f"Product {n}", 'price': '1.50'} for n in range(2000)]
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, file_path, codec):
+        with CompressedWriter(file_path, codec, chunk_size=4096) as file:
+            writer = csv.DictWriter(file, fieldnames=['id', 'name', 'price'])
+            writer.writeheader()
+            writer.writerows(self.rows)
+        return file
+
+    def read(self, file_path):
+        with open_import(file_path) as file:
+            return list(csv.DictReader(file))
+
+    def test_gzip_stream_is_written_in_chunks(self):
+        # Act
+        file = self.write('products.csv.gz', 'gzip')
+
+        # Assert
+        with gzip.open('products.csv.gz', 'rt', newline='') as plain:
+            self.assertEqual(len(plain.read().encode()), file.raw_bytes)
+        self.assertGreater(file.raw_bytes, 4096 * 10)
+        self.assertLess(file.compressed_bytes, file.raw_bytes / 3)
+        self.assertEqual(self.read('products.csv.gz')[1999], {'id': '1999', 'name': 'Product 1999', 'price': '1.50'})
+
+    @unittest.skipUnless(HAS_ZSTANDARD, "zstandard is not installed")
+    def test_zstd_round_trip(self):
+        # Act
+        self.write('products.csv.zst', 'zstd')
+
+        # Assert
+        self.assertEqual(detect_codec('products.csv.zst'), 'zstd')
+        self.assertEqual(len(self.read('products.csv.zst')), 2000)
+
+    def test_codec_is_detected_from_content_not_name(self):
+        # Arrange
+        self.write('renamed.csv', 'gzip')
+        with open('plain.csv', 'w', newline='') as file:
+            file.write("id,name\n1,Tea\n")
+
+        # Assert
+        self.assertEqual((detect_codec('renamed.csv'), detect_codec('plain.csv')), ('gzip', None))
+        self.assertEqual(len(self.read('renamed.csv')), 2000)
+        self.assertEqual(self.read('plain.csv'), [{'id': '1', 'name': 'Tea'}])
+
+    def test_compressor_error_is_raised_to_the_writer(self):
+        # Arrange
+        compressor = MagicMock()
+        compressor.compress.side_effect = OSError("No space left on device")
+
+        # Act
+        with patch('src.compression._compressor', return_value=compressor):
+            with self.assertRaises(OSError):
+                with CompressedWriter('broken.csv.gz', 'gzip', chunk_size=16) as file:
+                    for _ in range(100):
+                        file.write("1,Tea,1.50\r\n")
+
+        # Assert
+        self.assertEqual(compressor.compress.call_count, 1)
+
+class TestCompressedExportImport(SQLiteTestCase):
+    products = ()
+    couriers = (('Bob', '07123456789'), ('Cy', '07000000000'))
+    customers = ()
+    in_tempdir = True
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_compressed_export_imports_back(self, mock_stdout):
+        # Arrange
+        self.app.export_to_csv('couriers', 'couriers.csv', compression='gzip')
+        os.rename('export', 'import')
+        cursor = self.app.db_conn.cursor()
+        cursor.execute("UPDATE couriers SET phone = '0'")
+        cursor.close()
+
+        # Act
+        imported = self.app.import_from_csv('couriers', 'couriers.csv.gz')
+
+        # Assert
+        self.assertTrue(imported)
+        self.assertIn("compressed to", mock_stdout.getvalue())
+        cursor = self.app.db_conn.cursor()
+        cursor.execute("SELECT name, phone FROM couriers ORDER BY id")
+        self.assertEqual(cursor.fetchall(), [('Bob', '07123456789'), ('Cy', '07000000000')])
+        cursor.close()
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_gzip_stream_is_written_in_chunks: CSV written through the compressing writer is handed off in blocks, decompresses to exactly the bytes written, and is much smaller.
+# test_zstd_round_trip: a zstd export is recognised and read back row for row.
+# test_codec_is_detected_from_content_not_name: a gzip file without a .gz suffix is still decompressed, and plain files are read unchanged.
+# test_compressor_error_is_raised_to_the_writer: a failure on the compression thread surfaces in the exporting thread instead of being lost, and no further blocks are compressed.
+# test_compressed_export_imports_back: a gzip export is named .csv.gz, reports its compression ratio, and imports back without any flag.
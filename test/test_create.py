@@ -32,6 +32,7 @@ class TestCafeApp(unittest.TestCase):
         cursor_mock = MagicMock()
         self.app.db_conn.cursor.return_value = cursor_mock
         cursor_mock.lastrowid = 1
+        cursor_mock.fetchone.return_value = {'id': 0}  # empty change_log when the catalog reloads
 
         # Act
         self.app.create_courier()
@@ -48,6 +49,7 @@ class TestCafeApp(unittest.TestCase):
         cursor_mock = MagicMock()
         self.app.db_conn.cursor.return_value = cursor_mock
         cursor_mock.lastrowid = 1
+        cursor_mock.fetchone.return_value = {'id': 0}  # empty change_log when the catalog reloads
 
         # Act
         self.app.create_customer()
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from src.csv_import import UpsertStatement, load_data_infile, pipelined_upsert, validate_columns
+from src.db_pool import ConnectionPool
+
+class TestCsvImport(unittest.TestCase):
+
+    def test_upsert_statement(self):
+        # Arrange
+        statement = UpsertStatement('couriers', ['name', 'phone'])
+
+        # Act
+        sql = statement.sql(2)
+
+        # Assert
+        self.assertEqual(sql, "INSERT INTO couriers (name, phone) VALUES (%s, %s), (%s, %s) ON DUPLICATE KEY UPDATE name = VALUES(name), phone = VALUES(phone)")
+        self.assertIs(sql, statement.sql(2))
+
+    def test_empty_deleted_at_is_written_as_null(self):
+        # Arrange
+        statement = UpsertStatement('products', ['name', 'deleted_at'])
+
+        # Act
+        values = statement.values([{'name': 'Tea', 'deleted_at': ''}, {'name': 'Soup', 'deleted_at': '2024-01-01 10:00:00'}])
+
+        # Assert
+        self.assertEqual(values, ('Tea', None, 'Soup', '2024-01-01 10:00:00'))
+
+    def test_invalid_column_rejected(self):
+        with self.assertRaises(ValueError):
+            validate_columns(['name', 'phone); DROP TABLE couriers; --'])
+
+    def test_pipelined_upsert_spreads_batches_over_writers(self):
+        # Arrange
+        conns = []
+        def factory():
+            conns.append(MagicMock())
+            return conns[-1]
+        pool = ConnectionPool(factory, size=2, health_check=False)
+        rows = ({'name': f'Courier {i}', 'phone': '0123456789'} for i in range(7))
+        batches = []
+
+        # Act
+        summary = pipelined_upsert(pool, 'couriers', rows, ['name', 'phone'], batch_size=2, writers=2, queue_depth=1, on_batch=lambda n, count, seconds: batches.append(n))
+
+        # Assert
+        self.assertEqual((summary['rows'], summary['batches']), (7, 4))
+        self.assertEqual(sorted(batches), [1, 2, 3, 4])
+        self.assertEqual(sum(conn.commit.call_count for conn in conns), 4)
+        self.assertEqual(pool.stats()['in_use'], 0)
+
+    def test_pipelined_upsert_rejects_short_rows(self):
+        # Arrange
+        pool = ConnectionPool(MagicMock, size=1, health_check=False)
+        rows = [{'name': 'Bob', 'phone': '0123456789'}, {'name': 'Ann', 'phone': None}]
+
+        # Act / Assert
+        with self.assertRaisesRegex(ValueError, "Line 3"):
+            pipelined_upsert(pool, 'couriers', rows, ['name', 'phone'], batch_size=1)
+        self.assertEqual(pool.stats()['in_use'], 0)
+
+    def test_pipelined_upsert_stops_reader_when_writer_fails(self):
+        # Arrange
+        def execute(sql, params=None):
+            if sql != "START TRANSACTION":
+                raise sqlite3.OperationalError("disk full")
+        conn = MagicMock()
+        conn.cursor.return_value.execute.side_effect = execute
+        pool = ConnectionPool(lambda: conn, size=1, health_check=False)
+        rows = ({'name': f'Courier {i}', 'phone': '0123456789'} for i in range(1000))
+
+        # Act / Assert
+        with self.assertRaises(sqlite3.OperationalError):
+            pipelined_upsert(pool, 'couriers', rows, ['name', 'phone'], batch_size=1, queue_depth=1)
+        conn.rollback.assert_called()
+
+    def test_load_data_refreshes_in_the_same_transaction(self):
+        # Arrange
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = (2,)
+        events = []
+        conn.commit.side_effect = lambda: events.append('commit')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'couriers.csv')
+            with open(path, 'w', newline='') as file:
+                file.write("id,name,phone\r\n1,Bob,07123456789\r\n2,Cy,07000000000\r\n")
+
+            # Act
+            total = load_data_infile(conn, 'couriers', path, ['id', 'name', 'phone'], on_staged=lambda staged: events.append('refresh'))
+
+        # Assert
+        self.assertEqual(total, 2)
+        self.assertEqual(events, ['refresh', 'commit'])
+
+    def test_load_data_loads_empty_deleted_at_as_null(self):
+        # Arrange
+        conn = MagicMock()
+        conn.cursor.return_value.fetchone.return_value = (2,)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'couriers.csv')
+            # An export of one live courier and one soft-deleted courier
+            with open(path, 'w', newline='') as file:
+                file.write("id,name,phone,deleted_at\r\n1,Bob,07123456789,\r\n2,Cy,07000000000,2026-01-05 10:00:00\r\n")
+
+            # Act
+            load_data_infile(conn, 'couriers', path, ['id', 'name', 'phone', 'deleted_at'])
+
+        # Assert
+        load = next(args[0] for args, _ in conn.cursor.return_value.execute.call_args_list if args[0].startswith("LOAD DATA"))
+        self.assertTrue(load.endswith("IGNORE 1 LINES (id, name, phone, @deleted_at) SET deleted_at = NULLIF(@deleted_at, '')"))
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_upsert_statement: the multi-row upsert text is built once per batch size and reused.
+# test_empty_deleted_at_is_written_as_null: exported live rows, whose deleted_at is an empty CSV field, import as NULL instead of an empty string.
+# test_invalid_column_rejected: CSV header names that are not plain identifiers never reach the SQL text.
+# test_pipelined_upsert_spreads_batches_over_writers: every parsed batch is written and committed exactly once across the writer threads, and their connections go back to the pool.
+# test_pipelined_upsert_rejects_short_rows: a row missing fields stops the import with its line number.
+# test_pipelined_upsert_stops_reader_when_writer_fails: a database error in a writer stops the reader instead of leaving it blocked on the full queue, and is raised to the caller.
+# test_load_data_refreshes_in_the_same_transaction: the on_staged hook runs after the staged rows are upserted and before the commit, so the summaries change together with the import.
+# test_load_data_loads_empty_deleted_at_as_null: LOAD DATA reads deleted_at through a variable, so a live row's empty field loads as NULL and a soft-deleted row keeps its timestamp.
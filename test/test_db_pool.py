@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import MagicMock
+from src.db_pool import ConnectionPool, PoolTimeoutError
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = MagicMock(side_effect=lambda: MagicMock(in_transaction=False))
+        self.pool = ConnectionPool(self.factory, size=2, timeout=0.05)
+
+    def test_connections_are_reused(self):
+        # Act
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            pass
+
+        # Assert
+        self.assertIs(first, second)
+        self.factory.assert_called_once()
+
+    def test_pool_size_is_enforced(self):
+        # Arrange
+        self.pool.acquire()
+        self.pool.acquire()
+
+        # Act / Assert
+        with self.assertRaises(PoolTimeoutError):
+            self.pool.acquire()
+        self.assertEqual(self.factory.call_count, 2)
+
+    def test_unhealthy_connection_is_replaced(self):
+        # Arrange
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+        conn.is_connected.return_value = False
+
+        # Act
+        replacement = self.pool.acquire()
+
+        # Assert
+        self.assertIsNot(conn, replacement)
+        conn.close.assert_called_once()
+        self.assertEqual(self.pool.stats()['health_check_failures'], 1)
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        # Arrange
+        conn = self.pool.acquire()
+        conn.in_transaction = True
+
+        # Act
+        self.pool.release(conn)
+
+        # Assert
+        conn.rollback.assert_called_once()
+
+    def test_stats(self):
+        # Act
+        with self.pool.connection():
+            stats = self.pool.stats()
+
+        # Assert
+        self.assertEqual(stats['in_use'], 1)
+        self.assertEqual(stats['checkouts'], 1)
+        self.assertEqual(self.pool.stats()['in_use'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_connections_are_reused: a released connection is handed out again instead of opening a new one.
+# test_pool_size_is_enforced: once `size` connections are checked out, acquire() waits and then raises PoolTimeoutError.
+# test_unhealthy_connection_is_replaced: a connection failing is_connected() on checkout is closed and replaced.
+# test_open_transaction_is_rolled_back_on_release: unfinished transactions never leak to the next caller.
+# test_stats: in_use and checkout counters follow acquire/release.
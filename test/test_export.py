@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from io import StringIO
+from unittest.mock import patch, MagicMock
+from src.app import CafeApp
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        with patch('src.app.get_connection_pool'):
+            self.app = CafeApp()
+        self.cursor = MagicMock()
+        self.conn = MagicMock()
+        self.conn.cursor.return_value = self.cursor
+
+        @contextmanager
+        def connection():
+            yield self.conn
+        self.app.pool.connection = connection
+
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_streams_in_chunks(self, mock_stdout):
+        # Arrange
+        self.cursor.description = [('id',), ('name',)]
+        self.cursor.fetchmany.side_effect = [[{'id': 1, 'name': 'Tea'}, {'id': 2, 'name': 'Coffee'}], [{'id': 3, 'name': 'Cake'}], []]
+
+        # Act
+        rows = self.app.export_to_csv('products', 'products.csv', chunk_size=2)
+
+        # Assert
+        self.conn.cursor.assert_called_once_with(dictionary=True, buffered=False)
+        self.cursor.fetchall.assert_not_called()
+        self.assertEqual(rows, 3)
+        with open(os.path.join('export', 'products.csv')) as file:
+            self.assertEqual(file.read().splitlines(), ['id,name', '1,Tea', '2,Coffee', '3,Cake'])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_empty_table_writes_header(self, mock_stdout):
+        # Arrange
+        self.cursor.description = [('id',), ('name',), ('phone',)]
+        self.cursor.fetchmany.return_value = []
+
+        # Act
+        rows = self.app.export_to_csv('couriers', 'couriers.csv')
+
+        # Assert
+        self.assertEqual(rows, 0)
+        with open(os.path.join('export', 'couriers.csv')) as file:
+            self.assertEqual(file.read().splitlines(), ['id,name,phone'])
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_export_streams_in_chunks: rows are pulled with fetchmany from an unbuffered cursor and written as they arrive.
+# test_export_empty_table_writes_header: the header comes from the cursor description, so empty tables still export a header.
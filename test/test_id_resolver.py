@@ -0,0 +1,46 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import MagicMock
+from src.id_resolver import IdResolver
+
+class TestIdResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.resolver = IdResolver(tables=('products',))
+        conn = MagicMock()
+        conn.cursor.return_value.fetchall.return_value = [{'id': 3, 'name': 'Tea', 'price': Decimal('1.50')}]
+        self.resolver.preload(conn)
+
+    def test_known_entity_resolves_in_memory(self):
+        # Act
+        product_id = self.resolver.resolve('products', {'name': 'Tea', 'price': '1.5'})
+
+        # Assert
+        self.assertEqual(product_id, 3)
+        self.assertFalse(self.resolver.has_pending())
+
+    def test_missing_entities_are_created_in_one_statement(self):
+        # Arrange
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(7, 'Cake', Decimal('2.00')), (8, 'Soup', Decimal('4.25'))]
+        self.assertIsNone(self.resolver.resolve('products', {'name': 'Cake', 'price': '2.00'}))
+        self.assertIsNone(self.resolver.resolve('products', {'name': 'Soup', 'price': '4.25'}))
+        self.resolver.resolve('products', {'name': 'Cake', 'price': '2'})
+
+        # Act
+        self.resolver.create_pending(cursor)
+
+        # Assert
+        cursor.execute.assert_any_call("INSERT INTO products (name, price) VALUES (%s, %s), (%s, %s)", ('Cake', '2.00', 'Soup', '4.25'))
+        self.assertEqual(self.resolver.lookup('products', {'name': 'Cake', 'price': '2'}), 7)
+        self.assertEqual(self.resolver.lookup('products', {'name': 'Soup', 'price': '4.25'}), 8)
+        self.assertFalse(self.resolver.has_pending())
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_known_entity_resolves_in_memory: preloaded natural keys (with prices normalised) resolve without touching the database.
+# test_missing_entities_are_created_in_one_statement: unknown entities are de-duplicated, inserted together and their new ids read back.
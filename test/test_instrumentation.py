@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from src.instrumentation import SqlStats, InstrumentedConnection, fingerprint
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp.name, 'slow.log')
+        self.stats = SqlStats(slow_query_ms=1000, slow_query_log=self.log_file)
+        self.raw_conn = MagicMock()
+        self.raw_cursor = self.raw_conn.cursor.return_value
+        self.raw_cursor.rowcount = 2
+        self.conn = InstrumentedConnection(self.raw_conn, self.stats)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprint_collapses_literals_and_lists(self):
+        self.assertEqual(fingerprint("SELECT * FROM products  WHERE id IN (%s, %s, %s) AND name = 'Tea'"), "SELECT * FROM products WHERE id IN (...) AND name = ?")
+        self.assertEqual(fingerprint("INSERT INTO order_items (order_id, product_id) VALUES (%s, %s), (%s, %s)"), "INSERT INTO order_items (order_id, product_id) VALUES (...)")
+
+    def test_statements_and_actions_are_recorded(self):
+        # Act
+        with self.stats.action('create_order'):
+            cursor = self.conn.cursor()
+            cursor.execute("UPDATE products SET inventory = inventory - 1 WHERE id = %s", (1,))
+            cursor.execute("UPDATE products SET inventory = inventory - 1 WHERE id = %s", (2,))
+            self.conn.commit()
+        report = self.stats.report()
+
+        # Assert
+        statement = report['statements']["UPDATE products SET inventory = inventory - ? WHERE id = ?"]
+        self.assertEqual(statement['count'], 2)
+        self.assertEqual(statement['rows'], 4)
+        self.assertEqual(report['actions']['create_order']['round_trips'], 3)
+        self.assertFalse(os.path.exists(self.log_file))
+
+    def test_slow_queries_are_logged(self):
+        # Arrange
+        self.stats.slow_query_ms = 0
+
+        # Act
+        self.conn.cursor().execute("SELECT * FROM orders")
+
+        # Assert
+        with open(self.log_file) as file:
+            self.assertIn("SELECT * FROM orders", file.read())
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_fingerprint_collapses_literals_and_lists: statements differing only in literals or list lengths share one fingerprint.
+# test_statements_and_actions_are_recorded: each execute/commit counts as a round trip for the current action; rows come from rowcount.
+# test_slow_queries_are_logged: statements above the threshold are appended to the slow-query log.
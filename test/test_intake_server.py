@@ -0,0 +1,170 @@
+import asyncio
+import json
+import threading
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from src.db_pool import PoolTimeoutError
+from src.intake_server import IntakeServer
+from test.sqlite_case import AsyncSQLiteTestCase
+
+class TestIntakeServer(AsyncSQLiteTestCase):
+    products = (('Tea', 1.5, 100), ('Cake', 2.25, 100))
+
+    async def asyncSetUp(self):
+        self.pool = self.app.pool
+        self.server = IntakeServer(self.pool, workers=2, concurrency=4)
+        listener = await self.server.start('127.0.0.1', 0)
+        self.port = listener.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def send(self, *requests):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        for request in requests:
+            writer.write((request if isinstance(request, str) else json.dumps(request)).encode() + b"\n")
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in requests]
+        writer.close()
+        await writer.wait_closed()
+        return {response['id']: response for response in responses}
+
+    async def test_concurrent_orders_from_several_clients(self):
+        # Arrange
+        order = {'op': 'create_order', 'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 1, 2]}
+
+        # Act
+        results = await asyncio.gather(*(self.send(*[dict(order, id=n) for n in range(5)]) for _ in range(4)))
+
+        # Assert
+        order_ids = [response['order_id'] for responses in results for response in responses.values()]
+        self.assertTrue(all(response['ok'] for responses in results for response in responses.values()))
+        self.assertEqual(len(set(order_ids)), 20)
+        self.assertEqual(self.query("SELECT inventory FROM products ORDER BY id"), [(60,), (80,)])
+
+    async def test_status_update(self):
+        # Arrange
+        created = await self.send({'id': 'a', 'op': 'create_order', 'customer_id': 1, 'courier_id': 1, 'product_ids': [2]})
+
+        # Act
+        responses = await self.send({'id': 'b', 'op': 'set_status', 'order_ids': [created['a']['order_id']], 'status': 'READY'})
+
+        # Assert
+        self.assertEqual(responses['b'], {'id': 'b', 'ok': True, 'updated': 1})
+        self.assertEqual(self.query("SELECT status FROM orders"), [(2,)])
+
+    async def test_bad_requests_get_errors_and_keep_the_connection(self):
+        # Act
+        responses = await self.send(
+            'not json',
+            {'id': 1, 'op': 'create_order', 'customer_id': 1, 'courier_id': 1, 'product_ids': []},
+            {'id': 2, 'op': 'set_status', 'order_ids': [1], 'status': 'LOST'},
+            {'id': 3, 'op': 'create_order', 'customer_id': 1, 'courier_id': 9, 'product_ids': [1]},
+            {'id': 4, 'op': 'ping'},
+        )
+
+        # Assert
+        self.assertFalse(responses[None]['ok'])
+        self.assertIn('product_ids', responses[1]['error'])
+        self.assertEqual(responses[2]['error'], "Unknown order status: LOST")
+        self.assertFalse(responses[3]['ok'])
+        self.assertEqual(responses[4], {'id': 4, 'ok': True})
+        self.assertEqual(self.query("SELECT COUNT(*) FROM orders"), [(0,)])
+        self.assertEqual(self.pool.stats()['in_use'], 0)
+
+    async def test_order_beyond_stock_is_rejected_whole(self):
+        # Act
+        responses = await self.send({'id': 1, 'op': 'create_order', 'customer_id': 1, 'courier_id': 1, 'product_ids': [2] + [1] * 101})
+
+        # Assert
+        self.assertFalse(responses[1]['ok'])
+        self.assertIn("product 1: requested 101, in stock 100", responses[1]['error'])
+        self.assertEqual(self.query("SELECT inventory FROM products ORDER BY id"), [(100,), (100,)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM orders"), [(0,)])
+
+    async def test_deleted_customers_and_couriers_take_no_orders(self):
+        # Arrange
+        self.execute("INSERT INTO customers (name, address, phone) VALUES (%s, %s, %s)", ('Dee', '2 Low St', '07111111111'))
+        self.execute("INSERT INTO couriers (name, phone) VALUES (%s, %s)", ('Cy', '07000000000'))
+        self.execute("UPDATE customers SET deleted_at = CURRENT_TIMESTAMP WHERE id = 2")
+        self.execute("UPDATE couriers SET deleted_at = CURRENT_TIMESTAMP WHERE id = 2")
+
+        # Act
+        responses = await self.send(
+            {'id': 1, 'op': 'create_order', 'customer_id': 2, 'courier_id': 1, 'product_ids': [1]},
+            {'id': 2, 'op': 'create_order', 'customer_id': 1, 'courier_id': 2, 'product_ids': [1]},
+        )
+
+        # Assert
+        self.assertEqual(responses[1], {'id': 1, 'ok': False, 'error': "No customer with id 2"})
+        self.assertEqual(responses[2], {'id': 2, 'ok': False, 'error': "No courier with id 2"})
+        self.assertEqual(self.query("SELECT COUNT(*) FROM orders"), [(0,)])
+        self.assertEqual(self.query("SELECT inventory FROM products WHERE id = 1"), [(100,)])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    async def test_workers_are_capped_at_the_pool_size(self, mock_stdout):
+        # Act
+        server = IntakeServer(self.pool, workers=self.pool.size + 4)
+        await server.close()
+
+        # Assert
+        self.assertEqual(server.workers, self.pool.size)
+        self.assertIn(f"Using {self.pool.size} workers instead of {self.pool.size + 4}", mock_stdout.getvalue())
+
+    async def test_unexpected_errors_are_answered(self):
+        # Act
+        with patch.object(self.server.pool, 'connection', side_effect=PoolTimeoutError("No connection available within 30s")):
+            timed_out = await self.send({'id': 1, 'op': 'create_order', 'customer_id': 1, 'courier_id': 1, 'product_ids': [1]})
+        malformed = await self.send({'id': 2, 'op': 'set_status', 'order_ids': [1], 'status': ['READY']})
+
+        # Assert
+        self.assertFalse(timed_out[1]['ok'])
+        self.assertIn("PoolTimeoutError", timed_out[1]['error'])
+        self.assertFalse(malformed[2]['ok'])
+        self.assertIn("TypeError", malformed[2]['error'])
+
+    async def test_busy_server_stops_reading_the_socket(self):
+        # Arrange
+        self.server.limit = asyncio.Semaphore(2)
+        release = threading.Event()
+        started = []
+
+        def slow_order(request):
+            started.append(request['id'])
+            release.wait(5)
+            return {'order_id': 0}
+
+        respond = self.server.respond
+        read = []
+
+        async def counted(line):
+            read.append(line)
+            return await respond(line)
+
+        # Act
+        with patch.object(self.server, 'create_order', side_effect=slow_order), patch.object(self.server, 'respond', side_effect=counted):
+            sending = asyncio.create_task(self.send(*[{'id': n, 'op': 'create_order'} for n in range(10)]))
+            await asyncio.sleep(0.2)
+            admitted = (len(read), len(started))
+            release.set()
+            responses = await sending
+
+        # Assert
+        self.assertEqual(admitted, (2, 2))
+        self.assertEqual(sorted(responses), list(range(10)))
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_concurrent_orders_from_several_clients: orders pipelined by several clients at once are all written once, with inventory decremented for each.
+# test_status_update: a set_status request changes the status by name and reports the rows updated.
+# test_bad_requests_get_errors_and_keep_the_connection: malformed JSON, invalid fields, unknown statuses and unknown couriers are answered with errors without closing the connection or leaving partial orders.
+# test_order_beyond_stock_is_rejected_whole: an order asking for more units than are in stock is refused with the shortfall, and no stock or order rows are written for any of its products.
+# test_deleted_customers_and_couriers_take_no_orders: orders for a soft-deleted customer or courier are refused without writing the order or reserving stock.
+# test_workers_are_capped_at_the_pool_size: asking for more intake workers than the pool has connections uses the pool size and says so.
+# test_unexpected_errors_are_answered: a pool timeout and a well-formed request with a field of the wrong type each get an error response instead of no reply.
+# test_busy_server_stops_reading_the_socket: with every slot taken, further requests from a client are left unread on the socket until a slot frees, and then all are answered.
@@ -0,0 +1,144 @@
+import threading
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, call, patch
+from src.inventory import InsufficientStockError, adjust, release, reserve
+from src.orders import write_order
+from src.storage import run_in_transaction
+from test.sqlite_case import SQLiteTestCase
+
+class TestInventoryStatements(unittest.TestCase):
+
+    def setUp(self):
+        self.cursor = MagicMock()
+
+    def test_reserve_is_one_guarded_update_in_a_savepoint(self):
+        # Arrange
+        self.cursor.rowcount = 2
+
+        # Act
+        reserve(self.cursor, {6: 1, 5: 2})
+
+        # Assert
+        self.assertEqual(self.cursor.execute.call_args_list, [
+            call("SAVEPOINT reserve_stock"),
+            call("UPDATE products SET inventory = inventory - CASE id WHEN %s THEN %s WHEN %s THEN %s END WHERE id IN (%s, %s) "
+                 "AND deleted_at IS NULL AND inventory >= CASE id WHEN %s THEN %s WHEN %s THEN %s END", (5, 2, 6, 1, 5, 6, 5, 2, 6, 1)),
+            call("RELEASE SAVEPOINT reserve_stock"),
+        ])
+
+    def test_short_reservation_is_undone_and_reported(self):
+        # Arrange
+        self.cursor.rowcount = 1
+        self.cursor.fetchall.return_value = [(5, 1), (6, 10)]
+
+        # Act
+        with self.assertRaises(InsufficientStockError) as raised:
+            reserve(self.cursor, {5: 2, 6: 1, 7: 1})
+
+        # Assert
+        self.cursor.execute.assert_any_call("ROLLBACK TO SAVEPOINT reserve_stock")
+        self.assertEqual(raised.exception.shortages, {5: (2, 1), 7: (1, 0)})
+        self.assertIn("product 5: requested 2, in stock 1", str(raised.exception))
+
+    def test_adjust_moves_only_the_difference(self):
+        # Arrange
+        self.cursor.rowcount = 1
+
+        # Act
+        adjust(self.cursor, {5: 2, 6: 1}, {5: 1, 6: 3})
+
+        # Assert
+        self.cursor.execute.assert_any_call("UPDATE products SET inventory = inventory + CASE id WHEN %s THEN %s END WHERE id IN (%s)", (5, 1, 5))
+        self.cursor.execute.assert_any_call("UPDATE products SET inventory = inventory - CASE id WHEN %s THEN %s END WHERE id IN (%s) "
+                                            "AND deleted_at IS NULL AND inventory >= CASE id WHEN %s THEN %s END", (6, 2, 6, 6, 2))
+
+    def test_release_skips_empty_quantities(self):
+        # Act
+        release(self.cursor, {5: 0})
+
+        # Assert
+        self.cursor.execute.assert_not_called()
+
+class TestConcurrentReservations(SQLiteTestCase):
+    products = (('Tea', 1.5, 30), ('Cake', 2.25, 1000))
+
+    def test_concurrent_tills_never_oversell(self):
+        # Arrange
+        placed, rejected = [], []
+
+        def till():
+            for _ in range(10):
+                try:
+                    with self.app.pool.connection() as conn:
+                        placed.append(run_in_transaction(conn, lambda cursor: write_order(cursor, 1, 1, [1, 2])))
+                except InsufficientStockError:
+                    rejected.append(1)
+
+        threads = [threading.Thread(target=till) for _ in range(4)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual((len(placed), len(rejected)), (30, 10))
+        self.assertEqual(self.query("SELECT inventory FROM products ORDER BY id"), [(0,), (970,)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM orders"), [(30,)])
+
+class TestOrderUpdate(SQLiteTestCase):
+    products = (('Tea', 1.5, 10), ('Cake', 2.25, 10))
+
+    def setUp(self):
+        super().setUp()
+        self.app.clear_screen = MagicMock()
+        self.app.print_order_list = MagicMock()
+        self.order_id = run_in_transaction(self.app.db_conn, lambda cursor: write_order(cursor, 1, 1, [1]))
+        self.app.order_index_map = {1: self.order_id}
+
+    def state(self):
+        return self.query("SELECT product_id, quantity FROM order_items ORDER BY product_id"), self.query("SELECT inventory FROM products ORDER BY id")
+
+    @patch('src.app.get_valid_input', return_value=1)
+    @patch('builtins.input', side_effect=['', 'cake, cake, tea', 'cancel'])
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_cancel_at_courier_prompt_changes_nothing(self, mock_stdout, mock_input, mock_get_valid_input):
+        # Arrange
+        before = self.state()
+
+        # Act
+        self.app.update_order()
+
+        # Assert
+        self.assertIn("Order update cancelled.", mock_stdout.getvalue())
+        self.assertFalse(self.app.db_conn.in_transaction)
+        self.assertEqual(self.state(), before)
+        self.assertEqual(before, ([(1, 1)], [(9,), (10,)]))
+
+    @patch('src.app.get_valid_input', return_value=1)
+    @patch('builtins.input', side_effect=['', 'cake, cake, tea', ''])
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_update_writes_items_and_stock_together(self, mock_stdout, mock_input, mock_get_valid_input):
+        # Act
+        self.app.update_order()
+
+        # Assert
+        self.assertIn("Order updated successfully!", mock_stdout.getvalue())
+        self.assertFalse(self.app.db_conn.in_transaction)
+        self.assertEqual(self.state(), ([(1, 1), (2, 2)], [(9,), (8,)]))
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_reserve_is_one_guarded_update_in_a_savepoint: every product of a reservation is decremented by one CASE UPDATE, in id order, that only matches rows with enough stock.
+# test_short_reservation_is_undone_and_reported: when fewer rows match than products requested, the savepoint is rolled back and the error lists each shortfall, including unknown products.
+# test_adjust_moves_only_the_difference: editing an order releases the units it no longer needs and reserves only the extra ones.
+# test_release_skips_empty_quantities: releasing nothing issues no statement.
+# test_concurrent_tills_never_oversell: four threads racing for 30 units of a hot product place exactly 30 orders, reject the rest whole, and leave inventory at zero.
+# test_cancel_at_courier_prompt_changes_nothing: cancelling after choosing new products leaves the order items and stock as they were and no transaction open.
+# test_update_writes_items_and_stock_together: a confirmed edit rewrites the items and moves only the stock difference in one transaction.
@@ -0,0 +1,55 @@
+import unittest
+from io import StringIO
+from unittest.mock import patch, MagicMock
+from src.app import CafeApp
+
+class TestOrderList(unittest.TestCase):
+
+    def setUp(self):
+        with patch('src.app.get_connection_pool'):
+            self.app = CafeApp()
+        self.app.db_conn = MagicMock()
+        self.cursor = MagicMock()
+        self.app.db_conn.cursor.return_value = self.cursor
+        self.app.clear_screen = MagicMock()
+
+    def test_fetch_order_page_uses_keyset_and_filters(self):
+        # Arrange
+        self.cursor.fetchall.return_value = [{'id': 41, 'items': 'Tea\x1fCake', 'item_quantities': '2\x1f1'}]
+
+        # Act
+        orders = self.app.fetch_order_page(after_id=40, status='READY', courier_id=3, limit=5)
+
+        # Assert
+        self.cursor.execute.assert_called_once()
+        sql, params = self.cursor.execute.call_args[0]
+        self.assertIn("FROM order_summary", sql)
+        self.assertIn("order_id > %s AND status = %s AND courier_id = %s", sql)
+        self.assertEqual(params, (40, 'READY', 3, 5))
+        self.assertEqual(orders[0]['product'], 'Tea x2, Cake')
+
+    @patch('src.app.ORDER_PAGE_SIZE', 2)
+    @patch('builtins.input', side_effect=['0', 'n', ''])
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_print_order_list_pages_forward(self, mock_stdout, mock_input):
+        # Arrange
+        page_one = [{'id': i, 'customer_name': 'A', 'address': 'B', 'phone': 'C', 'courier': 'D', 'status': 'READY', 'product': 'Tea', 'total': 1.5} for i in (1, 2, 3)]
+        page_two = [dict(page_one[2])]
+        self.app.fetch_order_page = MagicMock(side_effect=[page_one, page_two])
+
+        # Act
+        self.app.print_order_list()
+
+        # Assert
+        self.assertEqual(self.app.fetch_order_page.call_args_list[1][0][0], 2)
+        self.assertEqual(self.app.order_index_map, {3: 3})
+        self.assertIn("Order List (page 2)", mock_stdout.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_fetch_order_page_uses_keyset_and_filters: pages are read from order_summary in one query with WHERE order_id > last_id plus the combined status/courier filters, and items are shown with their quantities.
+# test_print_order_list_pages_forward: 'n' moves to the next page starting after the last id shown, and numbering continues across pages.
@@ -0,0 +1,168 @@
+import csv
+import os
+import sqlite3
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from src import order_summary
+from src.order_summary import SUMMARY_COLUMNS, split_items
+from src.storage import MySQLBackend
+from test.sqlite_case import SQLiteTestCase
+
+class TestOrderSummary(SQLiteTestCase):
+    couriers = (('Bob', '07123456789'), ('Cy', '07000000000'))
+    in_tempdir = True
+
+    def setUp(self):
+        super().setUp()
+        self.order_ids = self.app.create_orders_bulk([
+            {'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 1, 2]},
+            {'customer_id': 1, 'courier_id': 2, 'product_ids': [2]},
+        ])
+
+    def summaries(self):
+        cursor = self.app.db_conn.cursor(dictionary=True)
+        cursor.execute(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM order_summary ORDER BY order_id")
+        rows = cursor.fetchall()
+        cursor.close()
+        for row in rows:
+            row['total'] = float(row['total'])
+            row['items'] = sorted(split_items(row['items']))
+        return rows
+
+    def test_new_orders_are_summarised(self):
+        first, second = self.summaries()
+        self.assertEqual((first['customer_name'], first['courier_name'], first['status']), ('Ann', 'Bob', 'PREPARING'))
+        self.assertEqual((first['items'], first['item_count'], first['total']), (['Cake', 'Tea'], 3, 5.25))
+        self.assertEqual(sorted(split_items(first['item_quantities'])), ['1', '2'])
+        self.assertIsNotNone(first['created_at'])
+        self.assertEqual((second['courier_id'], second['item_count'], second['total']), (2, 1, 2.25))
+
+    def test_status_changes_update_in_place(self):
+        # Act
+        self.app.set_order_status([self.order_ids[0]], 'READY')
+        self.app.sweep_order_status('PREPARING', 'DELIVERED')
+
+        # Assert
+        self.assertEqual([(row['status_id'], row['status']) for row in self.summaries()], [(2, 'READY'), (3, 'DELIVERED')])
+        page = self.app.fetch_order_page(status='READY')
+        self.assertEqual([order['id'] for order in page], [self.order_ids[0]])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_catalog_import_with_ids_refreshes_affected_orders(self, mock_stdout):
+        # Arrange
+        os.makedirs('import')
+        with open(os.path.join('import', 'products.csv'), 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['id', 'name', 'price', 'inventory'])
+            writer.writerow([2, 'Carrot Cake', '3.00', 5])
+
+        # Act
+        self.assertTrue(self.app.import_from_csv('products', 'products.csv'))
+
+        # Assert
+        first, second = self.summaries()
+        self.assertEqual(first['items'], ['Carrot Cake', 'Tea'])
+        self.assertEqual(second['items'], ['Carrot Cake'])
+        # Orders keep the price they were placed at
+        self.assertEqual((first['total'], second['total']), (5.25, 2.25))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_rebuild_matches_incremental_maintenance(self, mock_stdout):
+        # Arrange
+        self.app.set_order_status([self.order_ids[1]], 'READY')
+        incremental = self.summaries()
+
+        # Act
+        rebuilt = self.app.rebuild_order_summary()
+
+        # Assert
+        self.assertEqual(rebuilt, 2)
+        self.assertEqual(self.summaries(), incremental)
+
+    def test_failed_rebuild_keeps_the_old_summary(self):
+        # Arrange
+        before = self.summaries()
+        refresh = order_summary.refresh_orders
+        calls = []
+
+        def fail_second_batch(*args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise sqlite3.OperationalError("disk I/O error")
+            refresh(*args)
+
+        # Act
+        with patch('src.order_summary.refresh_orders', side_effect=fail_second_batch):
+            with self.assertRaises(sqlite3.OperationalError):
+                order_summary.rebuild(self.app.db_conn, self.app.backend, batch_size=1)
+
+        # Assert
+        self.assertFalse(self.app.db_conn.in_transaction)
+        self.assertEqual(self.summaries(), before)
+
+    def test_mysql_rebuild_swaps_in_a_shadow_table(self):
+        # Arrange
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = (40,)
+        cursor.fetchall.side_effect = [[(1,), (2,)], [], [(41, 'customers', 3)], [(7,)], []]
+
+        # Act
+        with patch('src.order_summary.refresh_orders') as refresh:
+            total = order_summary.rebuild(conn, MySQLBackend())
+
+        # Assert
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        self.assertEqual(total, 2)
+        self.assertIn("CREATE TABLE order_summary_rebuild LIKE order_summary", statements)
+        self.assertNotIn("DELETE FROM order_summary", statements)
+        self.assertLess(statements.index("CREATE TABLE order_summary_rebuild LIKE order_summary"),
+                        statements.index("RENAME TABLE order_summary TO order_summary_old, order_summary_rebuild TO order_summary"))
+        self.assertEqual([call.args[2:] for call in refresh.call_args_list],
+                         [([1, 2], 'order_summary_rebuild'), ([], 'order_summary_rebuild'), ([7], 'order_summary_rebuild'), ([], 'order_summary')])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_orders_export_reads_the_summary(self, mock_stdout):
+        # Act
+        rows = self.app.export_to_csv('orders', 'orders.csv')
+
+        # Assert
+        with open(os.path.join('export', 'orders.csv'), newline='') as file:
+            exported = list(csv.DictReader(file))
+        self.assertEqual(rows, 2)
+        created_at = exported[1].pop('created_at')
+        self.assertTrue(created_at)
+        self.assertEqual(exported[1], {'id': str(self.order_ids[1]), 'customer_name': 'Ann', 'customer_address': '1 High St', 'customer_phone': '07987654321',
+                                       'courier_name': 'Cy', 'courier_phone': '07000000000', 'status': 'PREPARING', 'products': 'Cake', 'product_quantities': '1',
+                                       'product_prices': '2.25'})
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_names_containing_commas_stay_aligned(self, mock_stdout):
+        # Arrange
+        self.execute("UPDATE products SET name = %s WHERE id = 1", ('Tea, Large',))
+        self.execute("INSERT INTO products (name, price, inventory) VALUES (%s, %s, %s)", ('Scone', 3.0, 5))
+
+        # Act
+        order_ids = self.app.create_orders_bulk([{'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 1, 2, 3]}])
+        orders = self.app.fetch_order_page(after_id=order_ids[0] - 1, limit=1)
+
+        # Assert
+        row = self.query("SELECT items, item_quantities, item_prices FROM order_summary WHERE order_id = %s", (order_ids[0],))[0]
+        self.assertEqual([split_items(value) for value in row], [['Tea, Large', 'Cake', 'Scone'], ['2', '1', '1'], ['1.5', '2.25', '3']])
+        self.assertEqual(orders[0]['product'], 'Tea, Large x2, Cake, Scone')
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_new_orders_are_summarised: bulk-created orders get one summary row each with names, status, item list with quantities, count, total and creation time.
+# test_status_changes_update_in_place: single and swept status changes are reflected in the summary and in the status-filtered order board.
+# test_catalog_import_with_ids_refreshes_affected_orders: importing a product row by id updates the item names of the orders that contain it, while their totals keep the unit prices charged.
+# test_rebuild_matches_incremental_maintenance: a full rebuild produces exactly the rows the write paths maintained.
+# test_failed_rebuild_keeps_the_old_summary: on SQLite the rebuild is one transaction, so a failure part way through rolls back to the old rows instead of leaving the table truncated.
+# test_mysql_rebuild_swaps_in_a_shadow_table: on MySQL the rows are built in order_summary_rebuild, orders changed meanwhile are re-summarised into it, and it replaces the live table with one RENAME TABLE.
+# test_orders_export_reads_the_summary: the orders CSV export is served from order_summary, with product quantities and the creation time.
+# test_names_containing_commas_stay_aligned: product names containing ", " keep their quantities and prices lined up in the summary and on the order board.
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import MagicMock
+from src.order_summary import set_summary_status
+from src.orders import write_order, write_orders, replace_order_items, set_status
+
+class TestOrderWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.cursor.lastrowid = 10
+        self.cursor.rowcount = 2
+
+    def test_write_order_batches_items_and_inventory(self):
+        # Act
+        order_id = write_order(self.cursor, 1, 2, [5, 5, 6])
+
+        # Assert
+        self.assertEqual(order_id, 10)
+        # INSERT order, the stock reservation wrapped in a savepoint, then INSERT items
+        statements = [args[0] for args, _ in self.cursor.execute.call_args_list]
+        self.assertEqual(len(statements), 5)
+        self.assertTrue(statements[2].startswith("UPDATE products"))
+        self.assertTrue(statements[4].startswith("INSERT INTO order_items"))
+        self.cursor.execute.assert_any_call(
+            "INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES "
+            "(%s, %s, %s, (SELECT price FROM products WHERE id = %s)), (%s, %s, %s, (SELECT price FROM products WHERE id = %s))",
+            (10, 5, 2, 5, 10, 6, 1, 6)
+        )
+        self.cursor.execute.assert_any_call(
+            "UPDATE products SET inventory = inventory - CASE id WHEN %s THEN %s WHEN %s THEN %s END WHERE id IN (%s, %s) "
+            "AND deleted_at IS NULL AND inventory >= CASE id WHEN %s THEN %s WHEN %s THEN %s END",
+            (5, 2, 6, 1, 5, 6, 5, 2, 6, 1)
+        )
+
+    def test_write_orders_aggregates_across_orders(self):
+        # Arrange
+        orders = [
+            {'customer_id': 1, 'courier_id': 1, 'product_ids': [5]},
+            {'customer_id': 2, 'courier_id': 1, 'product_ids': [5, 6], 'status': 2},
+        ]
+
+        # Act
+        order_ids = write_orders(self.cursor, orders)
+
+        # Assert
+        self.assertEqual(order_ids, [10, 10])
+        self.assertEqual(self.cursor.execute.call_count, 6)
+        self.cursor.execute.assert_any_call("INSERT INTO orders (customer_id, courier, status) VALUES (%s, %s, %s)", (2, 1, 2))
+        self.cursor.execute.assert_any_call(
+            "UPDATE products SET inventory = inventory - CASE id WHEN %s THEN %s WHEN %s THEN %s END WHERE id IN (%s, %s) "
+            "AND deleted_at IS NULL AND inventory >= CASE id WHEN %s THEN %s WHEN %s THEN %s END",
+            (5, 2, 6, 1, 5, 6, 5, 2, 6, 1)
+        )
+
+    def test_replace_order_items_only_touches_changes(self):
+        # Arrange
+        self.cursor.fetchall.return_value = [(5, 1), (6, 1), (7, 2)]
+
+        # Act
+        previous = replace_order_items(self.cursor, 10, [5, 5, 7, 7, 8])
+
+        # Assert
+        self.assertEqual(previous, {5: 1, 6: 1, 7: 2})
+        self.cursor.execute.assert_any_call("DELETE FROM order_items WHERE order_id = %s AND product_id IN (%s)", (10, 6))
+        self.cursor.execute.assert_any_call("UPDATE order_items SET quantity = CASE product_id WHEN %s THEN %s END WHERE order_id = %s AND product_id IN (%s)", (5, 2, 10, 5))
+        self.cursor.execute.assert_any_call("INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (%s, %s, %s, (SELECT price FROM products WHERE id = %s))", (10, 8, 1, 8))
+        # SELECT items, release and reserve the stock difference, then DELETE, UPDATE and INSERT items
+        statements = [args[0] for args, _ in self.cursor.execute.call_args_list]
+        self.assertEqual(len(statements), 8)
+        self.assertEqual([n for n, sql in enumerate(statements) if sql.startswith("UPDATE products")], [1, 3])
+
+    def test_status_change_for_no_orders_is_a_no_op(self):
+        # Act
+        updated = set_status(self.cursor, MagicMock(), [], 2)
+        set_summary_status(self.cursor, [], 2)
+
+        # Assert
+        self.assertEqual(updated, 0)
+        self.cursor.execute.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_write_order_batches_items_and_inventory: an order with N items costs one order INSERT, one guarded inventory UPDATE and then one multi-row item INSERT (one row per product, with its quantity and current price).
+# test_write_orders_aggregates_across_orders: bulk writes share a single item INSERT and a single guarded inventory UPDATE for the whole batch.
+# test_replace_order_items_only_touches_changes: editing an order deletes removed products, updates changed quantities in place, inserts only new products and returns the previous quantities, moving stock by the difference before any item is written.
+# test_status_change_for_no_orders_is_a_no_op: an empty id list issues no statement instead of an invalid IN () clause.
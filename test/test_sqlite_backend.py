@@ -0,0 +1,117 @@
+import json
+import os
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from src.db_pool import PoolTimeoutError
+from test.sqlite_case import SQLiteTestCase
+
+class TestSQLiteBackend(SQLiteTestCase):
+    in_tempdir = True
+
+    def test_statuses_are_seeded(self):
+        self.assertEqual(self.app.order_status_list, ['PREPARING', 'READY', 'DELIVERED'])
+
+    def test_percent_signs_are_escaped_as_for_mysql(self):
+        # Act
+        rows = self.query("SELECT name, '100%%', '%%s' FROM products WHERE name LIKE %s || '%%' ORDER BY id", ('T',))
+
+        # Assert
+        self.assertEqual(rows, [('Tea', '100%', '%s')])
+
+    def test_orders_round_trip(self):
+        # Act
+        order_ids = self.app.create_orders_bulk([
+            {'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 1, 2]},
+            {'customer_id': 1, 'courier_id': 1, 'product_ids': [2]},
+        ])
+        self.app.load_data()
+        page = self.app.fetch_order_page(limit=1)
+
+        # Assert
+        self.assertEqual(order_ids, [1, 2])
+        self.assertEqual([p['inventory'] for p in self.app.product_list], [8, 3])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM orders"), [(2,)])
+        self.assertEqual(len(page), 1)
+        self.assertEqual(sorted(page[0]['product'].split(', ')), ['Cake', 'Tea x2'])
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_then_import(self, mock_stdout):
+        # Arrange
+        self.app.create_orders_bulk([{'customer_id': 1, 'courier_id': 1, 'product_ids': [1]}])
+        self.app.export_to_csv('orders', 'orders.csv')
+        self.app.export_to_csv('couriers', 'couriers.csv')
+        os.rename('export', 'import')
+
+        # Act
+        self.app.import_from_csv('orders', 'orders.csv')
+        self.app.import_from_csv('couriers', 'couriers.csv')
+        self.app.load_data()
+
+        # Assert
+        self.assertEqual(self.query("SELECT COUNT(*) FROM orders"), [(2,)])
+        self.assertEqual(len(self.app.courier_list), 1)
+        self.assertEqual(len(self.app.product_list), 2)
+        self.assertIn("Data imported from", mock_stdout.getvalue())
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_all_writes_every_table_and_manifest(self, mock_stdout):
+        # Arrange
+        self.app.create_orders_bulk([{'customer_id': 1, 'courier_id': 1, 'product_ids': [1, 2]}])
+
+        # Act
+        manifest = self.app.export_all(workers=3)
+
+        # Assert
+        with open(os.path.join('export', 'manifest.json')) as file:
+            self.assertEqual(json.load(file), manifest)
+        rows = {entry['table']: entry['rows'] for entry in manifest['tables']}
+        self.assertEqual(rows, {'products': 2, 'couriers': 1, 'customers': 1, 'orders': 1, 'order_items': 2})
+        self.assertTrue(all(entry['status'] == 'ok' for entry in manifest['tables']))
+        self.assertEqual(sorted(os.listdir('export')), ['couriers.csv', 'customers.csv', 'manifest.json', 'order_items.csv', 'orders.csv', 'products.csv'])
+        self.assertEqual(self.app.pool.stats()['in_use'], 1)
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_all_caps_workers_at_the_pool_size(self, mock_stdout):
+        # Act
+        manifest = self.app.export_all(workers=self.app.pool.size + 3)
+
+        # Assert
+        self.assertEqual(manifest['workers'], self.app.pool.size - 1)
+        self.assertTrue(all(entry['status'] == 'ok' for entry in manifest['tables']))
+        self.assertIn(f"Using {self.app.pool.size - 1} workers instead of {self.app.pool.size + 3}", mock_stdout.getvalue())
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_export_all_records_a_pool_timeout_as_a_failed_table(self, mock_stdout):
+        # Arrange
+        export = self.app.export_to_csv
+
+        def time_out_on_orders(table_name, *args, **kwargs):
+            if table_name == 'orders':
+                raise PoolTimeoutError("No database connection available after 30s (pool size 2)")
+            return export(table_name, *args, **kwargs)
+
+        # Act
+        with patch.object(self.app, 'export_to_csv', side_effect=time_out_on_orders):
+            manifest = self.app.export_all(workers=2)
+
+        # Assert
+        status = {entry['table']: entry['status'] for entry in manifest['tables']}
+        self.assertEqual(status, {'products': 'ok', 'couriers': 'ok', 'customers': 'ok', 'orders': 'failed', 'order_items': 'ok'})
+        with open(os.path.join('export', 'manifest.json')) as file:
+            self.assertEqual(json.load(file), manifest)
+        self.assertIn("Failed to export orders", mock_stdout.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_statuses_are_seeded: the SQLite schema is created on first connect with the default order statuses.
+# test_percent_signs_are_escaped_as_for_mysql: %% in a statement reaches SQLite as a literal percent sign, including right before an s, while %s stays a parameter.
+# test_orders_round_trip: bulk order creation, inventory decrements, the catalog cache and the order page query all work on SQLite.
+# test_export_then_import: an orders/couriers export can be imported back, upserting couriers and resolving existing entities.
+# test_export_all_writes_every_table_and_manifest: the parallel export writes one CSV per table plus a manifest with row counts, and returns its pooled connections.
+# test_export_all_caps_workers_at_the_pool_size: asking for more workers than the pool can serve alongside the app's own connection uses pool size - 1 workers and says so.
+# test_export_all_records_a_pool_timeout_as_a_failed_table: a table that times out waiting for a pooled connection is marked failed while the other tables and the manifest are still written.
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from src.app import CafeApp
+from src.startup import StartupProfile
+from test.sqlite_case import SQLiteTestCase
+
+class TestLazyStartup(unittest.TestCase):
+
+    def setUp(self):
+        with patch('src.app.get_connection_pool'):
+            self.app = CafeApp()
+
+    def test_creating_the_app_does_not_connect(self):
+        self.app.pool.acquire.assert_not_called()
+
+    @patch('src.app.get_valid_input', return_value=0)
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_menu_is_drawn_while_the_database_is_still_connecting(self, mock_stdout, mock_input):
+        # Arrange
+        connected = threading.Event()
+        self.app.pool.acquire.side_effect = lambda: connected.wait(5) and MagicMock()
+        self.app.clear_screen = MagicMock()
+
+        # Act
+        start = time.perf_counter()
+        self.app.run()
+        elapsed = time.perf_counter() - start
+        connected.set()
+
+        # Assert
+        self.assertLess(elapsed, 1)
+        self.assertIn("Main Menu", mock_stdout.getvalue())
+
+    def test_failed_warm_up_is_raised_on_the_main_thread(self):
+        # Arrange
+        self.app.pool.acquire.side_effect = SystemExit(1)
+
+        # Act
+        self.app.start_warm_up()
+
+        # Assert
+        with self.assertRaises(SystemExit):
+            self.app.wait_for_warm_up()
+
+class TestStartupProfile(SQLiteTestCase):
+    products = ()
+    couriers = ()
+    customers = ()
+    in_tempdir = True
+
+    def test_warm_up_records_every_phase(self):
+        # Arrange
+        app = CafeApp()
+        app.profile = StartupProfile(time.perf_counter() - 0.05, time.perf_counter() - 0.04)
+
+        # Act
+        app.start_warm_up()
+        app.wait_for_warm_up()
+        app.profile.since_start('first_paint')
+
+        # Assert
+        self.assertEqual(set(app.profile.phases), {'imports', 'connect', 'statuses', 'catalog', 'ready', 'first_paint'})
+        self.assertEqual(app.order_status_list, ['PREPARING', 'READY', 'DELIVERED'])
+        self.assertAlmostEqual(app.profile.phases['imports'], 10, delta=1)
+
+    def test_report_flags_a_slow_first_paint(self):
+        # Arrange
+        profile = StartupProfile(time.perf_counter() - 0.5, budget_ms=100)
+        profile.since_start('first_paint')
+
+        # Act
+        report = profile.report()
+        path = profile.write()
+
+        # Assert
+        self.assertFalse(profile.within_budget)
+        self.assertIn("\033[91m  first paint", report)
+        with open(path) as file:
+            self.assertFalse(json.load(file)['within_budget'])
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_creating_the_app_does_not_connect: constructing CafeApp takes no connection from the pool.
+# test_menu_is_drawn_while_the_database_is_still_connecting: the main menu appears and can be exited while the warm-up thread is still waiting for the database.
+# test_failed_warm_up_is_raised_on_the_main_thread: a connection failure on the warm-up thread exits the app when the first menu action waits for it.
+# test_warm_up_records_every_phase: the background warm-up connects, loads the order statuses and the catalog, and records each phase in the startup profile.
+# test_report_flags_a_slow_first_paint: a first paint over the budget is highlighted in the report and recorded in logs/startup_profile.json.
@@ -0,0 +1,105 @@
+import os
+import unittest
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from src.table_render import CLEAR, ELLIPSIS, clear_screen, print_table, render_table
+from test.sqlite_case import SQLiteTestCase
+
+class FakeTerminal(StringIO):
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+    def isatty(self):
+        return True
+
+class TestRenderTable(unittest.TestCase):
+
+    def test_columns_are_sized_to_the_widest_value(self):
+        # Act
+        lines = render_table(["Name", "Price"], [("Tea", "£1.50"), ("Hot Chocolate", "£12.00")], align='<>')
+
+        # Assert
+        self.assertIn("No.  Name           Price ", lines[0])
+        self.assertIn("1    Tea             £1.50", lines[1])
+        self.assertIn("2    Hot Chocolate  £12.00", lines[2])
+
+    def test_wide_tables_are_truncated_to_the_width(self):
+        # Act
+        lines = render_table(["Name", "Address"], [("Bob", "1 " + "Long Street " * 10)], width=40)
+
+        # Assert
+        row = lines[1].split("\033[0m")[0].split("m", 1)[1]
+        self.assertEqual(len(row), 40)
+        self.assertTrue(row.endswith(ELLIPSIS))
+
+    def test_table_is_written_in_one_call(self):
+        # Arrange
+        out = StringIO()
+        out.write = MagicMock(wraps=out.write)
+
+        # Act
+        print_table("Courier List:", ["Courier Name", "Phone"], [(f"Courier {n}", "07123456789") for n in range(50)], out=out)
+
+        # Assert
+        out.write.assert_called_once()
+        self.assertEqual(out.getvalue().count('\n'), 52)
+
+    @patch('builtins.input', side_effect=['', 'q'])
+    @patch('src.table_render.shutil.get_terminal_size', return_value=os.terminal_size((80, 13)))
+    def test_long_tables_are_paged_on_a_terminal(self, mock_size, mock_input):
+        # Arrange
+        out = FakeTerminal()
+
+        # Act
+        print_table("Customer List:", ["Name"], [(f"Customer {n}",) for n in range(1, 31)], out=out)
+
+        # Assert
+        self.assertEqual(out.writes, 2)
+        self.assertIn("Customer 20", out.getvalue())
+        self.assertNotIn("Customer 21", out.getvalue())
+        mock_input.assert_any_call("-- 10 of 30 -- [Enter] More  [q] Stop: ")
+
+    def test_empty_table_and_clear_screen(self):
+        # Arrange
+        out = StringIO()
+
+        # Act
+        clear_screen(out)
+        print_table("Product List:", ["Product Name"], [], out=out)
+
+        # Assert
+        self.assertEqual(out.getvalue(), CLEAR + "\033[93mProduct List:\033[0m\n\033[90mEmpty\033[0m\n")
+
+class TestListScreens(SQLiteTestCase):
+    products = (('Tea', 1.5, 40),)
+    couriers = ()
+    customers = ()
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_product_list_uses_the_renderer(self, mock_stdout):
+        # Act
+        self.app.print_product_list()
+
+        # Assert
+        output = mock_stdout.getvalue()
+        self.assertIn("Product List:", output)
+        self.assertIn("1    Tea           £1.50         40", output)
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Test Descriptions:
+
+# test_columns_are_sized_to_the_widest_value: each column is as wide as its longest value or header, with right-aligned columns padded on the left.
+# test_wide_tables_are_truncated_to_the_width: a row wider than the terminal is cut to fit and the truncated cell ends with an ellipsis.
+# test_table_is_written_in_one_call: the title, header and every row reach the output in a single write.
+# test_long_tables_are_paged_on_a_terminal: on a terminal a table taller than the screen is shown a screenful at a time and stops when the user enters q.
+# test_empty_table_and_clear_screen: clearing the screen writes ANSI sequences, and a table without rows prints its title and Empty.
+# test_product_list_uses_the_renderer: the product list screen prints the catalogue through the shared renderer with prices formatted and right-aligned.